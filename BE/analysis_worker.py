@@ -0,0 +1,163 @@
+"""
+분석 워커 프로세스 (ANALYSIS_MODE=queue)
+
+웹 프로세스(main.py)가 job_store(SQLite)에 넣은 job을 하나씩 가져와 main.JOB_RUNNERS의 분석 함수
+(영상 분석·STT·LLM 리포트·Firestore 저장)로 실행합니다. 웹 프로세스와 업로드 임시 파일, job_store,
+결과 캐시가 있는 디스크(볼륨)를 공유해야 합니다. 처리량은 워커 프로세스 수로 조절합니다.
+
+- 실행 중에는 진행률 스냅샷과 heartbeat를 job_store에 주기적으로 기록 (웹 프로세스의 진행률 API/SSE가 읽음)
+- 업로드 임시 파일은 job 결과를 기록(finish)한 뒤에 정리
+- 종료 신호(SIGTERM/SIGINT)를 받으면 새 job을 가져가지 않고 실행 중인 job을 마친 뒤 종료.
+  신호를 한 번 더 받으면 job을 대기열로 되돌리고 프로세스를 즉시 종료 (분석 스레드가 남아 다른 워커와
+  같은 job을 중복 실행하지 않도록). SIGKILL로 죽으면 heartbeat가 끊겨 JOB_STALE_SEC 뒤 재시도됨
+- 다른 워커가 죽어 heartbeat가 끊긴 job은 재시도 대기열로 돌리거나 실패 처리하고 업로드 파일을 정리
+
+사용 예:
+    cd BE
+    ANALYSIS_MODE=queue uvicorn main:app --host 0.0.0.0 --port 8000   # 웹: 업로드·결과 조회만
+    python analysis_worker.py                                          # 워커 (필요한 만큼 실행)
+    python analysis_worker.py --kinds video --once                     # video job만, 대기열이 비면 종료
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+
+import main as api  # 분석 함수·Firestore 초기화 재사용 (HTTP 서버는 띄우지 않음)
+from job_scheduler import FAILED, RUNNING, SUCCEEDED, Job
+from job_store import JOB_STORE_POLL_SEC, JobStore
+from shared_buffers import cleanup_stale as cleanup_shared_buffers
+
+# 실행 중 job의 진행률·heartbeat 기록 간격(초)
+_HEARTBEAT_SEC = 2.0
+
+
+def _requeue_current(store: JobStore, state: dict):
+    """실행 중이던 job을 대기열로 되돌림. 업로드 파일이 없으면 다시 실행할 수 없으므로 실패 처리."""
+    record, state["current"] = state["current"], None
+    if record is None:
+        return
+    path = record["payload"].get("temp_video_path") or record["payload"].get("temp_path")
+    if path and os.path.exists(path):
+        print(f"↩️ [worker] 종료 신호: job {record['id']}을 대기열로 되돌립니다.")
+        store.requeue(record["id"])
+    else:
+        store.finish(record["id"], FAILED, error="워커가 종료되어 분석이 중단되었습니다. 다시 업로드해 주세요.")
+
+
+def _warm_up():
+    if api.STT_MODEL_WARMUP:
+        try:
+            api.warm_up_stt_model()
+        except Exception as e:
+            print(f"⚠️ stt 모델 워밍업 실패: {e}")
+    if api.VIDEO_MODEL_WARMUP:
+        try:
+            api._video_analyzer().warm_up_model_pool()
+        except Exception as e:
+            print(f"⚠️ vision 모델 워밍업 실패: {e}")
+
+
+async def _run_job(store: JobStore, record: dict):
+    progress = api.scheduler.progress
+    job = Job(record["kind"], record["meta"])
+    job.id = record["id"]
+    job.status = RUNNING
+    job.started_at = time.time()
+    progress.start(job.id, api.JOB_PROGRESS_WEIGHTS.get(job.kind))
+    progress.set_status(job.id, RUNNING)
+
+    stop = asyncio.Event()
+
+    async def sync_progress():
+        last_version = None
+        while not stop.is_set():
+            snapshot = progress.get(job.id)
+            changed = snapshot is not None and snapshot["version"] != last_version
+            store.heartbeat(job.id, snapshot if changed else None)
+            if changed:
+                last_version = snapshot["version"]
+            try:
+                await asyncio.wait_for(stop.wait(), _HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                pass
+
+    syncer = asyncio.create_task(sync_progress())
+    print(f"[worker] job {job.id} ({job.kind}) 시작")
+    try:
+        job.result = await api.JOB_RUNNERS[job.kind](job, **record["payload"])
+        job.status = SUCCEEDED
+    except Exception as e:
+        job.status = FAILED
+        job.error = str(e)
+        print(f"❌ [worker] job {job.id} ({job.kind}) 실패: {e}")
+    finally:
+        stop.set()
+        await syncer
+
+    progress.set_status(job.id, job.status, error=job.error)
+    store.finish(job.id, job.status, result=job.result, error=job.error, progress=progress.get(job.id))
+    api.cleanup_job_uploads(record["payload"])
+    if job.status == SUCCEEDED:
+        print(f"✅ [worker] job {job.id} ({job.kind}) 완료 ({time.time() - job.started_at:.1f}s)")
+
+
+async def run_worker(store: JobStore, state: dict, kinds=None, once: bool = False):
+    # 종료 신호: 코루틴만 취소하면 stage 스레드의 분석은 계속 돌아 대기열로 되돌린 job이 중복 실행되므로,
+    # 첫 신호는 실행 중 job을 마치고 종료, 두 번째 신호는 job을 되돌리고 스레드째 즉시 종료
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+
+    def on_signal():
+        if state["current"] is None:
+            task.cancel()
+        elif not state["stopping"]:
+            state["stopping"] = True
+            print("⏳ [worker] 종료 신호: 실행 중인 job을 마친 뒤 종료합니다. (한 번 더 보내면 job을 대기열로 되돌리고 즉시 종료)")
+        else:
+            _requeue_current(store, state)
+            os._exit(1)
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, on_signal)
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    cleanup_shared_buffers()
+    await loop.run_in_executor(None, _warm_up)
+    print(f"🛠️ 분석 워커 시작 ({worker_id}, job_store={store.path}, 종류={', '.join(kinds) if kinds else '전체'})")
+    while not state["stopping"]:
+        for failed in store.recover_stale():
+            api.cleanup_job_uploads(failed["payload"])
+        record = store.claim(worker_id, kinds)
+        if record is None:
+            if once:
+                return
+            await asyncio.sleep(JOB_STORE_POLL_SEC)
+            continue
+        state["current"] = record
+        await _run_job(store, record)
+        state["current"] = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 job 워커 (ANALYSIS_MODE=queue)")
+    parser.add_argument("--kinds", nargs="+", choices=sorted(api.JOB_RUNNERS), help="처리할 job 종류 (기본: 전체)")
+    parser.add_argument("--once", action="store_true", help="대기열이 비면 종료")
+    args = parser.parse_args()
+
+    store = JobStore()
+    state = {"current": None, "stopping": False}
+    try:
+        asyncio.run(run_worker(store, state, args.kinds, args.once))
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        pass
+    finally:
+        _requeue_current(store, state)
+        api.release_models()
+
+
+if __name__ == "__main__":
+    main()
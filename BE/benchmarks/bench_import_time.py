@@ -0,0 +1,107 @@
+"""
+모듈 import 시간 측정 (python -X importtime 기반)
+
+각 모듈을 새 인터프리터에서 import하고, -X importtime 출력으로 누적 import 시간과
+가장 오래 걸린 직접 의존 모듈, ML 스택(torch·whisper·faster_whisper·cv2·mediapipe 등)이
+실제로 로딩됐는지를 표로 출력합니다. 반복 측정 시 최솟값(캐시가 데워진 상태)을 사용합니다.
+
+main / result_summary_api는 import 시 Firebase·LLM 키를 확인하므로 실제 배포와 같은 환경 변수(.env)가 필요합니다.
+
+사용 예:
+    cd BE
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --modules main result_summary_api --repeat 5 --json bench_import.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BE_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = ["main", "result_summary_api", "stt_processor", "video_analyzer"]
+HEAVY_MODULES = ["torch", "whisper", "faster_whisper", "ctranslate2", "cv2", "mediapipe", "moviepy", "openai"]
+
+_PROBE = (
+    # importlib.import_module은 -X importtime에 기록되지 않으므로 import 문을 그대로 사용
+    "import json, sys; import {module}; "
+    "print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))"
+)
+
+
+def _parse_importtime(stderr: str):
+    """-X importtime 출력 → [(depth, module, self_us, cumulative_us)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        raw_name = parts[2].rstrip()
+        stripped = raw_name.lstrip()
+        depth = (len(raw_name) - len(stripped) - 1) // 2
+        rows.append((depth, stripped, int(parts[0]), int(parts[1])))
+    return rows
+
+
+def measure(module: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BE_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+        return {"module": module, "error": error}
+    rows = _parse_importtime(proc.stderr)
+    # 자식 모듈이 부모보다 먼저 기록되므로, 대상 모듈 줄 바로 앞의 depth 1 줄들이 대상이 직접 import한 모듈
+    target_idx = next((i for i in range(len(rows) - 1, -1, -1) if rows[i][:2] == (0, module)), None)
+    children = []
+    if target_idx is not None:
+        for depth, name, _, cumulative_us in reversed(rows[:target_idx]):
+            if depth == 0:
+                break
+            if depth == 1:
+                children.append((name, cumulative_us))
+    children.sort(key=lambda child: -child[1])
+    return {
+        "module": module,
+        "total_ms": round(rows[target_idx][3] / 1000, 1) if target_idx is not None else None,
+        "heavy_loaded": json.loads(proc.stdout.strip().splitlines()[-1]),
+        "top_imports": [{"module": name, "cumulative_ms": round(cum / 1000, 1)} for name, cum in children],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최솟값 사용)")
+    parser.add_argument("--top", type=int, default=8, help="출력할 직접 의존 모듈 수")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        runs = [measure(module) for _ in range(max(1, args.repeat))]
+        ok = [run for run in runs if "error" not in run and run["total_ms"] is not None]
+        result = min(ok, key=lambda run: run["total_ms"]) if ok else runs[-1]
+        result["top_imports"] = result.get("top_imports", [])[:args.top]
+        results.append(result)
+
+        if "error" in result:
+            print(f"\n{module}: import 실패 - {result['error']}")
+            continue
+        heavy = ", ".join(result["heavy_loaded"]) or "없음"
+        print(f"\n{module}: {result['total_ms']:.1f}ms ({len(ok)}회 중 최솟값) | ML/LLM 모듈: {heavy}")
+        for item in result["top_imports"]:
+            print(f"  {item['cumulative_ms']:>9.1f}ms  {item['module']}")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+추론 입력 해상도(VIDEO_INFERENCE_MAX_SIDE)별 속도와 정확도 편차 측정
+
+원본 해상도 결과를 기준으로 center_ratio, posture.stability, gesture.motion_energy가
+얼마나 달라지는지와 분석 시간을 표로 출력합니다.
+
+사용 예:
+    cd BE
+    python benchmarks/bench_inference_resolution.py videos/sample.mp4 --sides 1280 960 640 480
+    python benchmarks/bench_inference_resolution.py videos/*.mp4 --fps 10 --json bench_resolution.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from video_analyzer import analyze_video  # noqa: E402
+
+METRICS = {
+    "center_ratio": lambda r: r["gaze"]["center_ratio"],
+    "stability": lambda r: r["posture"]["stability"],
+    "motion_energy": lambda r: r["gesture"]["motion_energy"],
+}
+
+
+def _run(video_path: str, max_side: int, target_fps: float):
+    start = time.perf_counter()
+    result = analyze_video(video_path, target_fps=target_fps, workers=1, max_side=max_side)
+    return result, time.perf_counter() - start
+
+
+def bench_video(video_path: str, sides, target_fps: float):
+    baseline, baseline_sec = _run(video_path, 0, target_fps)
+    rows = [{
+        "video": Path(video_path).name,
+        "max_side": 0,
+        "inference_resolution": baseline["metadata"].get("inference_resolution"),
+        "elapsed_sec": round(baseline_sec, 2),
+        "speedup": 1.0,
+        **{name: get(baseline) for name, get in METRICS.items()},
+        **{f"{name}_drift": 0.0 for name in METRICS},
+    }]
+
+    for side in sides:
+        result, elapsed = _run(video_path, side, target_fps)
+        row = {
+            "video": Path(video_path).name,
+            "max_side": side,
+            "inference_resolution": result["metadata"].get("inference_resolution"),
+            "elapsed_sec": round(elapsed, 2),
+            "speedup": round(baseline_sec / elapsed, 2) if elapsed > 0 else 0,
+        }
+        for name, get in METRICS.items():
+            value = get(result)
+            row[name] = value
+            row[f"{name}_drift"] = round(abs(value - get(baseline)), 4)
+        rows.append(row)
+    return rows
+
+
+def _print_table(rows):
+    header = ["video", "max_side", "inference_resolution", "elapsed_sec", "speedup"]
+    for name in METRICS:
+        header += [name, f"{name}_drift"]
+    print("| " + " | ".join(header) + " |")
+    print("|" + "---|" * len(header))
+    for row in rows:
+        print("| " + " | ".join(str(row.get(h)) for h in header) + " |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MediaPipe 추론 해상도별 속도/정확도 편차 벤치마크")
+    parser.add_argument("videos", nargs="+", help="분석할 영상 경로")
+    parser.add_argument("--sides", nargs="+", type=int, default=[1280, 960, 640, 480],
+                        help="비교할 최대 변 길이 목록 (원본 해상도는 항상 기준으로 포함)")
+    parser.add_argument("--fps", type=float, default=0, help="분석 FPS (0이면 전체 프레임)")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON으로도 저장할 경로")
+    args = parser.parse_args()
+
+    rows = []
+    for video in args.videos:
+        rows.extend(bench_video(video, args.sides, args.fps))
+
+    _print_table(rows)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n✅ 결과 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+프레임 루프의 MediaPipe 이후 후처리(랜드마크 → 지표) 마이크로 벤치마크
+
+MediaPipe 추론은 돌리지 않고, 가짜 랜드마크 결과를 만들어
+기존 리스트 컴프리헨션 방식과 video_analyzer._FrameAnalyzer의 프레임당 처리 시간을 비교합니다.
+두 방식의 지표 값이 같은지도 함께 확인합니다.
+
+사용 예:
+    cd BE
+    python benchmarks/bench_landmark_extraction.py --frames 5000
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from video_analyzer import _FrameAnalyzer  # noqa: E402
+
+try:
+    from mediapipe.framework.formats import landmark_pb2
+except ImportError:  # pragma: no cover - mediapipe 없는 환경에서는 단순 객체로 대체
+    landmark_pb2 = None
+
+
+def _make_landmarks(n: int, rng: random.Random):
+    if landmark_pb2 is not None:
+        lm_list = landmark_pb2.NormalizedLandmarkList()
+        for _ in range(n):
+            lm_list.landmark.add(x=rng.random(), y=rng.random(), z=0.0, visibility=1.0)
+        return lm_list
+    return SimpleNamespace(landmark=[SimpleNamespace(x=rng.random(), y=rng.random(), visibility=1.0)
+                                     for _ in range(n)])
+
+
+def make_frames(n_frames: int, seed: int = 0):
+    rng = random.Random(seed)
+    frames = []
+    for _ in range(n_frames):
+        face = SimpleNamespace(multi_face_landmarks=[_make_landmarks(468, rng)])
+        pose = SimpleNamespace(pose_landmarks=_make_landmarks(33, rng))
+        hands = SimpleNamespace(multi_hand_landmarks=[_make_landmarks(21, rng), _make_landmarks(21, rng)])
+        frames.append((face, pose, hands))
+    return frames
+
+
+def legacy_loop(frames):
+    """리스트 기반 기존 구현 (비교 기준)."""
+    prev_pose_coords = None
+    motion_energy_values, hand_movement_values, head_rolls, head_yaws = [], [], [], []
+    for face_result, pose_result, hands_result in frames:
+        lm = face_result.multi_face_landmarks[0].landmark
+        left_eye = lm[33]; right_eye = lm[263]
+        nose = np.array([lm[1].x, lm[1].y])
+        roll = np.degrees(np.arctan2(right_eye.y - left_eye.y, right_eye.x - left_eye.x))
+        head_rolls.append(abs(roll))
+        yaw = np.degrees(np.arctan2(nose[0] - 0.5, 0.5))
+        head_yaws.append(abs(yaw))
+
+        lm = pose_result.pose_landmarks.landmark
+        left_shoulder, right_shoulder = lm[11], lm[12]
+        math.degrees(math.atan2(right_shoulder.y - left_shoulder.y, right_shoulder.x - left_shoulder.x))
+        current_pose = np.array([[p.x, p.y] for p in pose_result.pose_landmarks.landmark])
+        if prev_pose_coords is not None:
+            motion_energy_values.append(np.linalg.norm(current_pose - prev_pose_coords))
+        prev_pose_coords = current_pose
+
+        centers = []
+        for hand in hands_result.multi_hand_landmarks:
+            cx = np.mean([p.x for p in hand.landmark])
+            cy = np.mean([p.y for p in hand.landmark])
+            centers.append((cx, cy))
+        if len(centers) == 2:
+            hand_movement_values.append(np.linalg.norm(np.array(centers[0]) - np.array(centers[1])))
+    return {
+        "motion_energy": float(np.mean(motion_energy_values)),
+        "hand_movement": float(np.mean(hand_movement_values)),
+        "head_roll": float(np.mean(head_rolls)),
+        "head_yaw": float(np.mean(head_yaws)),
+    }
+
+
+def current_loop(frames):
+    analyzer = _FrameAnalyzer(stride=1)
+    for face_result, pose_result, hands_result in frames:
+        analyzer.process(face_result, pose_result, hands_result)
+    stats = analyzer.stats
+    return {
+        "motion_energy": stats.motion_energy.mean(),
+        "hand_movement": stats.hand_movement.mean(),
+        "head_roll": stats.head_roll.mean(),
+        "head_yaw": stats.head_yaw.mean(),
+    }
+
+
+def _time(fn, frames, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(frames)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="랜드마크 후처리 마이크로 벤치마크")
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames)
+    legacy_sec, legacy_result = _time(legacy_loop, frames, args.repeat)
+    current_sec, current_result = _time(current_loop, frames, args.repeat)
+
+    per_frame = lambda sec: sec / args.frames * 1e6  # noqa: E731
+    print(f"프레임 수: {args.frames} (landmark_pb2 사용: {landmark_pb2 is not None})")
+    print(f"기존 방식    : {per_frame(legacy_sec):8.1f} µs/frame")
+    print(f"_FrameAnalyzer: {per_frame(current_sec):8.1f} µs/frame  (x{legacy_sec / current_sec:.2f})")
+    for name, value in legacy_result.items():
+        print(f"  {name:14s} 기존={value:.6f}  현재={current_result[name]:.6f}  차이={abs(value - current_result[name]):.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,6 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 
 from dotenv import load_dotenv
-from openai import OpenAI
 from stt_processor import analyze_voice_rhythm_and_patterns
 
 load_dotenv()
@@ -28,14 +27,13 @@ OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
 OPENROUTER_SITE = os.getenv("OPENROUTER_SITE_URL", "")
 OPENROUTER_TITLE = os.getenv("OPENROUTER_TITLE", "combined-feedback")
 
-_client: Optional[OpenAI] = None
+# 클라이언트는 첫 리포트 생성 시 만듦 (openai 패키지 import를 서버 시작에서 제외)
+_client = None
 _llm_model: str = OPENAI_MODEL
 _llm_headers = {}
 if OPENAI_API_KEY:
-    _client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None)
     _llm_model = OPENAI_MODEL
 elif OPENROUTER_API_KEY:
-    _client = OpenAI(base_url=OPENROUTER_BASE_URL, api_key=OPENROUTER_API_KEY)
     _llm_model = OPENROUTER_MODEL
     _llm_headers = {
         "HTTP-Referer": OPENROUTER_SITE,
@@ -43,6 +41,18 @@ elif OPENROUTER_API_KEY:
     }
 
 
+def _get_client():
+    global _client
+    if _client is None and (OPENAI_API_KEY or OPENROUTER_API_KEY):
+        from openai import OpenAI
+
+        if OPENAI_API_KEY:
+            _client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None)
+        else:
+            _client = OpenAI(base_url=OPENROUTER_BASE_URL, api_key=OPENROUTER_API_KEY)
+    return _client
+
+
 def _ensure_voice_analysis(stt_result: Dict[str, Any]) -> Dict[str, Any]:
     """voice_analysis가 없으면 생성하여 반환."""
     if "voice_analysis" in stt_result:
@@ -229,13 +239,14 @@ def generate_combined_feedback_report(
     original_filename: Optional[str] = None,
 ) -> Dict[str, Any]:
     """영상+음성 통합 LLM 리포트 생성 및 저장 (점수 포함)."""
-    if not _client:
+    client = _get_client()
+    if not client:
         raise RuntimeError("OPENAI_API_KEY 또는 OPENROUTER_API_KEY가 설정되지 않았습니다.")
 
     stt_result = _ensure_voice_analysis(stt_result)
     prompt = _build_combined_prompt(video_result, stt_result)
 
-    completion = _client.chat.completions.create(
+    completion = client.chat.completions.create(
         model=_llm_model,
         response_format={"type": "json_object"},
         messages=[
@@ -0,0 +1,30 @@
+"""
+ffmpeg 실행 파일 탐색 유틸리티
+
+우선순위: FFMPEG_BINARY 환경 변수 → PATH의 ffmpeg → moviepy가 설치한 imageio-ffmpeg 번들
+"""
+
+import os
+import shutil
+from typing import Optional
+
+_ffmpeg_exe: Optional[str] = None
+
+
+def get_ffmpeg_exe() -> str:
+    """ffmpeg 실행 파일 경로를 반환. 찾지 못하면 RuntimeError."""
+    global _ffmpeg_exe
+    if _ffmpeg_exe:
+        return _ffmpeg_exe
+
+    candidate = os.getenv("FFMPEG_BINARY") or shutil.which("ffmpeg")
+    if not candidate:
+        try:
+            import imageio_ffmpeg
+            candidate = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            candidate = None
+    if not candidate:
+        raise RuntimeError("ffmpeg 실행 파일을 찾을 수 없습니다. ffmpeg를 설치하거나 FFMPEG_BINARY를 지정하세요.")
+    _ffmpeg_exe = candidate
+    return _ffmpeg_exe
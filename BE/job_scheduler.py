@@ -0,0 +1,199 @@
+"""
+분석 작업(job) 스케줄러
+
+- 요청은 job ID를 받고 즉시 반환, 실제 분석은 백그라운드 asyncio 작업으로 실행
+- 대기+실행 중인 job 수가 JOB_QUEUE_SIZE를 넘으면 QueueFullError (API에서 429로 응답)
+- job별 진행률은 ProgressTracker에 기록 (상태 변경은 스케줄러가, 단계 진행률은 분석 함수가 갱신)
+- 무거운 단계(vision/stt/llm)와 I/O(io)는 단계별 전용 스레드 풀에서 실행해 동시 실행 수를 제한
+  (기본 executor에 모두 던지던 방식은 동시 업로드 시 메모리 부족으로 프로세스가 죽었음)
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional
+
+from progress_tracker import ProgressTracker
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except ValueError:
+        return default
+
+
+# 동시에 실행할 job 수 (나머지는 대기열에서 순서대로 대기)
+JOB_MAX_CONCURRENT = _env_int("JOB_MAX_CONCURRENT", 2)
+# 대기 + 실행 중 job 최대 개수, 초과 시 429
+JOB_QUEUE_SIZE = _env_int("JOB_QUEUE_SIZE", 8)
+# 완료된 job 결과 보관 시간(초)
+JOB_RESULT_TTL_SEC = _env_int("JOB_RESULT_TTL_SEC", 3600)
+# 단계별 동시 실행 수
+STAGE_LIMITS = {
+    "vision": _env_int("JOB_VISION_CONCURRENCY", 1),
+    "stt": _env_int("JOB_STT_CONCURRENCY", 1),
+    "llm": _env_int("JOB_LLM_CONCURRENCY", 4),
+    # Firestore 읽기/쓰기, 결과 파일 저장 등 가벼운 I/O
+    "io": _env_int("JOB_IO_CONCURRENCY", 8),
+}
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차 새 job을 받을 수 없음."""
+
+    def __init__(self, queue_size: int, retry_after: int = 30):
+        super().__init__(f"분석 대기열이 가득 찼습니다 (최대 {queue_size}건). 잠시 후 다시 시도하세요.")
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+
+
+class Job:
+    def __init__(self, kind: str, meta: Optional[dict] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self, queue_position: Optional[int] = None, include_result: bool = True) -> dict:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            **self.meta,
+        }
+        if queue_position is not None:
+            data["queue_position"] = queue_position
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.status == SUCCEEDED:
+            data["result"] = self.result
+        return data
+
+
+class JobScheduler:
+    """
+    job 등록·실행·조회를 담당. 이벤트 루프 스레드에서만 호출 (run_stage의 함수만 스레드 풀에서 실행).
+    """
+
+    def __init__(self, max_concurrent: int = JOB_MAX_CONCURRENT, queue_size: int = JOB_QUEUE_SIZE,
+                 stage_limits: Optional[Dict[str, int]] = None, result_ttl_sec: int = JOB_RESULT_TTL_SEC,
+                 progress: Optional[ProgressTracker] = None):
+        self.max_concurrent = max_concurrent
+        self.queue_size = max(queue_size, max_concurrent)
+        self.result_ttl_sec = result_ttl_sec
+        self.stage_limits = dict(stage_limits or STAGE_LIMITS)
+        self.progress = progress or ProgressTracker()
+        self._executors = {
+            stage: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"{stage}-worker")
+            for stage, limit in self.stage_limits.items()
+        }
+        self._jobs: Dict[str, Job] = {}
+        self._waiting = []   # 실행 슬롯을 기다리는 job ID (FIFO)
+        self._slots = None
+        self._tasks = set()
+
+    # ----------------------------
+    # 등록 / 조회
+    # ----------------------------
+    def submit(self, kind: str, run: Callable[[Job], Awaitable[dict]], meta: Optional[dict] = None,
+               weights: Optional[Dict[str, float]] = None) -> Job:
+        """
+        run(job) 코루틴을 백그라운드에서 실행할 job으로 등록. 대기열이 가득 차면 QueueFullError.
+        weights: 진행률 계산용 단계별 비율 (예: {"vision": 0.5, "stt": 0.3, ...}).
+        """
+        self._prune()
+        if self.active_count() >= self.queue_size:
+            raise QueueFullError(self.queue_size)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+
+        job = Job(kind, meta)
+        self._jobs[job.id] = job
+        self._waiting.append(job.id)
+        self.progress.start(job.id, weights)
+        task = asyncio.get_running_loop().create_task(self._execute(job, run))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """대기 중이면 1부터 시작하는 대기 순번, 아니면 None."""
+        try:
+            return self._waiting.index(job.id) + 1
+        except ValueError:
+            return None
+
+    def active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.done)
+
+    def describe(self, job: Job, include_result: bool = True) -> dict:
+        data = job.to_dict(self.queue_position(job), include_result)
+        data["progress"] = self.progress.get(job.id)
+        return data
+
+    # ----------------------------
+    # 실행
+    # ----------------------------
+    async def _execute(self, job: Job, run):
+        try:
+            async with self._slots:
+                self._waiting.remove(job.id)
+                job.status = RUNNING
+                job.started_at = time.time()
+                self.progress.set_status(job.id, RUNNING)
+                print(f"[job {job.id}] {job.kind} 시작")
+                job.result = await run(job)
+                job.status = SUCCEEDED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            print(f"❌ [job {job.id}] {job.kind} 실패: {e}")
+        finally:
+            if job.id in self._waiting:
+                self._waiting.remove(job.id)
+            job.finished_at = time.time()
+            self.progress.set_status(job.id, job.status, error=job.error)
+            if job.status == SUCCEEDED:
+                print(f"✅ [job {job.id}] {job.kind} 완료 ({job.finished_at - job.started_at:.1f}s)")
+
+    async def run_stage(self, stage: str, fn: Callable, *args, **kwargs):
+        """fn을 해당 단계 전용 스레드 풀에서 실행 (단계별 동시 실행 수 제한)."""
+        executor = self._executors.get(stage)
+        if executor is None:
+            raise ValueError(f"알 수 없는 단계: {stage} ({', '.join(self._executors)})")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+
+    def _prune(self):
+        """보관 시간이 지난 완료 job 제거."""
+        cutoff = time.time() - self.result_ttl_sec
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
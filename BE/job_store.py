@@ -0,0 +1,273 @@
+"""
+SQLite 기반 분석 job 대기열 (ANALYSIS_MODE=queue)
+
+웹 프로세스(main.py)는 업로드를 저장하고 job을 여기에 넣기만 하고, 별도 워커 프로세스
+(analysis_worker.py)가 job을 가져가 분석합니다. 외부 브로커 없이 같은 디스크(볼륨)를 공유하는
+프로세스끼리 동작하므로, 웹 프로세스는 ML 모델을 메모리에 올리지 않고 워커 수는 따로 늘릴 수 있습니다.
+
+- claim은 BEGIN IMMEDIATE 트랜잭션으로 처리해 여러 워커가 같은 job을 가져가지 않음
+- 워커는 실행 중 진행률 스냅샷과 heartbeat를 주기적으로 기록. heartbeat가 JOB_STALE_SEC 이상 끊긴 job은
+  워커가 죽은 것으로 보고 대기열로 되돌림 (JOB_MAX_ATTEMPTS회를 넘으면 실패 처리)
+- 결과·진행률은 JSON 문자열로 저장, 완료 후 JOB_RESULT_TTL_SEC이 지나면 삭제
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from job_scheduler import (
+    FAILED, JOB_QUEUE_SIZE, JOB_RESULT_TTL_SEC, QUEUED, RUNNING, SUCCEEDED, QueueFullError,
+)
+
+JOB_STORE_PATH = Path(os.getenv("JOB_STORE_PATH", "results/jobs.sqlite3"))
+# 워커 heartbeat가 이 시간(초) 이상 없으면 워커가 죽은 것으로 판단
+JOB_STALE_SEC = max(30, int(os.getenv("JOB_STALE_SEC", "300") or 300))
+# 워커가 죽어 다시 대기열로 돌릴 수 있는 최대 실행 횟수
+JOB_MAX_ATTEMPTS = max(1, int(os.getenv("JOB_MAX_ATTEMPTS", "2") or 2))
+# 웹 프로세스의 상태 확인(SSE·동기 응답 대기)과 유휴 워커의 대기열 확인 간격(초)
+JOB_STORE_POLL_SEC = max(0.1, float(os.getenv("JOB_STORE_POLL_SEC", "1") or 1))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    meta TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    progress TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+_JSON_COLUMNS = ("payload", "meta", "result", "progress")
+
+
+def _dumps(value) -> Optional[str]:
+    return None if value is None else json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _decode(row: Optional[sqlite3.Row]) -> Optional[dict]:
+    if row is None:
+        return None
+    record = dict(row)
+    for column in _JSON_COLUMNS:
+        if record.get(column) is not None:
+            record[column] = json.loads(record[column])
+    return record
+
+
+class JobStore:
+    def __init__(self, path=JOB_STORE_PATH, queue_size: int = JOB_QUEUE_SIZE,
+                 result_ttl_sec: int = JOB_RESULT_TTL_SEC, stale_sec: int = JOB_STALE_SEC,
+                 max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.queue_size = queue_size
+        self.result_ttl_sec = result_ttl_sec
+        self.stale_sec = stale_sec
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """호출마다 새 연결 (스레드·프로세스 간 공유하지 않음). 트랜잭션은 명시적으로 시작."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    # ----------------------------
+    # 웹 프로세스
+    # ----------------------------
+    def enqueue(self, kind: str, payload: dict, meta: Optional[dict] = None) -> dict:
+        """job 등록. 대기+실행 중 job이 queue_size 이상이면 QueueFullError."""
+        self.prune()
+        job_id = uuid.uuid4().hex
+        with self._transaction() as conn:
+            active = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+            if active >= self.queue_size:
+                raise QueueFullError(self.queue_size)
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, meta, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, _dumps(payload), _dumps(meta or {}), time.time()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            return _decode(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def active_count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+
+    def queue_position(self, record: dict) -> Optional[int]:
+        """대기 중이면 1부터 시작하는 대기 순번, 아니면 None."""
+        if record["status"] != QUEUED:
+            return None
+        with self._connect() as conn:
+            ahead = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?", (QUEUED, record["created_at"])
+            ).fetchone()[0]
+        return ahead + 1
+
+    def progress(self, record: dict) -> dict:
+        """
+        진행률 스냅샷 (ProgressTracker.get과 같은 형식). 워커가 기록한 값에 job 상태를 덮어써서,
+        워커가 죽어 실패 처리된 job도 올바른 상태로 보이게 함.
+        """
+        snapshot = dict(record["progress"] or {
+            "job_id": record["id"],
+            "stage": record["status"],
+            "percent": 0,
+            "eta_sec": None,
+            "version": 0,
+            "components": {},
+        })
+        snapshot["status"] = record["status"]
+        if record["status"] == SUCCEEDED:
+            snapshot.update(percent=100, stage="완료", eta_sec=0)
+        elif record["status"] == FAILED:
+            snapshot.update(stage="실패", eta_sec=0, error=record["error"])
+        return snapshot
+
+    def describe(self, record: dict, include_result: bool = True) -> dict:
+        """JobScheduler.describe와 같은 형식의 job 정보."""
+        data = {
+            "job_id": record["id"],
+            "kind": record["kind"],
+            "status": record["status"],
+            "created_at": record["created_at"],
+            "started_at": record["started_at"],
+            "finished_at": record["finished_at"],
+            **record["meta"],
+        }
+        position = self.queue_position(record)
+        if position is not None:
+            data["queue_position"] = position
+        if record["error"] is not None:
+            data["error"] = record["error"]
+        if include_result and record["status"] == SUCCEEDED:
+            data["result"] = record["result"]
+        data["progress"] = self.progress(record)
+        return data
+
+    # ----------------------------
+    # 워커 프로세스
+    # ----------------------------
+    def claim(self, worker_id: str, kinds: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """가장 오래 기다린 job 하나를 실행 상태로 바꾸고 반환 (없으면 None)."""
+        query = "SELECT id FROM jobs WHERE status = ?"
+        params: list = [QUEUED]
+        if kinds:
+            kinds = list(kinds)
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params += kinds
+        query += " ORDER BY created_at LIMIT 1"
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, started_at = ?, heartbeat_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, worker_id, now, now, row["id"]),
+            )
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: str, progress: Optional[dict] = None):
+        with self._connect() as conn:
+            if progress is None:
+                conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+            else:
+                conn.execute(
+                    "UPDATE jobs SET heartbeat_at = ?, progress = ? WHERE id = ?",
+                    (time.time(), _dumps(progress), job_id),
+                )
+
+    def finish(self, job_id: str, status: str, result=None, error: Optional[str] = None,
+               progress: Optional[dict] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, progress = COALESCE(?, progress), "
+                "finished_at = ? WHERE id = ?",
+                (status, _dumps(result), error, _dumps(progress), time.time(), job_id),
+            )
+
+    def requeue(self, job_id: str):
+        """워커 종료 시 실행 중이던 job을 대기열로 되돌림 (실행 횟수는 차감)."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = NULL, started_at = NULL, heartbeat_at = NULL, "
+                "progress = NULL, attempts = MAX(attempts - 1, 0) WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING),
+            )
+
+    def recover_stale(self) -> List[dict]:
+        """
+        heartbeat가 끊긴 실행 중 job을 대기열로 되돌리거나(실행 횟수가 남은 경우) 실패 처리.
+        실패 처리된 job 목록을 반환 (호출한 쪽에서 업로드 임시 파일 정리).
+        """
+        cutoff = time.time() - self.stale_sec
+        failed = []
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ? AND heartbeat_at < ?", (RUNNING, cutoff)
+            ).fetchall()
+            for row in rows:
+                if row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                        (FAILED, f"워커가 응답하지 않습니다 ({row['attempts']}회 실행).", time.time(), row["id"]),
+                    )
+                    failed.append(row["id"])
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker_id = NULL, started_at = NULL, heartbeat_at = NULL, "
+                        "progress = NULL WHERE id = ?",
+                        (QUEUED, row["id"]),
+                    )
+        for row in rows:
+            print(f"⚠️ [job {row['id']}] 워커 heartbeat 끊김 → {'실패 처리' if row['id'] in failed else '재시도 대기'}")
+        return [self.get(job_id) for job_id in failed]
+
+    def prune(self):
+        """보관 시간이 지난 완료 job 삭제."""
+        cutoff = time.time() - self.result_ttl_sec
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (SUCCEEDED, FAILED, cutoff)
+            )
@@ -2,19 +2,31 @@ from pathlib import Path
 from datetime import datetime
 import math
 from functools import partial
-from fastapi import FastAPI, UploadFile, File, Form, Body
-from fastapi.responses import StreamingResponse
+from typing import Optional
+from fastapi import FastAPI, UploadFile, File, Form, Body, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import os, asyncio, json, shutil
+import os, asyncio, json, shutil, threading, time, uuid
 import numpy as np
 
-from video_analyzer import analyze_video, set_progress, get_progress
+from video_features import recompute_video_result
+from job_scheduler import FAILED, SUCCEEDED, JobScheduler, QueueFullError
+from job_store import JOB_STORE_POLL_SEC, JobStore
+from upload_utils import UploadTooLargeError, save_upload
+from result_cache import ResultCache
+from pipeline import Pipeline, PipelineError
+from shared_buffers import cleanup_stale as cleanup_shared_buffers
+from stt_parallel import shutdown_workers as shutdown_stt_workers
 from stt_processor import (
-    extract_audio,
+    load_audio_pcm,
     whisper_transcribe,
     process_single_video,
+    save_stt_outputs,
     get_stt_progress,
     analyze_voice_rhythm_and_patterns,
+    stt_config,
+    voice_analysis_config,
+    warm_up_stt_model,
 )
 
 from combined_feedback_generator import generate_combined_feedback_report
@@ -28,6 +40,27 @@ FIREBASE_CRED_PATH = os.getenv("FIREBASE_CRED_PATH", "serviceAccountKey.json")
 FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID")
 GOOGLE_APPLICATION_CREDENTIALS_JSON = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
 
+# 프레임별 특징 시계열(npz) 저장: 임계값 변경 시 영상 재분석 없이 재계산용
+VIDEO_SAVE_FEATURES = os.getenv("VIDEO_SAVE_FEATURES", "true").lower() in {"1", "true", "yes", "on"}
+VIDEO_FEATURE_DIR = Path(os.getenv("VIDEO_FEATURE_DIR", "results/features"))
+# /analyze/video job 전체 진행률 계산 시 단계별 비율
+VIDEO_JOB_PROGRESS_WEIGHTS = {"vision": 0.45, "stt": 0.35, "llm": 0.15, "persist": 0.05}
+# SSE 진행률 스트림: 변화가 없을 때 heartbeat 간격, 이 시간 동안 변화가 없으면 스트림 종료
+PROGRESS_HEARTBEAT_SEC = float(os.getenv("PROGRESS_HEARTBEAT_SEC", "15"))
+PROGRESS_STREAM_TIMEOUT_SEC = float(os.getenv("PROGRESS_STREAM_TIMEOUT_SEC", "900"))
+GLOBAL_PROGRESS_KEY = "__global__"
+# 서버 시작 시 MediaPipe 모델 풀을 미리 만들어 첫 요청 지연을 없앰
+VIDEO_MODEL_WARMUP = os.getenv("VIDEO_MODEL_WARMUP", "true").lower() in {"1", "true", "yes", "on"}
+# 서버 시작 시 STT 모델을 로딩하고 짧게 추론해 첫 요청의 모델 로딩 대기를 없앰
+STT_MODEL_WARMUP = os.getenv("STT_MODEL_WARMUP", "true").lower() in {"1", "true", "yes", "on"}
+# inline: 이 프로세스에서 분석 실행 / queue: 업로드·결과 조회만 하고 분석은 analysis_worker.py 프로세스가 실행
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "inline").lower()
+if ANALYSIS_MODE not in {"inline", "queue"}:
+    ANALYSIS_MODE = "inline"
+# queue 모드의 동기 응답 API(/analyze/stt, /analyze/upload-feedback)가 워커 결과를 기다리는 최대 시간(초).
+# 넘으면 202와 job_id를 반환하고 결과는 /analyze/jobs/{job_id}로 조회
+JOB_SYNC_WAIT_SEC = float(os.getenv("JOB_SYNC_WAIT_SEC", "600") or 600)
+
 
 import base64
 
@@ -74,6 +107,38 @@ def _init_firestore():
 db = _init_firestore()
 
 app = FastAPI()
+scheduler = JobScheduler()
+result_cache = ResultCache()
+# queue 모드에서 워커 프로세스와 공유하는 job 대기열
+job_store = JobStore() if ANALYSIS_MODE == "queue" else None
+
+# video_analyzer(cv2·MediaPipe)는 영상 분석이 처음 필요할 때 import
+# (결과 조회·요약 API만 쓰는 프로세스는 ML 스택을 로딩하지 않음)
+_video_analyzer_module = None
+_video_analyzer_lock = threading.Lock()
+
+
+def _video_analyzer():
+    global _video_analyzer_module
+    if _video_analyzer_module is None:
+        with _video_analyzer_lock:
+            if _video_analyzer_module is None:
+                import video_analyzer
+                # 기존 전역 진행률(/analyze/progress) 변경도 구독자에게 push
+                video_analyzer.add_progress_listener(
+                    lambda _: scheduler.progress.broadcaster.publish(GLOBAL_PROGRESS_KEY)
+                )
+                _video_analyzer_module = video_analyzer
+    return _video_analyzer_module
+
+
+def get_progress() -> int:
+    """video_analyzer 전역 진행률 (아직 import되지 않았으면 분석이 없었으므로 0)."""
+    if _video_analyzer_module is None:
+        return 0
+    return _video_analyzer_module.get_progress()
+
+
 app.include_router(summary_router)
 
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*")
@@ -92,6 +157,74 @@ app.add_middleware(
 )
 
 
+# 모델 워밍업 상태 (/ready 응답용): pending → loading → ok | skipped | failed
+_readiness = {
+    "components": {"stt": "pending", "vision": "pending"},
+    "errors": {},
+    "started_at": None,
+    "finished_at": None,
+}
+_warmup_task = None
+
+
+async def _warm_up_component(name: str, enabled: bool, fn):
+    if not enabled:
+        _readiness["components"][name] = "skipped"
+        return
+    _readiness["components"][name] = "loading"
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, fn)
+        _readiness["components"][name] = "ok"
+    except Exception as e:
+        # 워밍업 실패는 치명적이지 않음: 첫 요청에서 모델을 다시 로딩 시도
+        _readiness["components"][name] = "failed"
+        _readiness["errors"][name] = str(e)
+        print(f"⚠️ {name} 모델 워밍업 실패: {e}")
+
+
+async def _warm_up_all():
+    _readiness["started_at"] = time.time()
+    await asyncio.gather(
+        # queue 모드의 웹 프로세스는 모델을 쓰지 않음 (워커가 워밍업)
+        _warm_up_component("stt", STT_MODEL_WARMUP and job_store is None, warm_up_stt_model),
+        _warm_up_component("vision", VIDEO_MODEL_WARMUP and job_store is None,
+                           lambda: _video_analyzer().warm_up_model_pool()),
+    )
+    _readiness["finished_at"] = time.time()
+    print(f"✅ 모델 준비 완료 ({_readiness['finished_at'] - _readiness['started_at']:.1f}s): {_readiness['components']}")
+
+
+@app.on_event("startup")
+async def warm_up_models():
+    # 포트는 바로 열고(플랫폼 헬스체크 타임아웃 방지) 모델은 백그라운드에서 로딩, 준비 여부는 /ready로 확인
+    global _warmup_task
+    # 이전 프로세스가 강제 종료되며 남긴 공유 버퍼 파일 정리
+    cleanup_shared_buffers()
+    _warmup_task = asyncio.create_task(_warm_up_all())
+
+
+@app.get("/ready")
+def ready():
+    """모델 워밍업이 끝나면 200, 진행 중이면 503. 워밍업에 실패한 구성요소는 degraded로 표시."""
+    body = {
+        "ready": _readiness["finished_at"] is not None,
+        "degraded": bool(_readiness["errors"]),
+        "components": dict(_readiness["components"]),
+        "errors": dict(_readiness["errors"]),
+    }
+    if not body["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@app.on_event("shutdown")
+def release_models():
+    scheduler.shutdown()
+    if _video_analyzer_module is not None:
+        _video_analyzer_module.close_model_pools()
+    shutdown_stt_workers()
+
+
 def save_video_analysis_file(result: dict, filename: str, output_dir: Path) -> str:
     """비디오 분석 결과를 지정한 디렉터리에 저장하고 경로를 반환합니다."""
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -111,6 +244,58 @@ def save_combined_analysis_file(video_result: dict, stt_result: dict, filename:
     return str(output_path)
 
 
+def analyze_video_cached(video_path: str, content_hash: str, feature_path: str = None, progress_cb=None) -> dict:
+    """
+    결과 캐시를 먼저 확인하고, 없으면 analyze_video 실행 후 저장 (단계 스레드 풀에서 실행).
+    캐시된 결과의 특징 시계열 파일은 이번 요청의 feature_path로 복사.
+    """
+    video_analyzer = _video_analyzer()
+    config = video_analyzer.analysis_config()
+    cached = result_cache.get("video", content_hash, config)
+    if cached is None:
+        result = video_analyzer.analyze_video(video_path, feature_path=feature_path, progress_cb=progress_cb)
+        result_cache.put("video", content_hash, config, result)
+        return result
+
+    print(f"♻️ 영상 분석 캐시 사용 ({content_hash[:12]})")
+    metadata = cached.get("metadata", {})
+    source = metadata.pop("feature_file", None)
+    if source and feature_path and Path(source).exists():
+        if Path(source).resolve() != Path(feature_path).resolve():
+            Path(feature_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, feature_path)
+        metadata["feature_file"] = feature_path
+    if progress_cb is not None:
+        progress_cb(100, stage="캐시 사용")
+    return cached
+
+
+def transcribe_and_cache(pcm, content_hash: str, progress_cb=None):
+    """whisper_transcribe 실행 후 결과 캐시에 저장 (캐시 조회는 오디오 디코딩 전에 수행)."""
+    result = whisper_transcribe(pcm, progress_cb)
+    result_cache.put("stt", content_hash, stt_config(), result)
+    return result
+
+
+def voice_analysis_cached(stt_result: dict, content_hash: str) -> dict:
+    """WPM/무음/언어습관(LLM) 분석 결과를 업로드 해시 + STT·LLM 설정 기준으로 캐시."""
+    config = voice_analysis_config()
+    cached = result_cache.get("voice", content_hash, config)
+    if cached is not None:
+        print(f"♻️ 음성 분석 캐시 사용 ({content_hash[:12]})")
+        return cached
+    result = analyze_voice_rhythm_and_patterns(stt_result)
+    result_cache.put("voice", content_hash, config, result)
+    return result
+
+
+def feature_file_path(output_dir: Path, filename: str):
+    """특징 시계열 저장 경로. VIDEO_SAVE_FEATURES가 꺼져 있으면 None."""
+    if not VIDEO_SAVE_FEATURES:
+        return None
+    return str(Path(output_dir) / f"{Path(filename).stem}_features.npz")
+
+
 def create_run_dirs(run_id: str):
     base = Path("results") / run_id
     video_dir = base / "video"
@@ -188,224 +373,514 @@ def _sanitize_for_firestore(obj):
         return str(obj)
 
 
-@app.post("/analyze/video")
+@app.post("/analyze/video", status_code=202)
 async def analyze_video_api(
     user_id: str = Form(...),  # 로그인된 user ID를 받음
     project_id: str = Form(...),  # 선택된 프로젝트 ID
     file: UploadFile = File(...)):
     """
-    업로드된 영상 파일을 분석하여 시선/자세 분석과 음성 분석을 실행하고,
-    진행률은 /analyze/progress 에서 실시간 스트리밍됩니다.
-    결과는 Firestore에 저장합니다. 저장 위치:
+    업로드된 영상 파일을 분석 job으로 등록하고 job_id를 즉시 반환합니다.
+    결과는 GET /analyze/jobs/{job_id} 로 조회하며, Firestore에도 저장합니다. 저장 위치:
     users/{user_id}/projects/{project_id}/feedback/{presentation_id}
+    대기열이 가득 차면 429를 반환합니다.
     """
+    try:
+        # user_id/project_id는 임시 디렉터리·특징 파일 경로와 Firestore 문서 경로에 쓰임
+        _check_path_ids(user_id, project_id)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": f"❌ {e}"})
+
     base_name = os.path.splitext(file.filename)[0]
-    temp_dir = f"temp_{user_id}_{base_name}"
+    # queue 모드에서는 워커가 이 경로를 읽으므로 절대 경로로 전달.
+    # job은 나중에 실행되므로 같은 파일을 다시 올려도 앞 job의 입력을 덮어쓰지 않도록 요청마다 고유 디렉터리 사용
+    temp_dir = os.path.abspath(f"temp_{user_id}_{base_name}_{uuid.uuid4().hex[:12]}")
     os.makedirs(temp_dir, exist_ok=True)
 
     temp_video_path = os.path.join(temp_dir, file.filename)
-    temp_audio_path = os.path.join(temp_dir, f"{base_name}.wav")
 
-    contents = await file.read()
-    with open(temp_video_path, "wb") as f:
-        f.write(contents)
+    try:
+        upload_size, upload_sha256 = await save_upload(file, temp_video_path)
+    except UploadTooLargeError as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return _upload_too_large_response(e)
+
+    print(f"[analyze_video] user_id={user_id}, project_id={project_id}, file={file.filename}, "
+          f"size={upload_size / (1024 * 1024):.1f}MB, sha256={upload_sha256[:12]}")
+
+    payload = {
+        "user_id": user_id,
+        "project_id": project_id,
+        "filename": file.filename,
+        "temp_dir": temp_dir,
+        "temp_video_path": temp_video_path,
+        "content_hash": upload_sha256,
+    }
+    try:
+        job_info = _submit_job("video", payload, meta={
+            "user_id": user_id,
+            "project_id": project_id,
+            "presentation_id": base_name,
+            "upload_sha256": upload_sha256,
+        })
+    except QueueFullError as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return _queue_full_response(e)
+
+    return {
+        "message": "분석 요청이 접수되었습니다. /analyze/jobs/{job_id} 에서 결과를 확인하세요.",
+        **job_info,
+    }
+
 
-    print(f"[analyze_video] user_id={user_id}, project_id={project_id}, file={file.filename}")
+@app.get("/analyze/jobs/{job_id}")
+def get_job_api(job_id: str):
+    """분석 job 상태 조회. 완료되면 result 필드에 분석 결과가 포함됩니다."""
+    job_info = _describe_job(job_id)
+    if job_info is None:
+        return JSONResponse(status_code=404, content={"message": f"❌ 존재하지 않는 job: {job_id}"})
+    return job_info
+
+
+@app.get("/analyze/jobs/{job_id}/progress")
+def get_job_progress_api(job_id: str):
+    """job 진행률 폴링용 (stage, percent, frames_processed, eta_sec 등)."""
+    progress = _job_progress(job_id)
+    if progress is None:
+        return JSONResponse(status_code=404, content={"message": f"❌ 존재하지 않는 job: {job_id}"})
+    return progress
+
+
+# ----------------------------
+# job 실행 위치 (ANALYSIS_MODE) 분기
+# ----------------------------
+def _submit_job(kind: str, payload: dict, meta: dict) -> dict:
+    """
+    inline: 이 프로세스의 JobScheduler에서 JOB_RUNNERS[kind](job, **payload) 실행
+    queue: job_store에 넣고 analysis_worker 프로세스가 실행
+    대기열이 가득 차면 QueueFullError. 등록된 job 정보(describe 형식)를 반환.
+    """
+    if job_store is not None:
+        return job_store.describe(job_store.enqueue(kind, payload, meta))
+    job = scheduler.submit(kind, partial(_run_inline, kind, payload=payload), meta=meta,
+                           weights=JOB_PROGRESS_WEIGHTS.get(kind))
+    return scheduler.describe(job)
+
+
+def cleanup_job_uploads(payload: dict):
+    """
+    job 입력(업로드 임시 파일) 정리. 분석 함수(JOB_RUNNERS)는 입력을 지우지 않고 job을 실행한 쪽이 정리
+    (워커는 종료 신호로 중단된 job을 대기열로 되돌릴 때 입력을 남겨 둬야 하므로).
+    """
+    if payload.get("temp_dir"):
+        shutil.rmtree(payload["temp_dir"], ignore_errors=True)
+    if payload.get("temp_path"):
+        Path(payload["temp_path"]).unlink(missing_ok=True)
 
-    loop = asyncio.get_event_loop()
 
+async def _run_inline(kind: str, job, payload: dict):
+    """inline 모드: 이 프로세스에서 job을 실행하고, 끝나면(실패·취소 포함) 업로드 정리."""
     try:
-        gaze_task = loop.run_in_executor(None, analyze_video, temp_video_path)
-        await loop.run_in_executor(None, extract_audio, temp_video_path, temp_audio_path)
-        stt_task = loop.run_in_executor(None, whisper_transcribe, temp_audio_path)
+        return await JOB_RUNNERS[kind](job, **payload)
+    finally:
+        cleanup_job_uploads(payload)
 
-        gaze_results = await gaze_task
-        stt_results = await stt_task
 
-        # 추가 음성 분석(WPM, pause 등) 계산
-        try:
-            voice_analysis = analyze_voice_rhythm_and_patterns(stt_results)
-            stt_results["voice_analysis"] = voice_analysis
-        except Exception as e:
-            print(f"⚠️ voice_analysis 계산 실패: {e}")
-
-        # 프로젝트에 저장된 대본과 발화 텍스트 유사도 계산 (AI 피드백 이전에 수행)
-        logic_similarity = None
-        logic_feedback = []
-        try:
-            project_ref = (
-                db.collection("users")
-                .document(user_id)
-                .collection("projects")
-                .document(project_id)
-            )
-            project_doc = project_ref.get()
-            project_data = project_doc.to_dict() or {}
-            script_text = project_data.get("scriptText") or project_data.get("script")
-            spoken_text = (
-                stt_results.get("full_text")
-                or stt_results.get("text_for_logic_analysis")
-                or stt_results.get("scriptRecognized")
-                or ""
-            )
-            if script_text:
-                logic_similarity, logic_feedback = _compute_script_similarity(script_text, spoken_text)
-                stt_results["logic_similarity"] = logic_similarity
-                stt_results["logic_feedback"] = logic_feedback
-        except Exception as e:
-            print(f"⚠️ 대본 유사도 계산 실패: {e}")
-
-        # 저장용으로 간소화/정제 (Firestore 호환)
-        if isinstance(gaze_results, dict) and "gaze" in gaze_results:
-            # trace_sample은 길고 array 타입이 많아 문제가 될 수 있어 제거
-            gaze_results = dict(gaze_results)
-            if isinstance(gaze_results.get("gaze"), dict) and "trace_sample" in gaze_results["gaze"]:
-                gaze_results["gaze"] = dict(gaze_results["gaze"])
-                gaze_results["gaze"].pop("trace_sample", None)
-
-        gaze_results = _sanitize_for_firestore(gaze_results)
-        stt_results = _sanitize_for_firestore(stt_results)
-
-        # ---------------------------------------------------------
-        # 3. AI 피드백 생성 (OpenRouter LLM)
-        # ---------------------------------------------------------
-        feedback_data = {}
-        try:
-            print(f"[analyze_video] AI 피드백 생성 시작...")
-            feedback_data = generate_combined_feedback_report(
-                video_result=gaze_results,
-                stt_result=stt_results,
-                user_id=user_id,
-                run_id=base_name,
-                original_filename=file.filename
-            )
-            print(f"[analyze_video] AI 피드백 생성 완료")
-        except Exception as e:
-            print(f"⚠️ AI 피드백 생성 실패: {e}")
-
-        # ---------------------------------------------------------
-        # 4. Firestore 저장
-        # ---------------------------------------------------------
-        feedback_doc = _feedback_doc(user_id, project_id, base_name)
-        existing = feedback_doc.get()
-        existing_data = existing.to_dict() if existing.exists else {}
-        created_at_value = existing_data.get("created_at") or firestore.SERVER_TIMESTAMP
+class JobPendingError(Exception):
+    """queue 모드 동기 응답 API에서 JOB_SYNC_WAIT_SEC 안에 job이 끝나지 않음 (또는 클라이언트 연결 종료)."""
+
+    def __init__(self, job_id: str):
+        super().__init__(f"분석이 아직 진행 중입니다. /analyze/jobs/{job_id} 에서 결과를 확인하세요.")
+        self.job_id = job_id
+
+
+async def _run_in_worker(kind: str, payload: dict, request: Request, meta: Optional[dict] = None):
+    """
+    queue 모드의 동기 응답 API용: job을 넣고 워커가 끝낼 때까지 기다려 결과를 반환.
+    JOB_SYNC_WAIT_SEC 안에 끝나지 않거나 클라이언트 연결이 끊기면 기다리지 않고 JobPendingError
+    (job은 워커에서 계속 실행되고 결과는 /analyze/jobs/{job_id}로 조회).
+    """
+    record = job_store.enqueue(kind, payload, meta)
+    job_id = record["id"]
+    deadline = time.monotonic() + JOB_SYNC_WAIT_SEC
+    while record is not None and record["status"] not in (SUCCEEDED, FAILED):
+        if time.monotonic() >= deadline or await request.is_disconnected():
+            raise JobPendingError(job_id)
+        await asyncio.sleep(JOB_STORE_POLL_SEC)
+        record = job_store.get(job_id)
+    if record is None:
+        raise RuntimeError(f"job 정보가 사라졌습니다: {job_id}")
+    if record["status"] == FAILED:
+        raise RuntimeError(record["error"])
+    return record["result"]
+
+
+def _describe_job(job_id: str, include_result: bool = True) -> Optional[dict]:
+    if job_store is not None:
+        record = job_store.get(job_id)
+        return job_store.describe(record, include_result) if record else None
+    job = scheduler.get(job_id)
+    return scheduler.describe(job, include_result) if job else None
+
+
+def _job_progress(job_id: str) -> Optional[dict]:
+    if job_store is not None:
+        record = job_store.get(job_id)
+        return job_store.progress(record) if record else None
+    return scheduler.progress.get(job_id)
+
+
+def _active_job_count() -> int:
+    return job_store.active_count() if job_store is not None else scheduler.active_count()
+
+
+async def _watch_job_store(job_id: str, heartbeat_sec: float):
+    """ProgressTracker.watch와 같은 규칙으로 job_store를 JOB_STORE_POLL_SEC 간격으로 확인 (queue 모드)."""
+    last_key = None
+    last_sent = time.monotonic()
+    while True:
+        record = job_store.get(job_id)
+        if record is None:
+            return
+        snapshot = job_store.progress(record)
+        key = (snapshot["status"], snapshot.get("version"))
+        if key != last_key:
+            last_key = key
+            last_sent = time.monotonic()
+            yield snapshot
+            if snapshot["status"] in (SUCCEEDED, FAILED):
+                return
+        elif time.monotonic() - last_sent >= heartbeat_sec:
+            last_sent = time.monotonic()
+            yield None
+        await asyncio.sleep(JOB_STORE_POLL_SEC)
+
+
+def _upload_too_large_response(error: UploadTooLargeError) -> JSONResponse:
+    return JSONResponse(
+        status_code=413,
+        content={"message": f"❌ {error}", "max_bytes": error.max_bytes},
+    )
+
+
+def _job_pending_response(error: JobPendingError) -> JSONResponse:
+    return JSONResponse(status_code=202, content={"message": str(error), **(_describe_job(error.job_id, False) or {"job_id": error.job_id})})
+
+
+def _queue_full_response(error: QueueFullError) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(error.retry_after)},
+        content={
+            "message": str(error),
+            "queue_size": error.queue_size,
+            "queue_position": _active_job_count() + 1,
+            "retry_after": error.retry_after,
+        },
+    )
+
+
+def _add_analysis_stages(pipeline: Pipeline, video_path: str, content_hash: str, feature_path: str = None,
+                         vision_progress=None, stt_progress=None) -> Pipeline:
+    """
+    공통 분석 단계 추가: decode-video(시선/자세) ∥ extract-audio → transcribe → voice-analysis.
+    영상 분석과 오디오 디코딩·STT가 동시에 시작되고, 결과 캐시가 있으면 해당 단계는 즉시 끝남.
+    """
+    cached_stt = result_cache.get("stt", content_hash, stt_config())
+
+    async def decode_video():
+        return await scheduler.run_stage(
+            "vision", analyze_video_cached, video_path, content_hash,
+            feature_path=feature_path, progress_cb=vision_progress,
+        )
+
+    async def extract_audio():
+        if cached_stt is not None:
+            return None
+        if stt_progress is not None:
+            stt_progress(5, "오디오 추출")
+        return await scheduler.run_stage("stt", load_audio_pcm, video_path)
+
+    async def transcribe(pcm):
+        if cached_stt is not None:
+            print(f"♻️ STT 캐시 사용 ({content_hash[:12]})")
+            result = cached_stt
+        else:
+            result = await scheduler.run_stage("stt", transcribe_and_cache, pcm, content_hash, stt_progress)
+        if not result:
+            raise RuntimeError("STT 전사에 실패했습니다.")
+        if stt_progress is not None:
+            stt_progress(100, "STT 완료")
+        return result
+
+    async def voice_analysis(stt_result):
+        return await scheduler.run_stage("llm", voice_analysis_cached, stt_result, content_hash)
+
+    return (
+        pipeline
+        .add("decode-video", decode_video)
+        .add("extract-audio", extract_audio)
+        .add("transcribe", transcribe, deps=["extract-audio"])
+        .add("voice-analysis", voice_analysis, deps=["transcribe"], optional=True)
+    )
+
+
+def _combine_stt_result(stt_result: dict, voice_analysis: dict = None, similarity=None) -> dict:
+    """STT 결과에 음성 분석·대본 유사도를 합친 사본 (단계 간 공유 dict를 직접 수정하지 않음)."""
+    combined = dict(stt_result)
+    if voice_analysis is not None:
+        combined["voice_analysis"] = voice_analysis
+    if similarity is not None:
+        combined["logic_similarity"], combined["logic_feedback"] = similarity
+    return combined
 
+
+def _vision_for_storage(gaze_results: dict) -> dict:
+    """저장용으로 간소화/정제 (Firestore 호환)."""
+    if isinstance(gaze_results, dict) and "gaze" in gaze_results:
+        # trace_sample은 길고 array 타입이 많아 문제가 될 수 있어 제거
+        gaze_results = dict(gaze_results)
+        if isinstance(gaze_results.get("gaze"), dict) and "trace_sample" in gaze_results["gaze"]:
+            gaze_results["gaze"] = dict(gaze_results["gaze"])
+            gaze_results["gaze"].pop("trace_sample", None)
+    return _sanitize_for_firestore(gaze_results)
+
+
+def _script_similarity(user_id: str, project_id: str, stt_results: dict):
+    """프로젝트에 저장된 대본과 발화 텍스트 유사도. 대본이 없으면 None."""
+    project_ref = (
+        db.collection("users")
+        .document(user_id)
+        .collection("projects")
+        .document(project_id)
+    )
+    project_doc = project_ref.get()
+    project_data = project_doc.to_dict() or {}
+    script_text = project_data.get("scriptText") or project_data.get("script")
+    spoken_text = (
+        stt_results.get("full_text")
+        or stt_results.get("text_for_logic_analysis")
+        or stt_results.get("scriptRecognized")
+        or ""
+    )
+    if not script_text:
+        return None
+    return _compute_script_similarity(script_text, spoken_text)
+
+
+def _persist_feedback(user_id: str, project_id: str, base_name: str, payload: dict):
+    """피드백 문서 저장 (created_at은 최초 저장 시각 유지)."""
+    feedback_doc = _feedback_doc(user_id, project_id, base_name)
+    existing = feedback_doc.get()
+    existing_data = existing.to_dict() if existing.exists else {}
+    payload["created_at"] = existing_data.get("created_at") or firestore.SERVER_TIMESTAMP
+    payload["updated_at"] = firestore.SERVER_TIMESTAMP
+    try:
+        feedback_doc.set(payload, merge=True)
+        print(f"[analyze_video] Firestore 저장 완료 -> users/{user_id}/projects/{project_id}/feedback/{base_name}")
+    except Exception as e:
+        print(f"❌ Firestore 업로드 실패: {e}")
+        print(f"payload keys: {list(payload.keys())}")
+
+
+async def _run_video_job(job, user_id: str, project_id: str, filename: str,
+                         temp_dir: str, temp_video_path: str,
+                         content_hash: str = None) -> dict:
+    """
+    /analyze/video job 본체. 단계 DAG:
+    decode-video ∥ extract-audio → transcribe → (voice-analysis ∥ script-similarity) → llm-report → persist
+    content_hash(업로드 sha256)가 같고 설정이 같으면 영상/STT/음성 분석은 결과 캐시를 재사용.
+    """
+    base_name = os.path.splitext(filename)[0]
+    progress = scheduler.progress
+    feature_path = feature_file_path(VIDEO_FEATURE_DIR / user_id / project_id, base_name)
+    if feature_path and not Path(feature_path).resolve().is_relative_to(VIDEO_FEATURE_DIR.resolve()):
+        raise ValueError(f"특징 파일 경로가 VIDEO_FEATURE_DIR 밖입니다: {feature_path}")
+
+    async def script_similarity(stt_results):
+        return await scheduler.run_stage("io", _script_similarity, user_id, project_id, stt_results)
+
+    async def llm_report(gaze_results, stt_results, voice, similarity):
+        print(f"[analyze_video] AI 피드백 생성 시작...")
+        progress.update(job.id, "llm", 10, "AI 피드백 생성")
+        feedback_data = await scheduler.run_stage(
+            "llm",
+            generate_combined_feedback_report,
+            video_result=_vision_for_storage(gaze_results),
+            stt_result=_sanitize_for_firestore(_combine_stt_result(stt_results, voice, similarity)),
+            user_id=user_id,
+            run_id=base_name,
+            original_filename=filename,
+        )
+        print(f"[analyze_video] AI 피드백 생성 완료")
+        progress.update(job.id, "llm", 100)
+        return feedback_data
+
+    async def persist(gaze_results, stt_results, voice, similarity, feedback_data):
+        gaze_results = _vision_for_storage(gaze_results)
+        stt_results = _sanitize_for_firestore(_combine_stt_result(stt_results, voice, similarity))
+        feedback_data = feedback_data or {}
+        logic_similarity, logic_feedback = similarity or (None, [])
         payload = {
             "stt_analysis": stt_results,
             "vision_analysis": gaze_results,
-            "original_filename": file.filename,
+            "original_filename": filename,
             "project_id": project_id,
             "user_id": user_id,
             "presentation_id": base_name,
             "duration_sec": gaze_results.get("metadata", {}).get("duration_sec") or stt_results.get("duration_sec"),
             "logic_similarity": logic_similarity,
             "logic_feedback": logic_feedback,
-            
+
             # AI Feedback 추가
             "final_report": feedback_data.get("content"),
             "final_report_preview": feedback_data.get("feedback_preview"),
             "feedback_file": feedback_data.get("file_path"),
-            
+
             # 점수 저장 (세부 항목 포함)
             "scores": feedback_data.get("scores", {}),
             "overallScore": (
-                feedback_data.get("scores", {}).get("voice", 0) + 
-                feedback_data.get("scores", {}).get("video", 0) + 
+                feedback_data.get("scores", {}).get("voice", 0) +
+                feedback_data.get("scores", {}).get("video", 0) +
                 feedback_data.get("scores", {}).get("logic", 20)
             ),
-            
-            "created_at": created_at_value,
-            "updated_at": firestore.SERVER_TIMESTAMP,
-        }
-        try:
-            feedback_doc.set(payload, merge=True)
-            print(f"[analyze_video] Firestore 저장 완료 -> users/{user_id}/projects/{project_id}/feedback/{base_name}")
-        except Exception as e:
-            print(f"❌ Firestore 업로드 실패: {e}")
-            print(f"payload keys: {list(payload.keys())}")
-
-        return {
-            "message": "시선/자세 및 STT 분석 완료. Firestore 저장 성공.",
-            "user_id": user_id,
-            "project_id": project_id,
-            "presentation_id": base_name,
-            "video_result": gaze_results,
-            "stt_result": stt_results,
-            # 프론트엔드 즉시 반영을 위해 피드백 데이터 포함
-            "final_report": feedback_data.get("content"),
-            "final_report_preview": feedback_data.get("feedback_preview"),
         }
+        progress.update(job.id, "persist", 50, "Firestore 저장")
+        await scheduler.run_stage("io", _persist_feedback, user_id, project_id, base_name, payload)
+        progress.update(job.id, "persist", 100)
+        return gaze_results, stt_results, feedback_data
+
+    pipeline = _add_analysis_stages(
+        Pipeline(f"analyze_video {base_name}"), temp_video_path, content_hash, feature_path,
+        vision_progress=progress.reporter(job.id, "vision"),
+        stt_progress=progress.reporter(job.id, "stt"),
+    )
+    # 대본 유사도를 AI 피드백 이전에 계산해 프롬프트에 포함
+    pipeline.add("script-similarity", script_similarity, deps=["transcribe"], optional=True)
+    pipeline.add("llm-report", llm_report,
+                 deps=["decode-video", "transcribe", "voice-analysis", "script-similarity"], optional=True)
+    pipeline.add("persist", persist,
+                 deps=["decode-video", "transcribe", "voice-analysis", "script-similarity", "llm-report"])
 
-    except Exception as e:
-        return {"message": f"분석/저장 실패: {str(e)}"}
+    try:
+        results = await pipeline.run()
+    except PipelineError as e:
+        raise RuntimeError(f"분석/저장 실패: {e}") from e
 
-    finally:
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
+    gaze_results, stt_results, feedback_data = results["persist"]
+    return {
+        "message": "시선/자세 및 STT 분석 완료. Firestore 저장 성공.",
+        "user_id": user_id,
+        "project_id": project_id,
+        "presentation_id": base_name,
+        "video_result": gaze_results,
+        "stt_result": stt_results,
+        # 프론트엔드 즉시 반영을 위해 피드백 데이터 포함
+        "final_report": feedback_data.get("content"),
+        "final_report_preview": feedback_data.get("feedback_preview"),
+        "pipeline_timings": results["timings"],
+    }
 
 
 @app.post("/analyze/stt")
-async def analyze_speech_api(file: UploadFile = File(...)):
+async def analyze_speech_api(request: Request, file: UploadFile = File(...)):
     """
     업로드된 영상에서 오디오를 추출해 Whisper STT 결과를 반환합니다.
+    queue 모드에서 JOB_SYNC_WAIT_SEC 안에 끝나지 않으면 202와 job_id를 반환합니다.
     """
-    temp_path = Path(f"temp_stt_{file.filename}")
-    contents = await file.read()
-    temp_path.write_bytes(contents)
-
-    loop = asyncio.get_event_loop()
+    temp_path = Path(f"temp_stt_{uuid.uuid4().hex[:12]}_{file.filename}").resolve()
     try:
-        stt_result = await loop.run_in_executor(
-            None,
-            partial(process_single_video, temp_path, output_basename=Path(file.filename).stem)
-        )
-    finally:
-        if temp_path.exists():
-            temp_path.unlink()
+        await save_upload(file, temp_path)
+    except UploadTooLargeError as e:
+        return _upload_too_large_response(e)
+
+    payload = {"temp_path": str(temp_path), "filename": file.filename}
+    if job_store is None:
+        stt_result = await _run_inline("stt", None, payload)
+    else:
+        try:
+            stt_result = await _run_in_worker("stt", payload, request)
+        except QueueFullError as e:
+            temp_path.unlink(missing_ok=True)
+            return _queue_full_response(e)
+        except JobPendingError as e:
+            return _job_pending_response(e)
 
     return {"message": f"✅ STT 완료: {file.filename}", "result": stt_result}
 
 
+async def _run_stt_job(job, temp_path: str, filename: str) -> dict:
+    """/analyze/stt 본체 (inline 모드에서는 요청 처리 중 직접, queue 모드에서는 워커가 실행)."""
+    return await scheduler.run_stage(
+        "stt", process_single_video, Path(temp_path), output_basename=Path(filename).stem
+    )
+
+
 @app.post("/analyze/upload-feedback")
-async def analyze_upload_feedback_api(file: UploadFile = File(...)):
+async def analyze_upload_feedback_api(request: Request, file: UploadFile = File(...)):
     """
     영상·음성 동시 분석 후 OpenRouter LLM으로 통합 피드백까지 생성합니다.
+    queue 모드에서 JOB_SYNC_WAIT_SEC 안에 끝나지 않으면 202와 job_id를 반환합니다.
     """
-    original_filename = file.filename
-    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_dir, video_dir, audio_dir, combined_dir = create_run_dirs(run_id)
-    temp_path = Path(f"temp_full_{original_filename}")
-    temp_path.write_bytes(await file.read())
-
-    loop = asyncio.get_event_loop()
-    stt_callable = partial(
-        process_single_video,
-        temp_path,
-        output_basename=Path(original_filename).stem,
-        output_audio_dir=audio_dir,
-        output_json_dir=audio_dir,
-        upload_to_firebase=False,  # 통합 API에서는 바로 피드백만 반환
-    )
+    temp_path = Path(f"temp_full_{uuid.uuid4().hex[:12]}_{file.filename}").resolve()
+    try:
+        _, upload_sha256 = await save_upload(file, temp_path)
+    except UploadTooLargeError as e:
+        return _upload_too_large_response(e)
 
+    payload = {"temp_path": str(temp_path), "original_filename": file.filename, "content_hash": upload_sha256}
+    if job_store is None:
+        return await _run_inline("upload-feedback", None, payload)
     try:
-        video_task = loop.run_in_executor(None, analyze_video, str(temp_path))
-        stt_task = loop.run_in_executor(None, stt_callable)
-        video_result, stt_result = await asyncio.gather(video_task, stt_task)
-    finally:
-        if temp_path.exists():
-            temp_path.unlink()
+        return await _run_in_worker("upload-feedback", payload, request)
+    except QueueFullError as e:
+        temp_path.unlink(missing_ok=True)
+        return _queue_full_response(e)
+    except JobPendingError as e:
+        return _job_pending_response(e)
 
-    video_file_path = save_video_analysis_file(video_result, original_filename, video_dir)
 
-    feedback_payload = generate_combined_feedback_report(
-        video_result=video_result,
-        stt_result=stt_result,
-        user_id=user_id,
-        run_id=run_id,
-        original_filename=original_filename,
+async def _run_upload_feedback_job(job, temp_path: str, original_filename: str, content_hash: str) -> dict:
+    """/analyze/upload-feedback 본체 (inline 모드에서는 요청 처리 중 직접, queue 모드에서는 워커가 실행)."""
+    temp_path = Path(temp_path)
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_dir, video_dir, audio_dir, combined_dir = create_run_dirs(run_id)
+    base_name = Path(original_filename).stem
+
+    async def llm_report(video_result, stt_result, voice):
+        return await scheduler.run_stage(
+            "llm",
+            generate_combined_feedback_report,
+            video_result=video_result,
+            stt_result=_combine_stt_result(stt_result, voice),
+            user_id=None,
+            run_id=run_id,
+            original_filename=original_filename,
+        )
+
+    def save_files(video_result, stt_result):
+        video_file_path = save_video_analysis_file(video_result, original_filename, video_dir)
+        save_stt_outputs(stt_result, audio_dir, base_name)
+        combined_file_path = save_combined_analysis_file(video_result, stt_result, original_filename, combined_dir)
+        return video_file_path, combined_file_path
+
+    async def persist(video_result, stt_result, voice):
+        stt_result = _combine_stt_result(stt_result, voice)
+        paths = await scheduler.run_stage("io", save_files, video_result, stt_result)
+        return (stt_result, *paths)
+
+    # 통합 API에서는 Firestore 업로드 없이 바로 피드백만 반환.
+    # 특징 시계열은 /analyze/video/recompute로 재계산할 수 있도록 VIDEO_FEATURE_DIR 아래에 저장
+    pipeline = _add_analysis_stages(
+        Pipeline(f"upload-feedback {run_id}"), str(temp_path), content_hash,
+        feature_file_path(VIDEO_FEATURE_DIR / "upload-feedback" / run_id, original_filename),
     )
-    combined_file_path = save_combined_analysis_file(video_result, stt_result, original_filename, combined_dir)
+    pipeline.add("llm-report", llm_report, deps=["decode-video", "transcribe", "voice-analysis"])
+    pipeline.add("persist", persist, deps=["decode-video", "transcribe", "voice-analysis"])
+    results = await pipeline.run()
+
+    video_result = results["decode-video"]
+    stt_result, video_file_path, combined_file_path = results["persist"]
+    feedback_payload = results["llm-report"]
 
     return {
         "message": f"✅ 영상·음성 분석 및 피드백 생성 완료: {original_filename}",
@@ -417,32 +892,187 @@ async def analyze_upload_feedback_api(file: UploadFile = File(...)):
         "combined_analysis_file": combined_file_path,
         "feedback_file": feedback_payload["file_path"],
         "feedback_preview": feedback_payload["feedback_preview"],
+        "pipeline_timings": results["timings"],
     }
 
 
+# 워커(analysis_worker.py)가 job 종류별로 실행하는 함수와 진행률 가중치
+JOB_RUNNERS = {
+    "video": _run_video_job,
+    "stt": _run_stt_job,
+    "upload-feedback": _run_upload_feedback_job,
+}
+JOB_PROGRESS_WEIGHTS = {"video": VIDEO_JOB_PROGRESS_WEIGHTS}
+
+
 @app.get("/analyze/stt/progress")
 def stt_progress_api():
-    """STT 처리 단계 및 진행률 조회."""
+    """STT 처리 단계 및 진행률 조회. (서버 전역 값, 요청별 진행률은 /analyze/progress/{job_id})"""
     return get_stt_progress()
 
 
+def _sse(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+_SSE_HEARTBEAT = ": heartbeat\n\n"
+
+
 @app.get("/analyze/progress")
 async def get_progress_stream():
     """
     실시간 진행률을 SSE(Server-Sent Events)로 스트리밍합니다.
+    서버 전역 값이라 동시 요청이 섞이므로 /analyze/progress/{job_id} 사용을 권장합니다.
+    값이 바뀔 때만 이벤트를 보내고, 변화가 없으면 heartbeat 주석만 보냅니다.
     """
     async def event_generator():
-        while True:
-            progress = get_progress()
-            data = json.dumps({"progress": progress})
-            yield f"data: {data}\n\n"
-            await asyncio.sleep(1)
-            if progress >= 100:
-                break
+        last_sent = None
+        last_change = time.monotonic()
+        with scheduler.progress.broadcaster.subscribe(GLOBAL_PROGRESS_KEY) as changed:
+            while True:
+                progress = get_progress()
+                if progress != last_sent:
+                    last_sent = progress
+                    last_change = time.monotonic()
+                    yield _sse({"progress": progress})
+                    if progress >= 100:
+                        break
+                try:
+                    await asyncio.wait_for(changed.wait(), PROGRESS_HEARTBEAT_SEC)
+                    changed.clear()
+                except asyncio.TimeoutError:
+                    if time.monotonic() - last_change > PROGRESS_STREAM_TIMEOUT_SEC:
+                        yield _sse({"progress": progress, "message": "진행률 변화가 없어 스트림을 종료합니다."}, "timeout")
+                        break
+                    yield _SSE_HEARTBEAT
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+@app.get("/analyze/progress/{job_id}")
+async def get_job_progress_stream(job_id: str):
+    """
+    job별 진행률(stage, percent, frames_processed, eta_sec)을 SSE로 스트리밍합니다.
+    진행률이 바뀔 때만 이벤트를 보내고(변화가 없으면 heartbeat 주석),
+    job이 끝나면 결과 위치를 담은 done 이벤트를 보내고 종료합니다.
+    PROGRESS_STREAM_TIMEOUT_SEC 동안 변화가 없으면 timeout 이벤트로 종료합니다.
+    """
+    async def event_generator():
+        last_change = time.monotonic()
+        snapshot = None
+        updates = (
+            _watch_job_store(job_id, PROGRESS_HEARTBEAT_SEC) if job_store is not None
+            else scheduler.progress.watch(job_id, PROGRESS_HEARTBEAT_SEC)
+        )
+        async for update in updates:
+            if update is None:
+                if time.monotonic() - last_change > PROGRESS_STREAM_TIMEOUT_SEC:
+                    yield _sse({"job_id": job_id, "message": "진행률 변화가 없어 스트림을 종료합니다."}, "timeout")
+                    return
+                yield _SSE_HEARTBEAT
+                continue
+            snapshot = update
+            last_change = time.monotonic()
+            yield _sse(snapshot)
+
+        if snapshot is None:
+            yield _sse({"message": f"존재하지 않는 job: {job_id}"}, "error")
+        elif snapshot["status"] in ("succeeded", "failed"):
+            yield _sse(_job_result_location(job_id, snapshot), "done")
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
+def _job_result_location(job_id: str, snapshot: dict) -> dict:
+    """SSE done 이벤트용: 결과 조회 URL과 Firestore 저장 위치."""
+    location = {"job_id": job_id, "status": snapshot["status"], "result_url": f"/analyze/jobs/{job_id}"}
+    if snapshot.get("error"):
+        location["error"] = snapshot["error"]
+    job_info = _describe_job(job_id, include_result=False)
+    if job_info is not None and job_info["kind"] == "video" and snapshot["status"] == "succeeded":
+        meta = job_info
+        location["firestore_path"] = (
+            f"users/{meta['user_id']}/projects/{meta['project_id']}/feedback/{meta['presentation_id']}"
+        )
+    return location
+
+
+def _check_path_ids(*ids):
+    """경로·문서 경로 조각으로 쓰는 ID에 경로 문자가 없는지 확인 (위반 시 ValueError)."""
+    for value in ids:
+        if value is not None and (str(value) in {".", ".."} or any(sep in str(value) for sep in ("/", "\\", "\0"))):
+            raise ValueError("user_id, project_id, presentation_id에 경로 문자를 사용할 수 없습니다.")
+
+
+def _resolve_feature_file(feature_file: Optional[str], user_id, project_id, presentation_id) -> Path:
+    """
+    재계산할 특징 파일 경로. ID로 서버에서 경로를 만들거나, feature_file을 받으면
+    VIDEO_FEATURE_DIR 아래의 .npz인지 확인 (경로 조작으로 다른 파일을 읽지 않도록). 위반 시 ValueError.
+    """
+    root = VIDEO_FEATURE_DIR.resolve()
+    if feature_file:
+        path = Path(feature_file)
+        if not path.is_absolute():
+            # 응답의 feature_file(VIDEO_FEATURE_DIR 포함 상대 경로)과 VIDEO_FEATURE_DIR 기준 상대 경로 모두 허용
+            path = path if path.resolve().is_relative_to(root) else root / path
+    else:
+        _check_path_ids(user_id, project_id, presentation_id)
+        path = root / str(user_id) / str(project_id) / f"{presentation_id}_features.npz"
+    resolved = path.resolve()
+    if not resolved.is_relative_to(root) or resolved.suffix != ".npz":
+        raise ValueError("특징 파일은 VIDEO_FEATURE_DIR 아래의 .npz 파일만 사용할 수 있습니다.")
+    return resolved
+
+
+@app.post("/analyze/video/recompute")
+def recompute_video_api(data: dict = Body(...)):
+    """
+    저장된 프레임별 특징 시계열(npz)만으로 영상 분석 결과를 재계산합니다. (영상 재디코딩 없음)
+    body: user_id, project_id, presentation_id 또는 feature_file,
+    thresholds(선택, 예: {"gesture_min": 0.12}), save(선택, true면 Firestore vision_analysis 갱신)
+    """
+    try:
+        user_id = data.get("user_id")
+        project_id = data.get("project_id") or data.get("projectId")
+        presentation_id = data.get("presentation_id")
+        feature_file = data.get("feature_file")
+
+        if not feature_file and not (user_id and project_id and presentation_id):
+            return {"message": "❌ 'feature_file' 또는 'user_id', 'project_id', 'presentation_id'가 필요합니다."}
+        feature_file = str(_resolve_feature_file(feature_file, user_id, project_id, presentation_id))
+        if not os.path.exists(feature_file):
+            return {"message": f"❌ 특징 파일을 찾을 수 없습니다: {feature_file}"}
+
+        video_result = recompute_video_result(feature_file, data.get("thresholds"))
+
+        saved = False
+        if data.get("save") and user_id and project_id and presentation_id:
+            _check_path_ids(user_id, project_id, presentation_id)
+            stored = dict(video_result)
+            stored["gaze"] = dict(stored["gaze"])
+            stored["gaze"].pop("trace_sample", None)
+            _feedback_doc(user_id, project_id, presentation_id).set(
+                {
+                    "vision_analysis": _sanitize_for_firestore(stored),
+                    "updated_at": firestore.SERVER_TIMESTAMP,
+                },
+                merge=True,
+            )
+            saved = True
+
+        return {
+            "message": "✅ 특징 시계열로 영상 분석 결과 재계산 완료",
+            "feature_file": feature_file,
+            "saved": saved,
+            "video_result": video_result,
+        }
+    except ValueError as e:
+        return {"message": f"❌ {e}"}
+    except Exception as e:
+        return {"message": f"재계산 실패: {str(e)}"}
+
+
 @app.post("/feedback/from-db")
 def feedback_from_db_api(data: dict = Body(...)):
     """
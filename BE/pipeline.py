@@ -0,0 +1,101 @@
+"""
+분석 파이프라인 DAG 실행기
+
+단계마다 의존 단계를 지정하면, 의존 단계 결과가 모두 준비되는 즉시 해당 단계를 시작합니다.
+(예: decode-video와 extract-audio → transcribe가 동시에 진행되어 전체 지연이 max(vision, STT) + LLM에 가까워짐)
+
+- fn은 의존 단계 결과를 deps 순서대로 위치 인자로 받는 코루틴 함수 (동기 작업은 JobScheduler.run_stage로 감싸서 사용)
+- optional 단계가 실패하면 결과를 None으로 두고 계속 진행, 필수 단계가 실패하면 이후 단계는 건너뛰고 예외 전파
+- 단계별 시작 시점(파이프라인 시작 기준)·소요 시간·상태를 timings로 기록
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable
+
+
+class PipelineError(Exception):
+    """필수 단계 실패. stage: 실패한 단계 이름, timings: 그때까지의 단계별 시간."""
+
+    def __init__(self, stage: str, error: Exception, timings: dict):
+        super().__init__(f"{stage} 단계 실패: {error}")
+        self.stage = stage
+        self.error = error
+        self.timings = timings
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable[..., Awaitable], deps: Iterable[str], optional: bool):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.optional = optional
+
+
+class Pipeline:
+    def __init__(self, name: str):
+        self.name = name
+        self._stages: Dict[str, _Stage] = {}
+
+    def add(self, name: str, fn: Callable[..., Awaitable], deps: Iterable[str] = (),
+            optional: bool = False) -> "Pipeline":
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"{name}: 정의되지 않은 의존 단계 {dep} (의존 단계를 먼저 추가하세요)")
+        self._stages[name] = _Stage(name, fn, deps, optional)
+        return self
+
+    async def run(self) -> Dict[str, object]:
+        """모든 단계를 실행하고 {단계 이름: 결과, "timings": {...}}를 반환. 필수 단계 실패 시 PipelineError."""
+        started = time.perf_counter()
+        timings: Dict[str, dict] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: _Stage):
+            inputs = [await tasks[dep] for dep in stage.deps]
+            stage_start = time.perf_counter()
+            record = {"start_sec": round(stage_start - started, 3), "status": "running"}
+            timings[stage.name] = record
+            try:
+                value = await stage.fn(*inputs)
+                record["status"] = "ok"
+                return value
+            except asyncio.CancelledError:
+                record["status"] = "cancelled"
+                raise
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = str(e)
+                if not stage.optional:
+                    raise
+                print(f"⚠️ [{self.name}] {stage.name} 실패, 결과 없이 계속 진행: {e}")
+                return None
+            finally:
+                record["duration_sec"] = round(time.perf_counter() - stage_start, 3)
+
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception as e:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            failed = next(
+                (name for name, record in timings.items() if record.get("status") == "failed"),
+                "pipeline",
+            )
+            for name in self._stages:
+                timings.setdefault(name, {"status": "skipped"})
+            raise PipelineError(failed, e, timings) from e
+
+        results = {name: task.result() for name, task in tasks.items()}
+        timings["total"] = {"duration_sec": round(time.perf_counter() - started, 3)}
+        results["timings"] = timings
+        summary = ", ".join(
+            f"{name} {record['duration_sec']:.1f}s" for name, record in timings.items() if "duration_sec" in record
+        )
+        print(f"⏱️ [{self.name}] {summary}")
+        return results
@@ -0,0 +1,207 @@
+"""
+job별 진행률 저장소
+
+분석 job마다 구성 단계(vision/stt/llm/persist 등)의 진행률을 따로 기록하고,
+가중 평균으로 전체 진행률·ETA를 계산합니다. 분석 함수는 스레드 풀에서 실행되므로
+모든 접근은 lock으로 보호합니다. 완료된 job은 PROGRESS_TTL_SEC이 지나면 정리됩니다.
+
+값이 바뀌면 Broadcaster로 구독자(SSE 연결)에게 알리므로, 구독자는 주기적으로 폴링하지 않고
+변경이 있을 때만 깨어납니다.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, Optional
+
+PROGRESS_TTL_SEC = max(1, int(os.getenv("PROGRESS_TTL_SEC", "600") or 600))
+
+_FINISHED = {"succeeded", "failed"}
+
+
+def _clamp(value) -> int:
+    return max(0, min(100, int(value)))
+
+
+class Broadcaster:
+    """
+    키별 변경 알림 채널. publish는 어느 스레드에서나 호출 가능하고,
+    구독자는 이벤트 루프에서 asyncio.Event를 기다림 (알림은 call_soon_threadsafe로 전달).
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, key: str):
+        """이벤트 루프 안에서 호출. 변경 시 set()되는 asyncio.Event를 반환."""
+        entry = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._subscribers.setdefault(key, set()).add(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(key)
+                if subscribers is not None:
+                    subscribers.discard(entry)
+                    if not subscribers:
+                        del self._subscribers[key]
+
+    def publish(self, key: str):
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # 이벤트 루프가 이미 닫힘
+                pass
+
+    def subscriber_count(self, key: Optional[str] = None) -> int:
+        with self._lock:
+            if key is not None:
+                return len(self._subscribers.get(key, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+class ProgressTracker:
+    def __init__(self, ttl_sec: int = PROGRESS_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self.broadcaster = Broadcaster()
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id: str, weights: Optional[Dict[str, float]] = None, status: str = "queued"):
+        """job 진행률 항목 생성. weights: 단계별 전체 진행률 반영 비율 (없으면 단일 단계)."""
+        self.cleanup()
+        now = time.time()
+        with self._lock:
+            self._entries[job_id] = {
+                "job_id": job_id,
+                "status": status,
+                "stage": status,
+                "percent": 0,
+                "frames_processed": None,
+                "frames_total": None,
+                "eta_sec": None,
+                "created_at": now,
+                "started_at": None,
+                "updated_at": now,
+                "finished_at": None,
+                "version": 0,
+                "components": {
+                    name: {"weight": weight, "percent": 0, "stage": None}
+                    for name, weight in (weights or {"job": 1.0}).items()
+                },
+            }
+        self.broadcaster.publish(job_id)
+
+    def set_status(self, job_id: str, status: str, **extra):
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return
+            now = time.time()
+            entry["status"] = status
+            entry["updated_at"] = now
+            entry.update(extra)
+            if status == "running" and entry["started_at"] is None:
+                entry["started_at"] = now
+                entry["stage"] = "분석 시작"
+            if status in _FINISHED:
+                entry["finished_at"] = now
+                entry["eta_sec"] = 0
+                if status == "succeeded":
+                    entry["percent"] = 100
+                    entry["stage"] = "완료"
+                else:
+                    entry["stage"] = "실패"
+            entry["version"] += 1
+        self.broadcaster.publish(job_id)
+
+    def update(self, job_id: str, component: str, percent=None, stage: Optional[str] = None,
+               frames_processed: Optional[int] = None, frames_total: Optional[int] = None, **extra):
+        """
+        단계 진행률 갱신 (분석 함수의 progress_cb로 사용).
+        extra: 단계별 부가 정보 (예: STT 중간 전사 partial_text), 단계와 최상위 항목에 함께 기록.
+        """
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None or entry["status"] in _FINISHED:
+                return
+            comp = entry["components"].setdefault(component, {"weight": 0.0, "percent": 0, "stage": None})
+            if percent is not None:
+                comp["percent"] = _clamp(percent)
+            if stage:
+                comp["stage"] = stage
+                entry["stage"] = f"{component}: {stage}"
+            if frames_processed is not None:
+                comp["frames_processed"] = entry["frames_processed"] = frames_processed
+            if frames_total is not None:
+                comp["frames_total"] = entry["frames_total"] = frames_total
+            if extra:
+                comp.update(extra)
+                entry.update(extra)
+
+            total_weight = sum(c["weight"] for c in entry["components"].values()) or 1.0
+            overall = sum(c["weight"] * c["percent"] for c in entry["components"].values()) / total_weight
+            # 단계가 완료 처리되기 전까지는 100%로 표시하지 않음
+            entry["percent"] = min(99, int(overall))
+
+            now = time.time()
+            entry["updated_at"] = now
+            started = entry["started_at"] or entry["created_at"]
+            if overall > 0:
+                entry["eta_sec"] = round((now - started) * (100 - overall) / overall, 1)
+            entry["version"] += 1
+        self.broadcaster.publish(job_id)
+
+    def reporter(self, job_id: str, component: str):
+        """progress_cb(percent, stage=None, frames_processed=None, frames_total=None, **extra) 형태의 콜백."""
+        return partial(self.update, job_id, component)
+
+    async def watch(self, job_id: str, heartbeat_sec: float):
+        """
+        변경될 때마다 스냅샷을 yield하고, heartbeat_sec 동안 변경이 없으면 None을 yield.
+        job이 완료/실패하거나 항목이 사라지면 종료.
+        """
+        last_version = -1
+        with self.broadcaster.subscribe(job_id) as changed:
+            while True:
+                snapshot = self.get(job_id)
+                if snapshot is None:
+                    return
+                if snapshot["version"] != last_version:
+                    last_version = snapshot["version"]
+                    yield snapshot
+                    if snapshot["status"] in _FINISHED:
+                        return
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat_sec)
+                    changed.clear()
+                except asyncio.TimeoutError:
+                    yield None
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            snapshot = dict(entry)
+            snapshot["components"] = {name: dict(comp) for name, comp in entry["components"].items()}
+            return snapshot
+
+    def cleanup(self):
+        """완료 후 ttl_sec이 지난 항목 제거."""
+        cutoff = time.time() - self.ttl_sec
+        with self._lock:
+            expired = [
+                job_id for job_id, entry in self._entries.items()
+                if entry["finished_at"] is not None and entry["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self._entries[job_id]
@@ -0,0 +1,106 @@
+"""
+업로드 내용 해시 기반 분석 결과 캐시 (로컬 디스크)
+
+같은 녹화본을 다시 올리면(Firestore 저장 실패 후 재시도, 다른 프로젝트에 업로드 등)
+MediaPipe·Whisper·LLM을 다시 돌리지 않고 이전 결과를 재사용합니다.
+
+- 키 = sha256(namespace + 업로드 sha256 + 설정 dict). 설정에는 모델 크기·엔진·임계값 등
+  결과에 영향을 주는 값을 모두 넣어, 설정이 바뀌면 자동으로 다른 키가 되도록 함
+- 값은 JSON 파일로 저장, 읽을 때 mtime을 갱신해 전체 크기가 RESULT_CACHE_MAX_MB를 넘으면
+  가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+RESULT_CACHE_DIR = Path(os.getenv("RESULT_CACHE_DIR", "results/cache"))
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "512") or 0)
+
+
+def cache_key(namespace: str, content_hash: str, config: Optional[dict] = None) -> str:
+    payload = json.dumps(
+        {"namespace": namespace, "content": content_hash, "config": config or {}},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root=RESULT_CACHE_DIR, max_mb: float = RESULT_CACHE_MAX_MB,
+                 enabled: bool = RESULT_CACHE_ENABLED):
+        self.root = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._total_bytes = None  # 첫 put에서 디렉터리를 스캔해 초기화
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / key[:2] / f"{key}.json"
+
+    def get(self, namespace: str, content_hash: str, config: Optional[dict] = None) -> Optional[Any]:
+        if not self.enabled or not content_hash:
+            return None
+        path = self._path(namespace, cache_key(namespace, content_hash, config))
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ 캐시 항목 읽기 실패, 삭제합니다: {path} ({e})")
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)  # LRU: 최근 사용 시각 갱신
+        except OSError:
+            pass
+        return value
+
+    def put(self, namespace: str, content_hash: str, config: Optional[dict], value: Any):
+        if not self.enabled or not content_hash or value is None:
+            return
+        path = self._path(namespace, cache_key(namespace, content_hash, config))
+        data = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            try:
+                self._total_bytes -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data)
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for path in self.root.glob("*/*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        """전체 크기가 max_bytes의 90% 이하가 될 때까지 오래 사용하지 않은 항목부터 삭제."""
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        if removed:
+            print(f"🧹 결과 캐시 정리: {removed}개 삭제 (현재 {total / (1024 * 1024):.1f}MB)")
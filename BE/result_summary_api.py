@@ -8,7 +8,6 @@ import json
 import os
 import base64
 
-from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,21 +24,33 @@ OPENROUTER_SITE = os.getenv("OPENROUTER_SITE_URL", "")
 OPENROUTER_TITLE = os.getenv("OPENROUTER_TITLE", "result-summary")
 
 _llm_headers = {}
+# 클라이언트는 첫 LLM 호출 시 생성 (_get_client), 키 존재 여부는 시작할 때 확인
+_client = None
 
 if OPENAI_API_KEY:
-    client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None)
     LLM_MODEL = OPENAI_MODEL
 elif OPENROUTER_API_KEY:
     if OPENROUTER_SITE:
         _llm_headers["HTTP-Referer"] = OPENROUTER_SITE
     if OPENROUTER_TITLE:
         _llm_headers["X-Title"] = OPENROUTER_TITLE
-    client = OpenAI(api_key=OPENROUTER_API_KEY, base_url=OPENROUTER_BASE_URL)
     LLM_MODEL = OPENROUTER_MODEL
 else:
     raise RuntimeError("OPENAI_API_KEY 또는 OPENROUTER_API_KEY가 필요합니다.")
 
 
+def _get_client():
+    global _client
+    if _client is None:
+        from openai import OpenAI
+
+        if OPENAI_API_KEY:
+            _client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None)
+        else:
+            _client = OpenAI(api_key=OPENROUTER_API_KEY, base_url=OPENROUTER_BASE_URL)
+    return _client
+
+
 from pathlib import Path
 from typing import Any, Dict, Optional, Union, Tuple
 
@@ -163,7 +174,7 @@ def _compute_script_similarity(script_text: Optional[str], spoken_text: Optional
         """
     
     try:
-        resp = client.chat.completions.create(
+        resp = _get_client().chat.completions.create(
             model=LLM_MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.2,
@@ -0,0 +1,234 @@
+"""
+프로세스 간 NumPy 배열 공유 (메모리 매핑 파일)
+
+16kHz PCM이나 축소 프레임 묶음처럼 큰 배열을 워커 프로세스에 넘길 때 pickle로 보내면
+직렬화 → 파이프 전송 → 역직렬화로 워커 수만큼 복사본이 생깁니다. 소유 프로세스가 배열을
+메모리 매핑 파일에 한 번만 쓰고, 워커에는 파일 위치(SharedArrayRef)만 넘겨 워커가 복사 없이 매핑해 읽습니다.
+
+- 파일은 /dev/shm(tmpfs, 메모리)에 만들고, 공간이 모자라면 시스템 임시 디렉터리로 대체.
+  posix_fallocate로 공간을 먼저 확보해 tmpfs가 가득 찼을 때 쓰기 중 SIGBUS로 죽지 않게 함
+  (Docker 기본 /dev/shm은 64MB라 multiprocessing.shared_memory는 긴 녹음에서 이 문제가 생김)
+- 수명: 소유 프로세스가 with 블록/release()로 해제, 정상 종료 시 atexit으로 남은 버퍼 해제,
+  강제 종료(SIGKILL·OOM)로 남은 파일은 다음 시작 시 cleanup_stale()이 소유 프로세스가 없는 것만 삭제.
+  파일 이름에 소유 프로세스의 PID와 시작 시각(부팅 ID + 시작 tick)을 함께 넣어, 컨테이너 재시작으로
+  같은 PID(보통 1)를 다시 쓰는 새 프로세스를 이전 소유자로 오인하지 않음
+- 워커 쪽 매핑은 소유 프로세스가 파일을 지워도 워커가 배열을 놓을 때까지 유효 (Linux unlink 동작)
+"""
+
+import atexit
+import os
+import socket
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+# 끄면 기존처럼 배열을 pickle로 워커에 전달
+SHARED_BUFFERS = os.getenv("SHARED_BUFFERS", "true").lower() in {"1", "true", "yes", "on"}
+# 버퍼 파일 디렉터리 (미설정이면 /dev/shm → 시스템 임시 디렉터리 순으로 시도)
+SHARED_BUFFER_DIR = os.getenv("SHARED_BUFFER_DIR", "")
+# 이보다 작은 배열은 pickle 전달이 더 저렴하므로 공유하지 않음 (바이트)
+SHARED_BUFFER_MIN_BYTES = int(os.getenv("SHARED_BUFFER_MIN_BYTES", str(1 << 20)) or 0)
+
+_PREFIX = "shbuf"
+_HOST = socket.gethostname().replace("_", "-")
+
+
+def _read_boot_id() -> str:
+    try:
+        return Path("/proc/sys/kernel/random/boot_id").read_text().strip().replace("-", "")[:8]
+    except OSError:
+        return ""
+
+
+_BOOT_ID = _read_boot_id()
+
+
+def _process_start(pid: int) -> Optional[str]:
+    """프로세스 시작 식별자 (부팅 ID + /proc/<pid>/stat의 시작 tick). 프로세스가 없거나 /proc이 없으면 None."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+    # comm(2번째 필드)에 공백·괄호가 있을 수 있어 마지막 ')' 뒤(3번째 필드)부터 셈. starttime은 22번째 필드
+    return f"{_BOOT_ID}{stat[stat.rindex(')') + 2:].split()[19]}"
+
+
+_START = _process_start(os.getpid()) or "0"
+
+_owned = {}
+_owned_lock = threading.Lock()
+
+
+def _buffer_dirs() -> List[Path]:
+    if SHARED_BUFFER_DIR:
+        return [Path(SHARED_BUFFER_DIR)]
+    dirs = [Path("/dev/shm")] if os.path.isdir("/dev/shm") else []
+    return dirs + [Path(tempfile.gettempdir())]
+
+
+def _allocate(nbytes: int) -> Path:
+    """nbytes 크기의 버퍼 파일을 만들고 공간을 미리 확보. 모든 디렉터리가 부족하면 OSError."""
+    error = None
+    for directory in _buffer_dirs():
+        path = directory / f"{_PREFIX}_{_HOST}_{os.getpid()}_{_START}_{uuid.uuid4().hex[:12]}.bin"
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        except OSError as e:
+            error = e
+            continue
+        try:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, nbytes)
+            else:
+                os.ftruncate(fd, nbytes)
+            return path
+        except OSError as e:
+            error = e
+            path.unlink(missing_ok=True)
+        finally:
+            os.close(fd)
+    raise OSError(f"공유 버퍼 {nbytes / 1e6:.1f}MB를 할당할 공간이 없습니다: {error}")
+
+
+class SharedArrayRef:
+    """
+    워커 프로세스에 넘기는 공유 배열 위치 (pickle 시 경로·shape·dtype만 전달).
+    ref[start:stop]으로 첫 번째 축을 잘라 넘길 수 있음 (PCM 청크, 프레임 구간).
+    """
+
+    def __init__(self, path: str, shape, dtype: str, start: int = 0, stop: Optional[int] = None):
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.start = start
+        self.stop = shape[0] if stop is None else stop
+
+    def __getitem__(self, item: slice) -> "SharedArrayRef":
+        if not isinstance(item, slice) or item.step not in (None, 1):
+            raise TypeError("SharedArrayRef는 첫 번째 축의 연속 구간 슬라이스만 지원합니다.")
+        start, stop, _ = item.indices(self.stop - self.start)
+        return SharedArrayRef(self.path, self.shape, self.dtype, self.start + start, self.start + max(start, stop))
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __repr__(self):
+        return f"SharedArrayRef({self.path}, shape={self.shape}, dtype={self.dtype}, [{self.start}:{self.stop}])"
+
+
+class SharedArray:
+    """소유 프로세스 쪽 공유 배열. array에 값을 쓰고 ref를 워커에 넘긴 뒤 release()로 해제."""
+
+    def __init__(self, shape, dtype):
+        shape = tuple(int(n) for n in shape)
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if nbytes <= 0:
+            raise ValueError("빈 배열은 공유할 수 없습니다.")
+        self.path = _allocate(nbytes)
+        self.array = np.memmap(self.path, dtype=dtype, mode="r+", shape=shape)
+        self.ref = SharedArrayRef(str(self.path), shape, dtype.str)
+        with _owned_lock:
+            _owned[str(self.path)] = self
+
+    def release(self):
+        with _owned_lock:
+            _owned.pop(str(self.path), None)
+        self.array = None
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+@contextmanager
+def share(array: np.ndarray):
+    """
+    array를 공유 버퍼에 복사하고 SharedArrayRef를 넘겨줌. with 블록이 끝나면(예외 포함) 해제.
+    공유를 껐거나 배열이 작거나 공간이 없으면 array를 그대로 넘겨줌 (pickle 전달로 대체).
+    워커에서는 open_array()로 둘 다 같은 방식으로 읽음.
+    """
+    if not SHARED_BUFFERS or array.nbytes < max(1, SHARED_BUFFER_MIN_BYTES):
+        yield array
+        return
+    try:
+        shared = SharedArray(array.shape, array.dtype)
+    except OSError as e:
+        print(f"⚠️ 공유 버퍼 할당 실패, pickle 전달로 대체: {e}")
+        yield array
+        return
+    try:
+        shared.array[:] = array
+        yield shared.ref
+    finally:
+        shared.release()
+
+
+def open_array(source: Union[np.ndarray, SharedArrayRef]) -> np.ndarray:
+    """워커 쪽: SharedArrayRef면 복사 없이 읽기 전용으로 매핑, ndarray면 그대로 반환."""
+    if isinstance(source, np.ndarray):
+        return source
+    mapped = np.memmap(source.path, dtype=np.dtype(source.dtype), mode="r", shape=source.shape)
+    return np.asarray(mapped[source.start:source.stop])
+
+
+def release_all():
+    """이 프로세스가 소유한 공유 버퍼를 모두 해제 (종료 시 atexit으로 호출)."""
+    with _owned_lock:
+        buffers = list(_owned.values())
+    for shared in buffers:
+        shared.release()
+
+
+def _owner_alive(pid: int, start: str) -> bool:
+    current = _process_start(pid)
+    if current is not None:
+        # 같은 PID라도 시작 시각이 다르면 PID를 재사용한 다른 프로세스
+        return current == start
+    if start != "0":
+        # 시작 시각을 기록했는데(/proc 있음) 지금 읽을 수 없으면 프로세스가 없음
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def cleanup_stale() -> int:
+    """강제 종료된 프로세스가 남긴 버퍼 파일 삭제 (같은 호스트에서 소유 프로세스가 없는 것만). 삭제 수 반환."""
+    removed = 0
+    for directory in _buffer_dirs():
+        try:
+            paths = list(directory.glob(f"{_PREFIX}_{_HOST}_*.bin"))
+        except OSError:
+            continue
+        for path in paths:
+            try:
+                _, pid, start, _ = path.stem.rsplit("_", 3)
+                pid = int(pid)
+            except ValueError:
+                continue
+            if _owner_alive(pid, start):
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        print(f"🧹 종료된 프로세스가 남긴 공유 버퍼 {removed}개 삭제")
+    return removed
+
+
+atexit.register(release_all)
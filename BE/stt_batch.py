@@ -0,0 +1,305 @@
+"""
+STT 배치 처리 (process_multiple_videos)
+
+파일을 하나씩 순서대로 처리하면 오디오 추출 중에는 Whisper가, LLM/Firestore 응답을 기다리는 동안에는
+CPU가 놀게 됩니다. 단계를 나눠 여러 파일이 서로 다른 단계에서 동시에 진행되도록 합니다.
+
+  오디오 추출 (ffmpeg 프로세스, STT_BATCH_EXTRACT_WORKERS개 동시)
+    → bounded 큐 (디코딩된 PCM이 메모리에 쌓이지 않도록 제한)
+    → 상주 Whisper 워커 (FASTER_WHISPER_NUM_WORKERS개, 모델 1개를 공유)
+    → 결과 저장 → LLM 분석·Firestore 업로드 (STT_BATCH_LLM_CONCURRENCY개 동시)
+
+- 완료된 파일마다 {base_name}_batch.json 매니페스트(설정 해시·원본 크기/수정 시각·출력 파일)를 남겨,
+  다시 실행하면 설정과 원본이 같고 출력이 모두 남아 있는 파일은 건너뜀 (resume)
+- 끝나면 파일별 단계 시간·실시간 배속과 전체 처리량을 출력하고 batch_report_*.json으로 저장
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import stt_processor as stt
+from result_cache import cache_key
+
+STT_BATCH_EXTRACT_WORKERS = max(1, int(os.getenv("STT_BATCH_EXTRACT_WORKERS", "2") or 2))
+STT_BATCH_LLM_CONCURRENCY = max(1, int(os.getenv("STT_BATCH_LLM_CONCURRENCY", "4") or 4))
+
+_MANIFEST_SUFFIX = "_batch.json"
+
+
+def batch_config_hash(enable_gpt_analysis: bool) -> str:
+    """배치 결과에 영향을 주는 설정 해시 (바뀌면 resume 시 다시 처리)."""
+    config = {
+        "stt": stt.stt_config(),
+        "voice": stt.voice_analysis_config() if enable_gpt_analysis else None,
+    }
+    return cache_key("stt-batch", "", config)
+
+
+# ------------------------------------
+# resume 매니페스트
+# ------------------------------------
+def _source_info(video_path: Path) -> dict:
+    stat = video_path.stat()
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _manifest_path(output_json_dir: Path, base_name: str) -> Path:
+    return output_json_dir / f"{base_name}{_MANIFEST_SUFFIX}"
+
+
+def _is_done(video_path: Path, output_json_dir: Path, config_hash: str) -> bool:
+    try:
+        manifest = json.loads(_manifest_path(output_json_dir, video_path.stem).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return False
+    if manifest.get("config_hash") != config_hash or manifest.get("source") != _source_info(video_path):
+        return False
+    return all(Path(path).exists() for path in manifest.get("outputs", []))
+
+
+def _write_manifest(video_path: Path, output_json_dir: Path, config_hash: str, outputs: List[str]):
+    manifest = {
+        "config_hash": config_hash,
+        "source": _source_info(video_path),
+        "outputs": outputs,
+        "finished_at": datetime.now().isoformat(),
+    }
+    path = _manifest_path(output_json_dir, video_path.stem)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+# ------------------------------------
+# 단계별 작업 (스레드 풀에서 실행)
+# ------------------------------------
+def _transcribe(video_path: Path, pcm, output_dir_audio: Path, output_dir_json: Path, keep_wav: bool) -> dict:
+    base_name = video_path.stem
+    audio_path = None
+    if keep_wav:
+        audio_path = output_dir_audio / f"{base_name}.wav"
+        stt.write_wav(audio_path, pcm)
+    stt_result = stt.whisper_transcribe(pcm)
+    if not stt_result:
+        raise RuntimeError("STT 전사에 실패했습니다.")
+    return stt.save_stt_outputs(stt_result, output_dir_json, base_name, audio_path)
+
+
+def _save_voice_analysis(output_dir_json: Path, base_name: str, voice_analysis: dict) -> str:
+    path = output_dir_json / f"{base_name}_voice_analysis.json"
+    path.write_text(json.dumps(voice_analysis, ensure_ascii=False, indent=4), encoding="utf-8")
+    return str(path)
+
+
+def _upload(user_id: str, base_name: str, stt_result: dict, voice_analysis: Optional[dict]):
+    stt.upload_to_firebase_text(user_id, base_name, stt_result)
+    if voice_analysis:
+        stt.upload_to_firebase_voice_analysis(user_id, base_name, voice_analysis)
+
+
+def _elapsed(started: float) -> float:
+    return round(time.perf_counter() - started, 2)
+
+
+# ------------------------------------
+# 배치 파이프라인
+# ------------------------------------
+async def _run_pipeline(video_files: List[Path], records: Dict[Path, dict], output_dir_audio: Path,
+                        output_dir_json: Path, user_id: str, config_hash: str, enable_gpt_analysis: bool,
+                        upload_to_firebase: bool, keep_wav: bool, extract_workers: int, stt_workers: int,
+                        llm_concurrency: int):
+    loop = asyncio.get_running_loop()
+    extract_pool = ThreadPoolExecutor(extract_workers, thread_name_prefix="stt-batch-extract")
+    stt_pool = ThreadPoolExecutor(stt_workers, thread_name_prefix="stt-batch-whisper")
+    post_pool = ThreadPoolExecutor(llm_concurrency, thread_name_prefix="stt-batch-post")
+    extract_slots = asyncio.Semaphore(extract_workers)
+    audio_queue: asyncio.Queue = asyncio.Queue(maxsize=stt_workers)
+    post_tasks: List[asyncio.Task] = []
+
+    def fail(record: dict, stage: str, error: Exception):
+        record["status"] = "failed"
+        record["error"] = f"{stage}: {error}"
+        record["timings"]["total_sec"] = _elapsed(record["_started"])
+        print(f"  ❌ {record['file']} {stage} 실패: {error}")
+
+    async def extract(video_path: Path):
+        record = records[video_path]
+        # 큐에 넣을 때까지 슬롯을 잡고 있어야 메모리에 올라가는 PCM 수가 제한됨
+        async with extract_slots:
+            record["_started"] = started = time.perf_counter()
+            try:
+                pcm = await loop.run_in_executor(extract_pool, stt.load_audio_pcm, video_path)
+            except Exception as e:
+                fail(record, "오디오 추출", e)
+                return
+            record["audio_sec"] = round(len(pcm) / stt.SAMPLE_RATE, 1)
+            record["timings"]["extract_sec"] = _elapsed(started)
+            await audio_queue.put((video_path, pcm))
+
+    async def postprocess(video_path: Path, stt_result: dict):
+        record = records[video_path]
+        outputs = [stt_result["file_paths"]["text"], stt_result["file_paths"]["json"]]
+        try:
+            voice_analysis = None
+            if enable_gpt_analysis and stt._llm_provider:
+                started = time.perf_counter()
+                voice_analysis = await loop.run_in_executor(
+                    post_pool, stt.analyze_voice_rhythm_and_patterns, stt_result
+                )
+                stt_result["voice_analysis"] = voice_analysis
+                outputs.append(await loop.run_in_executor(
+                    post_pool, _save_voice_analysis, output_dir_json, video_path.stem, voice_analysis
+                ))
+                record["timings"]["llm_sec"] = _elapsed(started)
+            if upload_to_firebase:
+                started = time.perf_counter()
+                await loop.run_in_executor(post_pool, _upload, user_id, video_path.stem, stt_result, voice_analysis)
+                record["timings"]["upload_sec"] = _elapsed(started)
+            _write_manifest(video_path, output_dir_json, config_hash, outputs)
+        except Exception as e:
+            fail(record, "후처리", e)
+            return
+        record["status"] = "done"
+        record["timings"]["total_sec"] = _elapsed(record["_started"])
+        print(f"  ✅ {record['file']} 완료 ({record['timings']['total_sec']:.1f}s)")
+
+    async def whisper_worker():
+        while True:
+            item = await audio_queue.get()
+            if item is None:
+                return
+            video_path, pcm = item
+            record = records[video_path]
+            started = time.perf_counter()
+            try:
+                stt_result = await loop.run_in_executor(
+                    stt_pool, _transcribe, video_path, pcm, output_dir_audio, output_dir_json, keep_wav
+                )
+            except Exception as e:
+                fail(record, "STT", e)
+                continue
+            finally:
+                item = pcm = None  # 전사가 끝난 PCM은 바로 해제
+            stt_sec = _elapsed(started)
+            record["timings"]["stt_sec"] = stt_sec
+            if stt_sec > 0 and record.get("audio_sec"):
+                record["realtime_factor"] = round(record["audio_sec"] / stt_sec, 2)
+            post_tasks.append(asyncio.create_task(postprocess(video_path, stt_result)))
+
+    try:
+        if upload_to_firebase:
+            upload_to_firebase = await loop.run_in_executor(post_pool, stt.initialize_firebase)
+            if not upload_to_firebase:
+                print("  ⚠️ Firebase 설정이 올바르지 않아 업로드를 건너뜁니다.")
+
+        workers = [asyncio.create_task(whisper_worker()) for _ in range(stt_workers)]
+        await asyncio.gather(*(extract(video_path) for video_path in video_files))
+        for _ in workers:
+            await audio_queue.put(None)
+        await asyncio.gather(*workers)
+        await asyncio.gather(*post_tasks)
+    finally:
+        for pool in (extract_pool, stt_pool, post_pool):
+            pool.shutdown(wait=True)
+
+
+def _summarize(records: List[dict], wall_sec: float) -> dict:
+    done = [record for record in records if record["status"] == "done"]
+    audio_sec = sum(record.get("audio_sec") or 0 for record in done)
+    return {
+        "total": len(records),
+        "done": len(done),
+        "skipped": sum(record["status"] == "skipped" for record in records),
+        "failed": sum(record["status"] == "failed" for record in records),
+        "wall_sec": round(wall_sec, 2),
+        "audio_sec": round(audio_sec, 1),
+        # 벽시계 1초당 처리한 오디오 길이(초)
+        "realtime_factor": round(audio_sec / wall_sec, 2) if wall_sec > 0 else None,
+        "files_per_min": round(len(done) / wall_sec * 60, 2) if wall_sec > 0 else None,
+    }
+
+
+def _print_report(summary: dict, records: List[dict]):
+    print("\n📊 STT 배치 처리 요약")
+    for record in records:
+        timings = record["timings"]
+        stages = ", ".join(f"{name[:-4]} {value:.1f}s" for name, value in timings.items() if name != "total_sec")
+        line = f"  - {record['file']}: {record['status']}"
+        if stages:
+            line += f" ({stages})"
+        if record.get("realtime_factor"):
+            line += f" x{record['realtime_factor']:.1f}"
+        if record.get("error"):
+            line += f" {record['error']}"
+        print(line)
+    print(f"  총 {summary['total']}개 (완료 {summary['done']}, 건너뜀 {summary['skipped']}, 실패 {summary['failed']}) "
+          f"| {summary['wall_sec']:.1f}s, 오디오 {summary['audio_sec']:.0f}s, "
+          f"실시간 x{summary['realtime_factor'] or 0:.2f}, 분당 {summary['files_per_min'] or 0:.2f}개")
+
+
+def run_batch(input_dir, output_dir_audio, output_dir_json, user_id: Optional[str] = None,
+              resume: bool = True, enable_gpt_analysis: bool = True, upload_to_firebase: bool = True,
+              keep_wav: Optional[bool] = None, extract_workers: int = STT_BATCH_EXTRACT_WORKERS,
+              stt_workers: Optional[int] = None, llm_concurrency: int = STT_BATCH_LLM_CONCURRENCY) -> Optional[dict]:
+    """
+    input_dir의 MP4를 배치 파이프라인으로 처리하고 요약 리포트(dict)를 반환.
+    stt_workers: 동시에 전사할 파일 수 (None이면 faster 엔진은 FASTER_WHISPER_NUM_WORKERS, openai 엔진은 1)
+    """
+    input_dir = Path(input_dir)
+    output_dir_audio = Path(output_dir_audio)
+    output_dir_json = Path(output_dir_json)
+    video_files = sorted(input_dir.glob("*.mp4"))
+    if not video_files:
+        print(f"경고: '{input_dir}'에서 처리할 MP4 영상 파일을 찾을 수 없습니다.")
+        return None
+
+    user_id = user_id or stt.FIREBASE_USER_ID
+    keep_wav = stt.STT_KEEP_WAV if keep_wav is None else keep_wav
+    if stt_workers is None:
+        stt_workers = stt.FASTER_WHISPER_NUM_WORKERS if stt.STT_ENGINE == "faster" else 1
+    output_dir_json.mkdir(parents=True, exist_ok=True)
+    if keep_wav:
+        output_dir_audio.mkdir(parents=True, exist_ok=True)
+
+    config_hash = batch_config_hash(enable_gpt_analysis)
+    records = {
+        video_path: {"file": video_path.name, "status": "pending", "audio_sec": None, "timings": {}}
+        for video_path in video_files
+    }
+    pending = []
+    for video_path in video_files:
+        if resume and _is_done(video_path, output_dir_json, config_hash):
+            records[video_path]["status"] = "skipped"
+        else:
+            pending.append(video_path)
+
+    print(f"총 {len(video_files)}개의 영상 중 {len(pending)}개를 처리합니다. 사용자 ID: {user_id} "
+          f"(추출 {extract_workers}, Whisper {stt_workers}, LLM/업로드 {llm_concurrency})")
+
+    started = time.perf_counter()
+    if pending:
+        asyncio.run(_run_pipeline(
+            pending, records, output_dir_audio, output_dir_json, user_id, config_hash, enable_gpt_analysis,
+            upload_to_firebase, keep_wav, extract_workers, stt_workers, llm_concurrency,
+        ))
+    wall_sec = time.perf_counter() - started
+
+    file_records = []
+    for record in records.values():
+        record.pop("_started", None)
+        file_records.append(record)
+    summary = _summarize(file_records, wall_sec)
+    summary["config_hash"] = config_hash
+    summary["files"] = file_records
+    _print_report(summary, file_records)
+
+    report_path = output_dir_json / f"batch_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    report_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"  📝 리포트 저장: {report_path}")
+    return summary
@@ -0,0 +1,209 @@
+"""
+VAD 기반 청크 분할 + 멀티 프로세스 STT (긴 리허설 영상용)
+
+1. faster-whisper 내장 Silero VAD로 발화 구간을 찾고
+2. 발화 구간을 STT_CHUNK_SEC 안팎의 청크로 묶어 (무음 구간에서만 자름)
+3. 청크를 워커 프로세스(프로세스마다 CTranslate2 모델 1개)에서 동시에 전사한 뒤
+4. 청크 시작 시각을 더해 절대 타임스탬프로 병합합니다.
+
+VAD로 찾은 무음 구간(silence_intervals)은 결과에 함께 담아 pause 분석에 그대로 사용합니다.
+워커 풀은 한 번 만들면 재사용 (모델 로딩 비용을 요청마다 치르지 않도록).
+PCM은 공유 버퍼(shared_buffers)에 한 번만 쓰고 워커에는 청크 구간만 넘깁니다 (청크별 pickle 복사 없음).
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import shared_buffers
+
+SAMPLE_RATE = 16000
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_key = None
+_executor_lock = threading.Lock()
+
+# 워커 프로세스 전역 모델 (initializer에서 1회 로딩)
+_worker_model = None
+
+
+# ============================
+# VAD / 청크 계획
+# ============================
+def detect_speech(pcm: np.ndarray, min_silence_ms: int = 500, speech_pad_ms: int = 200) -> List[Tuple[int, int]]:
+    """발화 구간 [(start_sample, end_sample), ...] (샘플 단위, 시간순)."""
+    try:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+    except ImportError as e:
+        raise RuntimeError("faster-whisper 패키지가 설치되어 있지 않습니다. pip install faster-whisper") from e
+    options = VadOptions(min_silence_duration_ms=min_silence_ms, speech_pad_ms=speech_pad_ms)
+    return [(int(ts["start"]), int(ts["end"])) for ts in get_speech_timestamps(pcm, options)]
+
+
+def silence_intervals(speech: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE) -> List[Dict[str, float]]:
+    """발화 구간 사이의 무음 구간 (첫 발화 이전·마지막 발화 이후는 제외)."""
+    intervals = []
+    for (_, prev_end), (next_start, _) in zip(speech, speech[1:]):
+        if next_start > prev_end:
+            start, end = prev_end / sample_rate, next_start / sample_rate
+            intervals.append({
+                "start_sec": round(start, 2),
+                "end_sec": round(end, 2),
+                "duration": round(end - start, 2),
+            })
+    return intervals
+
+
+def plan_chunks(speech: List[Tuple[int, int]], chunk_sec: float,
+                sample_rate: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """
+    발화 구간을 chunk_sec 안팎의 청크로 묶음. 경계는 무음 구간에서만 자르고,
+    한 발화 구간이 chunk_sec의 2배를 넘으면 그 안에서 chunk_sec 단위로 나눔.
+    """
+    max_len = int(chunk_sec * sample_rate)
+    chunks: List[Tuple[int, int]] = []
+    cur_start = cur_end = None
+    for start, end in speech:
+        if end - start > 2 * max_len:
+            if cur_start is not None:
+                chunks.append((cur_start, cur_end))
+                cur_start = None
+            for pos in range(start, end, max_len):
+                chunks.append((pos, min(end, pos + max_len)))
+            continue
+        if cur_start is None:
+            cur_start, cur_end = start, end
+        elif end - cur_start > max_len:
+            chunks.append((cur_start, cur_end))
+            cur_start, cur_end = start, end
+        else:
+            cur_end = end
+    if cur_start is not None:
+        chunks.append((cur_start, cur_end))
+    return chunks
+
+
+# ============================
+# 워커 프로세스
+# ============================
+def _init_worker(model_size: str, device: str, compute_type: str, cpu_threads: int):
+    global _worker_model
+    from faster_whisper import WhisperModel
+
+    _worker_model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(samples, offset_sec: float, language: str = "ko") -> Dict[str, Any]:
+    """청크 하나(ndarray 또는 SharedArrayRef)를 전사하고 타임스탬프에 offset_sec을 더해 반환."""
+    samples = shared_buffers.open_array(samples)
+    segments, _ = _worker_model.transcribe(samples, language=language, beam_size=5, word_timestamps=True)
+    texts, words = [], []
+    for seg in segments:
+        text = seg.text.strip()
+        if text:
+            texts.append(text)
+        for word in seg.words or []:
+            words.append({
+                "word": word.word.strip(),
+                "start": float(word.start) + offset_sec if word.start is not None else None,
+                "end": float(word.end) + offset_sec if word.end is not None else None,
+                "probability": float(getattr(word, "probability", 0.0)),
+            })
+    return {"text": " ".join(texts), "words": words}
+
+
+def _get_executor(workers: int, model_size: str, device: str, compute_type: str) -> ProcessPoolExecutor:
+    """설정이 같으면 기존 워커 풀 재사용, 바뀌면 새로 생성."""
+    global _executor, _executor_key
+    key = (workers, model_size, device, compute_type)
+    with _executor_lock:
+        if _executor is not None and _executor_key != key:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _executor is None:
+            cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_size, device, compute_type, cpu_threads),
+            )
+            _executor_key = key
+        return _executor
+
+
+def shutdown_workers():
+    global _executor, _executor_key
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _executor_key = None
+
+
+# ============================
+# 진입점
+# ============================
+def transcribe_parallel(pcm: np.ndarray, model_size: str, device: str, compute_type: str,
+                        workers: int = 2, chunk_sec: float = 120, min_silence_ms: int = 500,
+                        language: str = "ko", progress_cb: Optional[Callable] = None) -> Dict[str, Any]:
+    """
+    VAD → 청크 분할 → 워커 프로세스 병렬 전사 → 절대 타임스탬프로 병합.
+    progress_cb(ratio, new_text): 완료된 발화 길이 비율(0~1)과, 이번 청크 완료로 앞에서부터 이어지게 된
+    청크들의 전사 텍스트 (이전 호출에서 보낸 부분은 제외, 없으면 빈 문자열).
+    반환값은 whisper_transcribe 결과 형식에 silence_intervals / vad 정보를 더한 dict.
+    """
+    duration_sec = len(pcm) / SAMPLE_RATE
+    speech = detect_speech(pcm, min_silence_ms=min_silence_ms)
+    chunks = plan_chunks(speech, chunk_sec)
+    speech_samples = sum(end - start for start, end in chunks) or 1
+    print(f"  -> [STT] VAD: 발화 {len(speech)}구간, 청크 {len(chunks)}개, 워커 {workers}개 "
+          f"(발화 {speech_samples / SAMPLE_RATE:.0f}s / 전체 {duration_sec:.0f}s)")
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+    if chunks:
+        executor = _get_executor(workers, model_size, device, compute_type)
+        # 공유 버퍼는 모든 청크 전사가 끝나거나 실패하면 with 블록을 나가며 해제
+        with shared_buffers.share(pcm) as audio:
+            futures = {
+                executor.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, language): idx
+                for idx, (start, end) in enumerate(chunks)
+            }
+            try:
+                done_samples = 0
+                next_idx = 0  # 앞에서부터 이어진 완료 청크 수 (이미 보고한 범위)
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    results[idx] = future.result()
+                    start, end = chunks[idx]
+                    done_samples += end - start
+                    if progress_cb is not None:
+                        new_texts = []
+                        while next_idx < len(results) and results[next_idx] is not None:
+                            new_texts.append(results[next_idx]["text"])
+                            next_idx += 1
+                        progress_cb(done_samples / speech_samples, " ".join(t for t in new_texts if t))
+            finally:
+                # 실패 시 아직 시작하지 않은 청크가 해제된 버퍼를 읽지 않도록 취소
+                for future in futures:
+                    future.cancel()
+
+    words = [word for res in results for word in res["words"]]
+    return {
+        "full_text": " ".join(res["text"] for res in results if res["text"]).strip(),
+        "words": words,
+        "duration_sec": duration_sec,
+        "word_count": len(words),
+        "silence_intervals": silence_intervals(speech),
+        "vad": {
+            "speech_sec": round(sum(end - start for start, end in speech) / SAMPLE_RATE, 2),
+            "speech_segments": len(speech),
+            "chunks": len(chunks),
+            "workers": workers,
+            "min_silence_ms": min_silence_ms,
+        },
+    }
@@ -1,22 +1,25 @@
 import os
 import json
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
+
+import numpy as np
 
 os.environ.setdefault("KMP_DUPLICATE_LIB_OK", "TRUE")
 
-import torch
-import whisper
-from moviepy.editor import VideoFileClip
+# torch/whisper(openai 엔진), faster_whisper, openai 클라이언트는 실제로 쓸 때 import
+# (모듈 import만으로 ML 스택을 로딩하지 않도록)
 from firebase_admin import credentials, firestore
 import firebase_admin
 from dotenv import load_dotenv
-from openai import OpenAI
 
-try:
-    from faster_whisper import WhisperModel as FasterWhisperModel
-except ImportError:  # pragma: no cover - optional dep
-    FasterWhisperModel = None
+from ffmpeg_utils import get_ffmpeg_exe
+import stt_parallel
 
 load_dotenv()
 
@@ -39,7 +42,21 @@ if STT_ENGINE not in {"faster", "openai"}:
     STT_ENGINE = "faster"
 WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto").lower()
 FASTER_WHISPER_COMPUTE_TYPE = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+# faster-whisper 모델 하나가 동시에 처리할 수 있는 transcribe 호출 수 (배치 처리의 상주 Whisper 워커 수)
+FASTER_WHISPER_NUM_WORKERS = max(1, int(os.getenv("FASTER_WHISPER_NUM_WORKERS", "1") or 1))
 PAUSE_THRESHOLD_SEC = float(os.getenv("PAUSE_THRESHOLD_SEC", "2.0"))
+# process_single_video에서 추출한 16kHz WAV를 결과 폴더에 남길지 여부 (STT 자체는 WAV 없이 메모리에서 처리)
+STT_KEEP_WAV = os.getenv("STT_KEEP_WAV", "false").lower() in {"1", "true", "yes", "on"}
+# faster-whisper 세그먼트가 나올 때마다 진행률과 중간 전사 텍스트를 progress_cb로 전달
+STT_STREAM_PARTIALS = os.getenv("STT_STREAM_PARTIALS", "true").lower() in {"1", "true", "yes", "on"}
+# 중간 전사는 전체 텍스트 대신 마지막 N글자(partial_text)와 그 시작 위치(partial_offset)만 보냄
+STT_PARTIAL_TAIL_CHARS = max(1, int(os.getenv("STT_PARTIAL_TAIL_CHARS", "500") or 500))
+# 긴 녹화본용: VAD로 발화 구간을 청크로 나눠 워커 프로세스 여러 개에서 병렬 전사 (faster 엔진 전용)
+STT_VAD_PARALLEL = os.getenv("STT_VAD_PARALLEL", "false").lower() in {"1", "true", "yes", "on"}
+STT_PARALLEL_WORKERS = max(1, int(os.getenv("STT_PARALLEL_WORKERS", "2") or 2))
+STT_CHUNK_SEC = max(10.0, float(os.getenv("STT_CHUNK_SEC", "120") or 120))
+STT_VAD_MIN_SILENCE_MS = max(100, int(os.getenv("STT_VAD_MIN_SILENCE_MS", "500") or 500))
+SAMPLE_RATE = 16000  # Whisper 입력 샘플레이트
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # 기본값(None) 시 OpenAI 공식 엔드포인트
@@ -59,17 +76,20 @@ FILLER_LIST = ", ".join(FILLER_WORDS)
 
 _WHISPER_MODEL = None
 _FASTER_WHISPER_MODEL = None
+# 동시에 들어온 첫 요청들이 모델을 두 번 로딩하지 않도록 보호
+_MODEL_LOCK = threading.Lock()
 _stt_progress = {"progress": 0, "stage": "idle"}
 _stt_last_logged = {"progress": -1, "stage": ""}
 _firestore_client: Optional[firestore.Client] = None
 
-_llm_client: Optional[OpenAI] = None
+# LLM 클라이언트는 첫 호출 시 생성 (_get_llm_client), 여기서는 사용할 제공자만 결정
+_llm_client = None
+_llm_client_lock = threading.Lock()
 _llm_model: str = OPENAI_MODEL
 _llm_headers: Dict[str, str] = {}
-_llm_provider: str = "openai"
+_llm_provider: Optional[str] = None  # 키가 없으면 None (GPT 분석 건너뜀)
 
 if OPENAI_API_KEY:
-    _llm_client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None)
     _llm_model = OPENAI_MODEL
     _llm_provider = "openai"
 elif OPENROUTER_API_KEY:
@@ -78,23 +98,61 @@ elif OPENROUTER_API_KEY:
         _llm_headers["HTTP-Referer"] = OPENROUTER_SITE
     if OPENROUTER_TITLE:
         _llm_headers["X-Title"] = OPENROUTER_TITLE
-    _llm_client = OpenAI(base_url=OPENROUTER_BASE_URL, api_key=OPENROUTER_API_KEY)
     _llm_model = OPENROUTER_MODEL
     _llm_provider = "openrouter"
 
 
-def _clamp(value: int) -> int:
-    return max(0, min(100, value))
+def _get_llm_client():
+    """LLM 클라이언트 (키가 없으면 None). openai 패키지는 처음 필요할 때 import."""
+    global _llm_client
+    if _llm_provider is None:
+        return None
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                from openai import OpenAI
+                if _llm_provider == "openai":
+                    _llm_client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None)
+                else:
+                    _llm_client = OpenAI(base_url=OPENROUTER_BASE_URL, api_key=OPENROUTER_API_KEY)
+    return _llm_client
+
+
+# 전사/음성 분석 결과 형식이 바뀌면 올려서 결과 캐시에 남은 이전 결과를 무효화
+STT_RESULT_VERSION = 1
+
+
+def stt_config() -> dict:
+    """whisper_transcribe 결과에 영향을 주는 설정값 (결과 캐시 키용)."""
+    return {
+        "version": STT_RESULT_VERSION,
+        "engine": STT_ENGINE,
+        "model_size": WHISPER_MODEL_SIZE,
+        "device": WHISPER_DEVICE,
+        "compute_type": FASTER_WHISPER_COMPUTE_TYPE,
+        "language": "ko",
+        "vad_parallel": (
+            {"chunk_sec": STT_CHUNK_SEC, "min_silence_ms": STT_VAD_MIN_SILENCE_MS}
+            if STT_VAD_PARALLEL and STT_ENGINE == "faster" else None
+        ),
+    }
+
+
+def voice_analysis_config() -> dict:
+    """analyze_voice_rhythm_and_patterns 결과에 영향을 주는 설정값 (결과 캐시 키용)."""
+    return {
+        "version": STT_RESULT_VERSION,
+        "stt": stt_config(),
+        "pause_threshold_sec": PAUSE_THRESHOLD_SEC,
+        "llm_provider": _llm_provider,
+        "llm_model": _llm_model if _llm_provider else None,
+        "hesitation_patterns": HESITATION_PATTERNS,
+        "filler_words": FILLER_WORDS,
+    }
 
 
-def _resolve_device() -> str:
-    if WHISPER_DEVICE != "auto":
-        return WHISPER_DEVICE
-    if torch.cuda.is_available():
-        return "cuda"
-    if hasattr(torch.backends, "mps") and torch.backends.mps.is_available():
-        return "mps"
-    return "cpu"
+def _clamp(value: int) -> int:
+    return max(0, min(100, value))
 
 
 def set_stt_progress(progress: Optional[int] = None, stage: Optional[str] = None):
@@ -120,6 +178,18 @@ def reset_stt_progress():
     set_stt_progress(0, "idle")
 
 
+def _stt_reporter(progress_cb=None):
+    """
+    전역 진행률(기존 /analyze/stt/progress)과 요청별 progress_cb(percent, stage, **extra)에 함께 보고.
+    extra(partial_text 등)는 요청별 콜백에만 전달.
+    """
+    def report(progress: Optional[int] = None, stage: Optional[str] = None, **extra):
+        set_stt_progress(progress, stage)
+        if progress_cb is not None:
+            progress_cb(progress, stage, **extra)
+    return report
+
+
 # ------------------------------------
 # 1. Firebase 초기화 및 DB 함수
 # ------------------------------------
@@ -204,59 +274,139 @@ def upload_to_firebase_voice_analysis(user_id: str, file_name: str, analysis_dat
 # ------------------------------------
 # 2. 오디오 추출 함수
 # ------------------------------------
+def load_audio_pcm(video_path: Path) -> np.ndarray:
+    """
+    ffmpeg 서브프로세스로 영상의 오디오를 16kHz mono float32 PCM으로 디코딩해 바로 NumPy 배열로 반환.
+    (중간 WAV 파일 없이 Whisper/faster-whisper에 그대로 전달 가능)
+    """
+    cmd = [
+        get_ffmpeg_exe(), "-nostdin", "-v", "error",
+        "-i", str(video_path),
+        "-vn", "-sn", "-dn",
+        "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "f32le", "-acodec", "pcm_f32le", "pipe:1",
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # 파이프에서 바로 쓰기 가능한 버퍼로 읽음 (torch.from_numpy 등이 읽기 전용 배열을 경고하지 않도록)
+    buf = bytearray()
+    try:
+        while True:
+            chunk = proc.stdout.read(1 << 20)
+            if not chunk:
+                break
+            buf += chunk
+        stderr = proc.stderr.read()
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+        proc.wait()
+    if proc.returncode != 0:
+        message = stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg 오디오 디코딩 실패: {message or proc.returncode}")
+    usable = len(buf) - len(buf) % 4
+    return np.frombuffer(buf, dtype=np.float32, count=usable // 4)
+
+
+def write_wav(output_audio_path: Path, pcm: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """float32 PCM을 16-bit mono WAV로 저장 (요청 시에만 사용)."""
+    samples = (np.clip(pcm, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(str(output_audio_path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+
+
 def extract_audio(video_path: Path, output_audio_path: Path) -> bool:
+    """영상에서 16kHz mono WAV를 추출 (WAV 파일이 필요한 경우용, STT에는 load_audio_pcm 사용)."""
     try:
-        with VideoFileClip(str(video_path)) as video_clip:
-            audio_clip = video_clip.audio
-            audio_clip.write_audiofile(
-                str(output_audio_path),
-                codec='pcm_s16le',
-                fps=16000,
-                verbose=False,
-                logger=None
-            )
+        write_wav(output_audio_path, load_audio_pcm(video_path))
         return True
     except Exception as e:
         print(f"  ❌ 오디오 추출 실패: {e}")
         return False
 
 
+def _whisper_input(audio: Union[Path, str, np.ndarray]):
+    """Whisper 엔진 입력: PCM 배열은 그대로, 경로는 문자열로."""
+    if isinstance(audio, np.ndarray):
+        return audio
+    return str(audio)
+
+
 # ------------------------------------
 # 3. Whisper STT 전사 및 분석 자료 생성 함수
 # ------------------------------------
 def get_whisper_model():
     global _WHISPER_MODEL
     if _WHISPER_MODEL is None:
-        print(f"  -> [STT] Whisper {WHISPER_MODEL_SIZE} 모델 로딩 중...")
-        _WHISPER_MODEL = whisper.load_model(WHISPER_MODEL_SIZE)
+        with _MODEL_LOCK:
+            if _WHISPER_MODEL is None:
+                import whisper  # openai 엔진일 때만 torch/whisper를 로딩
+
+                print(f"  -> [STT] Whisper {WHISPER_MODEL_SIZE} 모델 로딩 중...")
+                _WHISPER_MODEL = whisper.load_model(WHISPER_MODEL_SIZE)
     return _WHISPER_MODEL
 
 
+def _faster_device() -> str:
+    """faster-whisper(CTranslate2) 실행 장치. auto면 CTranslate2로 CUDA 여부만 확인 (torch import 불필요)."""
+    device = WHISPER_DEVICE
+    if device == "auto":
+        import ctranslate2
+
+        device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    if device == "mps":
+        print("⚠️ faster-whisper는 MPS를 지원하지 않아 CPU로 대체합니다. (.env에서 WHISPER_DEVICE=cpu 지정 가능)")
+        device = "cpu"
+    return device
+
+
 def get_faster_whisper_model():
     global _FASTER_WHISPER_MODEL
-    if FasterWhisperModel is None:
-        raise RuntimeError("faster-whisper 패키지가 설치되어 있지 않습니다. pip install faster-whisper")
     if _FASTER_WHISPER_MODEL is None:
-        device = _resolve_device()
-        if device == "mps":
-            print("⚠️ faster-whisper는 MPS를 지원하지 않아 CPU로 대체합니다. (.env에서 WHISPER_DEVICE=cpu 지정 가능)")
-            device = "cpu"
-        print(f"  -> [STT] faster-whisper {WHISPER_MODEL_SIZE} 모델 로딩 중... (device={device}, compute={FASTER_WHISPER_COMPUTE_TYPE})")
-        _FASTER_WHISPER_MODEL = FasterWhisperModel(
-            WHISPER_MODEL_SIZE,
-            device=device,
-            compute_type=FASTER_WHISPER_COMPUTE_TYPE,
-        )
+        with _MODEL_LOCK:
+            if _FASTER_WHISPER_MODEL is None:
+                try:
+                    from faster_whisper import WhisperModel as FasterWhisperModel
+                except ImportError as e:
+                    raise RuntimeError("faster-whisper 패키지가 설치되어 있지 않습니다. pip install faster-whisper") from e
+                device = _faster_device()
+                print(f"  -> [STT] faster-whisper {WHISPER_MODEL_SIZE} 모델 로딩 중... (device={device}, compute={FASTER_WHISPER_COMPUTE_TYPE})")
+                _FASTER_WHISPER_MODEL = FasterWhisperModel(
+                    WHISPER_MODEL_SIZE,
+                    device=device,
+                    compute_type=FASTER_WHISPER_COMPUTE_TYPE,
+                    num_workers=FASTER_WHISPER_NUM_WORKERS,
+                )
     return _FASTER_WHISPER_MODEL
 
 
-def transcribe_with_openai(audio_path: Path):
+def warm_up_stt_model() -> float:
+    """
+    서버 시작 시 호출: 설정된 엔진의 모델을 로딩하고 1초 무음으로 짧게 추론해
+    첫 요청의 모델 로딩·커널 초기화 지연을 없앰. 소요 시간(초)을 반환.
+    """
+    started = time.time()
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    if STT_ENGINE == "openai":
+        get_whisper_model().transcribe(silence, language="ko", verbose=None)
+    else:
+        segments, _ = get_faster_whisper_model().transcribe(silence, language="ko", beam_size=1)
+        list(segments)  # generator를 소비해야 실제 추론이 실행됨
+    elapsed = time.time() - started
+    print(f"🔥 STT 모델 워밍업 완료 ({STT_ENGINE}, {WHISPER_MODEL_SIZE}, {elapsed:.1f}s)")
+    return elapsed
+
+
+def transcribe_with_openai(audio_path: Union[Path, np.ndarray], progress_cb=None):
+    report = _stt_reporter(progress_cb)
     print(f"  -> [STT] Whisper {WHISPER_MODEL_SIZE} (openai) 모델 로딩 및 전사 중...")
     try:
         model = get_whisper_model()
-        set_stt_progress(50, "Whisper 추론 중")
+        report(50, "Whisper 추론 중")
         result = model.transcribe(
-            str(audio_path),
+            _whisper_input(audio_path),
             language="ko",
             word_timestamps=True,
             verbose=WHISPER_VERBOSE
@@ -281,41 +431,92 @@ def transcribe_with_openai(audio_path: Path):
         }
 
         print("  ✅ STT 전사 완료.")
-        set_stt_progress(65, "STT 결과 정리")
+        report(65, "STT 결과 정리")
         return analysis_data
 
     except Exception as e:
         print(f"  ❌ Whisper 전사 실패: {e}")
-        set_stt_progress(50, "Whisper 오류")
+        report(50, "Whisper 오류")
         return None
 
 
-def transcribe_with_faster(audio_path: Path):
+def _faster_word(word) -> Dict[str, Any]:
+    return {
+        "word": word.word.strip(),
+        "start": float(word.start) if word.start is not None else None,
+        "end": float(word.end) if word.end is not None else None,
+        "probability": float(getattr(word, "probability", 0.0))
+    }
+
+
+class _PartialTranscript:
+    """
+    중간 전사 보고용. 세그먼트마다 전체 텍스트를 다시 이어 붙여 보내면 긴 녹화본에서 작업량·전송량이
+    세그먼트 수의 제곱으로 늘어나므로, " ".join(전체 텍스트)의 마지막 tail_chars 글자만 유지.
+    클라이언트는 text = text[:partial_offset] + partial_text 로 이어 붙임
+    (진행률 스냅샷이 합쳐져 중간 보고가 빠져도 tail 범위 안이면 그대로 복원됨).
+    """
+
+    def __init__(self, tail_chars: int = STT_PARTIAL_TAIL_CHARS):
+        self.tail_chars = tail_chars
+        self.length = 0
+        self._segments = deque()
+        self._segments_len = 0
+
+    def add(self, text: str):
+        if not text:
+            return
+        sep = 1 if self.length else 0
+        self.length += sep + len(text)
+        self._segments_len += (1 if self._segments else 0) + len(text)
+        self._segments.append(text)
+        # 맨 앞 세그먼트를 빼도 tail_chars 이상 남으면 버림
+        while len(self._segments) > 1 and self._segments_len - len(self._segments[0]) - 1 >= self.tail_chars:
+            self._segments_len -= len(self._segments.popleft()) + 1
+
+    def report(self) -> Dict[str, Any]:
+        tail = " ".join(self._segments)[-self.tail_chars:]
+        return {"partial_text": tail, "partial_offset": self.length - len(tail)}
+
+
+def transcribe_with_faster(audio_path: Union[Path, np.ndarray], progress_cb=None,
+                           stream_partials: Optional[bool] = None):
+    """
+    faster-whisper의 lazy 세그먼트 generator를 하나씩 소비하며 전사 결과를 누적.
+    stream_partials(None이면 STT_STREAM_PARTIALS)가 켜져 있으면 세그먼트마다
+    segment.end / info.duration 기준 진행률(45→65%)과 중간 전사 텍스트의 끝부분(partial_text, partial_offset)을 보고.
+    """
+    report = _stt_reporter(progress_cb)
+    if stream_partials is None:
+        stream_partials = STT_STREAM_PARTIALS
     try:
         model = get_faster_whisper_model()
-        set_stt_progress(45, "faster-whisper 추론 준비")
+        report(45, "faster-whisper 추론 준비")
         segments, info = model.transcribe(
-            str(audio_path),
+            _whisper_input(audio_path),
             language="ko",
             beam_size=5,
             word_timestamps=True
         )
-        collected_segments: List[Any] = list(segments)
-        set_stt_progress(55, "faster-whisper 추론 중")
+        duration_sec = float(info.duration) if info and info.duration else 0.0
 
-        full_text = " ".join(seg.text.strip() for seg in collected_segments).strip()
+        texts: List[str] = []
         word_timestamps: List[Dict[str, Any]] = []
-        for seg in collected_segments:
+        partial = _PartialTranscript()
+        for seg in segments:  # 세그먼트는 디코딩되는 즉시 하나씩 생성됨
+            text = seg.text.strip()
+            if text:
+                texts.append(text)
+                partial.add(text)
             if seg.words:
-                for word in seg.words:
-                    word_timestamps.append({
-                        "word": word.word.strip(),
-                        "start": float(word.start) if word.start is not None else None,
-                        "end": float(word.end) if word.end is not None else None,
-                        "probability": float(getattr(word, "probability", 0.0))
-                    })
-
-        duration_sec = float(info.duration) if info and info.duration else 0.0
+                word_timestamps.extend(_faster_word(word) for word in seg.words)
+            if stream_partials and duration_sec > 0:
+                ratio = min(1.0, float(seg.end) / duration_sec)
+                report(45 + int(20 * ratio), "faster-whisper 추론 중",
+                       transcribed_sec=round(float(seg.end), 1), word_count=len(word_timestamps),
+                       **partial.report())
+
+        full_text = " ".join(texts).strip()
         if not duration_sec and word_timestamps:
             duration_sec = float(word_timestamps[-1].get("end") or 0.0)
 
@@ -326,21 +527,67 @@ def transcribe_with_faster(audio_path: Path):
             "word_count": len(word_timestamps)
         }
 
-        set_stt_progress(65, "STT 결과 정리")
+        report(65, "STT 결과 정리")
         return analysis_data
     except Exception as e:
         print(f"  ❌ faster-whisper 전사 실패: {e}")
-        set_stt_progress(50, "Whisper 오류")
+        report(50, "Whisper 오류")
         return None
 
 
-def whisper_transcribe(audio_path: Path):
+def transcribe_with_vad_parallel(audio_path: Union[Path, np.ndarray], progress_cb=None):
+    """
+    VAD로 발화 구간만 골라 STT_CHUNK_SEC 안팎의 청크로 나누고, STT_PARALLEL_WORKERS개의
+    워커 프로세스(프로세스마다 faster-whisper 모델 1개)에서 동시에 전사 (stt_parallel 참고).
+    결과에는 VAD 무음 구간(silence_intervals)이 포함되어 pause 분석에 그대로 쓰임.
+    """
+    report = _stt_reporter(progress_cb)
+    try:
+        pcm = audio_path if isinstance(audio_path, np.ndarray) else load_audio_pcm(Path(audio_path))
+        report(45, "VAD 발화 구간 분할")
+
+        partial = _PartialTranscript()
+
+        def on_chunk(ratio: float, new_text: str):
+            partial.add(new_text)
+            report(45 + int(20 * ratio), "faster-whisper 청크 병렬 추론 중", **partial.report())
+
+        result = stt_parallel.transcribe_parallel(
+            pcm,
+            model_size=WHISPER_MODEL_SIZE,
+            device=_faster_device(),
+            compute_type=FASTER_WHISPER_COMPUTE_TYPE,
+            workers=STT_PARALLEL_WORKERS,
+            chunk_sec=STT_CHUNK_SEC,
+            min_silence_ms=STT_VAD_MIN_SILENCE_MS,
+            progress_cb=on_chunk if STT_STREAM_PARTIALS else None,
+        )
+        report(65, "STT 결과 정리")
+        return result
+    except Exception as e:
+        print(f"  ❌ VAD 병렬 전사 실패: {e}")
+        report(50, "Whisper 오류")
+        return None
+
+
+def whisper_transcribe(audio_path: Union[Path, np.ndarray], progress_cb=None):
+    """
+    audio_path: 오디오 파일 경로 또는 load_audio_pcm()의 16kHz float32 PCM 배열
+    progress_cb: 요청별 진행률 콜백 progress_cb(percent, stage)
+    STT_VAD_PARALLEL이 켜져 있으면 VAD 청크 병렬 전사를 먼저 시도하고, 실패 시 단일 모델 전사로 대체.
+    """
     if STT_ENGINE == "openai":
-        return transcribe_with_openai(audio_path)
-    result = transcribe_with_faster(audio_path)
+        return transcribe_with_openai(audio_path, progress_cb)
+    result = None
+    if STT_VAD_PARALLEL:
+        result = transcribe_with_vad_parallel(audio_path, progress_cb)
+        if result is None:
+            print("⚠️ VAD 병렬 전사 실패, 단일 faster-whisper로 재시도합니다.")
+    if result is None:
+        result = transcribe_with_faster(audio_path, progress_cb)
     if result is None:
         print("⚠️ faster-whisper 실패, 기본 Whisper로 재시도합니다.")
-        return transcribe_with_openai(audio_path)
+        return transcribe_with_openai(audio_path, progress_cb)
     return result
 
 
@@ -351,7 +598,8 @@ def analyze_speech_patterns_with_gpt(full_text: str) -> Dict[str, Any]:
     """LLM(기본: OpenAI, 옵션: OpenRouter)로 말끝 흐림·추임새를 JSON으로 반환."""
     if not full_text:
         return {}
-    if not _llm_client:
+    client = _get_llm_client()
+    if client is None:
         print("⚠️ OPENAI_API_KEY/OPENROUTER_API_KEY가 설정되지 않아 GPT 분석을 건너뜁니다.")
         return {}
 
@@ -362,7 +610,7 @@ def analyze_speech_patterns_with_gpt(full_text: str) -> Dict[str, Any]:
     )
 
     try:
-        completion = _llm_client.chat.completions.create(
+        completion = client.chat.completions.create(
             model=_llm_model,
             response_format={"type": "json_object"},
             messages=[
@@ -378,7 +626,11 @@ def analyze_speech_patterns_with_gpt(full_text: str) -> Dict[str, Any]:
 
 
 def analyze_voice_rhythm_and_patterns(stt_result_data: dict) -> dict:
-    """WPM/무음/추임새·말끝 분석을 수행합니다."""
+    """
+    WPM/무음/추임새·말끝 분석을 수행합니다.
+    전사 결과에 VAD 무음 구간(silence_intervals)이 있으면 그것을 pause로 사용하고,
+    없으면 단어 사이 간격으로 계산합니다.
+    """
     words = stt_result_data.get('words', [])
     total_duration = stt_result_data.get('duration_sec', 0.0)
     word_count = len(words)
@@ -387,18 +639,25 @@ def analyze_voice_rhythm_and_patterns(stt_result_data: dict) -> dict:
     pause_events: List[Dict] = []
     all_pause_durations: List[float] = []
 
-    for i in range(len(words) - 1):
-        current_word_end = words[i].get('end', 0.0)
-        next_word_start = words[i+1].get('start', 0.0)
-        gap_duration = next_word_start - current_word_end
-        if gap_duration > 0:
-            all_pause_durations.append(gap_duration)
-        if gap_duration >= PAUSE_THRESHOLD_SEC:
-            pause_events.append({
-                "start_sec": round(current_word_end, 2),
-                "end_sec": round(next_word_start, 2),
-                "duration": round(gap_duration, 2)
-            })
+    silences = stt_result_data.get('silence_intervals')
+    if silences is not None:
+        for interval in silences:
+            all_pause_durations.append(interval['duration'])
+            if interval['duration'] >= PAUSE_THRESHOLD_SEC:
+                pause_events.append(dict(interval))
+    else:
+        for i in range(len(words) - 1):
+            current_word_end = words[i].get('end', 0.0)
+            next_word_start = words[i+1].get('start', 0.0)
+            gap_duration = next_word_start - current_word_end
+            if gap_duration > 0:
+                all_pause_durations.append(gap_duration)
+            if gap_duration >= PAUSE_THRESHOLD_SEC:
+                pause_events.append({
+                    "start_sec": round(current_word_end, 2),
+                    "end_sec": round(next_word_start, 2),
+                    "duration": round(gap_duration, 2)
+                })
 
     total_pause_count = len(all_pause_durations)
     avg_pause_duration = round(sum(all_pause_durations) / total_pause_count, 2) if total_pause_count > 0 else 0.0
@@ -443,6 +702,36 @@ def analyze_voice_rhythm_and_patterns(stt_result_data: dict) -> dict:
 # ------------------------------------
 # 5. 통합 배치/단일 처리 함수
 # ------------------------------------
+def save_stt_outputs(stt_result: dict, output_json_dir: Path, base_name: str,
+                     audio_path: Optional[Path] = None) -> dict:
+    """전사 텍스트(txt)와 분석 자료(json)를 저장하고 stt_result에 file_paths/base_name을 기록."""
+    output_json_dir = Path(output_json_dir)
+    output_json_dir.mkdir(parents=True, exist_ok=True)
+    txt_path = output_json_dir / f"{base_name}_text.txt"
+    json_path = output_json_dir / f"{base_name}_analysis.json"
+    try:
+        with open(txt_path, 'w', encoding='utf-8') as f:
+            f.write(stt_result['full_text'])
+        print(f"  ✅ 텍스트 파일 저장 완료: {txt_path}")
+    except Exception as e:
+        print(f"  ❌ TXT 파일 저장 실패: {e}")
+
+    try:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(stt_result, f, ensure_ascii=False, indent=4)
+        print(f"  ✅ 분석 자료 JSON 저장 완료: {json_path}")
+    except Exception as e:
+        print(f"  ❌ JSON 파일 저장 실패: {e}")
+
+    stt_result["file_paths"] = {
+        "audio": str(audio_path) if audio_path else None,
+        "text": str(txt_path),
+        "json": str(json_path),
+    }
+    stt_result["base_name"] = base_name
+    return stt_result
+
+
 def process_single_video(
     video_path: Path,
     user_id: Optional[str] = None,
@@ -451,12 +740,18 @@ def process_single_video(
     upload_to_firebase: bool = True,
     output_basename: Optional[str] = None,
     enable_gpt_analysis: bool = True,
+    progress_cb=None,
+    keep_wav: Optional[bool] = None,
 ):
-    """단일 영상 파일에 대한 STT 분석 및 결과 저장."""
-    set_stt_progress(0, "파일 검증")
+    """
+    단일 영상 파일에 대한 STT 분석 및 결과 저장. progress_cb: 요청별 진행률 콜백 progress_cb(percent, stage)
+    keep_wav: 추출한 오디오를 WAV로 남길지 여부 (None이면 STT_KEEP_WAV)
+    """
+    report = _stt_reporter(progress_cb)
+    report(0, "파일 검증")
     video_path = Path(video_path)
     if not video_path.exists():
-        set_stt_progress(0, "파일 없음")
+        report(0, "파일 없음")
         raise FileNotFoundError(f"영상 파일을 찾을 수 없습니다: {video_path}")
 
     user_id = user_id or FIREBASE_USER_ID
@@ -468,50 +763,35 @@ def process_single_video(
 
     base_name = output_basename or video_path.stem
     audio_path = output_audio_dir / f"{base_name}.wav"
-    txt_path = output_json_dir / f"{base_name}_text.txt"
-    json_path = output_json_dir / f"{base_name}_analysis.json"
-
-    set_stt_progress(5, "오디오 추출")
-    if not extract_audio(video_path, audio_path):
-        set_stt_progress(5, "오디오 추출 실패")
-        raise RuntimeError("오디오 추출에 실패했습니다.")
 
-    set_stt_progress(30, "Whisper 로딩")
-    stt_result = whisper_transcribe(audio_path)
-    if not stt_result:
-        set_stt_progress(30, "STT 실패")
-        raise RuntimeError("STT 전사에 실패했습니다.")
-
-    set_stt_progress(70, "결과 저장")
+    report(5, "오디오 추출")
     try:
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(stt_result['full_text'])
-        print(f"  ✅ 텍스트 파일 저장 완료: {txt_path}")
+        pcm = load_audio_pcm(video_path)
     except Exception as e:
-        print(f"  ❌ TXT 파일 저장 실패: {e}")
-
-    try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(stt_result, f, ensure_ascii=False, indent=4)
-        print(f"  ✅ 분석 자료 JSON 저장 완료: {json_path}")
-    except Exception as e:
-        print(f"  ❌ JSON 파일 저장 실패: {e}")
+        report(5, "오디오 추출 실패")
+        raise RuntimeError(f"오디오 추출에 실패했습니다: {e}") from e
+    if STT_KEEP_WAV if keep_wav is None else keep_wav:
+        write_wav(audio_path, pcm)
+    else:
+        audio_path = None
+
+    report(30, "Whisper 로딩")
+    stt_result = whisper_transcribe(pcm, progress_cb)
+    if not stt_result:
+        report(30, "STT 실패")
+        raise RuntimeError("STT 전사에 실패했습니다.")
 
-    stt_result["file_paths"] = {
-        "audio": str(audio_path),
-        "text": str(txt_path),
-        "json": str(json_path),
-    }
-    stt_result["base_name"] = base_name
+    report(70, "결과 저장")
+    save_stt_outputs(stt_result, output_json_dir, base_name, audio_path)
 
     voice_analysis = None
-    if enable_gpt_analysis and _llm_client:
-        set_stt_progress(80, "GPT 언어습관 분석")
+    if enable_gpt_analysis and _llm_provider:
+        report(80, "GPT 언어습관 분석")
         voice_analysis = analyze_voice_rhythm_and_patterns(stt_result)
         stt_result["voice_analysis"] = voice_analysis
 
     if upload_to_firebase:
-        set_stt_progress(85, "Firebase 업로드 준비")
+        report(85, "Firebase 업로드 준비")
         is_firebase_ok = initialize_firebase()
         if is_firebase_ok:
             upload_to_firebase_text(user_id, base_name, stt_result)
@@ -520,31 +800,18 @@ def process_single_video(
         else:
             print("  ⚠️ Firebase 설정이 올바르지 않아 업로드를 건너뜁니다.")
 
-    set_stt_progress(100, "완료")
+    report(100, "완료")
     return stt_result
 
 
-def process_multiple_videos(input_dir, output_dir_audio, output_dir_json, user_id):
-    input_dir = Path(input_dir)
-    video_files = [f for f in input_dir.glob("*.mp4")]
-
-    if not video_files:
-        print(f"경고: '{input_dir}'에서 처리할 MP4 영상 파일을 찾을 수 없습니다.")
-        return
+def process_multiple_videos(input_dir, output_dir_audio, output_dir_json, user_id, resume: bool = True):
+    """
+    폴더 안의 MP4를 배치 파이프라인으로 처리 (오디오 추출·Whisper·LLM/Firestore 단계가 파일 간에 겹쳐 실행).
+    resume: 같은 설정으로 이미 처리된 파일은 건너뜀. 처리 요약 리포트(dict)를 반환.
+    """
+    from stt_batch import run_batch
 
-    print(f"총 {len(video_files)}개의 영상을 처리합니다. 사용자 ID: {user_id}")
-
-    for i, video_file in enumerate(video_files, start=1):
-        print(f"\n--- [{i}/{len(video_files)}] {video_file.name} 처리 시작 ---")
-        try:
-            process_single_video(
-                video_file,
-                user_id=user_id,
-                output_audio_dir=output_dir_audio,
-                output_json_dir=output_dir_json,
-            )
-        except Exception as exc:
-            print(f"  ❌ {video_file.name} 처리 실패: {exc}")
+    return run_batch(input_dir, output_dir_audio, output_dir_json, user_id, resume=resume)
 
 
 if __name__ == "__main__":
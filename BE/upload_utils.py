@@ -0,0 +1,64 @@
+"""
+업로드 파일 저장 유틸리티
+
+UploadFile 전체를 메모리에 올리지 않고 청크 단위로 디스크에 스트리밍 저장합니다.
+저장하면서 sha256을 함께 계산해, 같은 영상의 중복 분석 판단에 쓸 수 있도록 반환합니다.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# 한 번에 읽고 쓰는 크기 (기본 1MB)
+UPLOAD_CHUNK_SIZE = max(64 * 1024, int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)) or 1024 * 1024))
+# 업로드 최대 크기 (MB, 0이면 제한 없음)
+UPLOAD_MAX_MB = float(os.getenv("UPLOAD_MAX_MB", "1024") or 0)
+
+
+class UploadTooLargeError(Exception):
+    """업로드 파일이 최대 크기를 넘음 (API에서 413으로 응답)."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"업로드 파일이 최대 크기({max_bytes / (1024 * 1024):.0f}MB)를 초과했습니다.")
+        self.max_bytes = max_bytes
+
+
+def _default_max_bytes() -> int:
+    return int(UPLOAD_MAX_MB * 1024 * 1024)
+
+
+async def save_upload(file: UploadFile, dest: Union[str, Path], chunk_size: int = UPLOAD_CHUNK_SIZE,
+                      max_bytes: Optional[int] = None) -> Tuple[int, str]:
+    """
+    UploadFile을 dest에 청크 단위로 저장하고 (저장 바이트 수, sha256 hex)를 반환.
+    max_bytes(None이면 UPLOAD_MAX_MB, 0이면 제한 없음)를 넘으면 저장 중이던 파일을 지우고 UploadTooLargeError.
+    """
+    if max_bytes is None:
+        max_bytes = _default_max_bytes()
+    dest = Path(dest)
+    digest = hashlib.sha256()
+    size = 0
+    out = await run_in_threadpool(open, dest, "wb")
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            digest.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        out.close()
+        dest.unlink(missing_ok=True)
+        raise
+    else:
+        out.close()
+    finally:
+        await file.close()
+    return size, digest.hexdigest()
@@ -3,22 +3,90 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import math
+import random
 import sys
 import time
+import multiprocessing
+import queue
+import threading
+from contextlib import contextmanager
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from video_decoder import DECODE_BACKENDS, FrameReader, merge_decode_stats
+from video_features import (
+    COL,
+    DEFAULT_THRESHOLDS,
+    FeatureRecorder,
+    TraceSampler,
+    build_video_result,
+    save_feature_series,
+)
 
 # ============================
 # 진행률 상태 관리용 (공유 변수)
+# 기존 /analyze/progress 호환용. 동시 요청을 구분하려면 analyze_video(progress_cb=...) 사용
 # ============================
 _progress = 0
+_progress_listeners = []
 
 def set_progress(value: int):
     global _progress
-    _progress = max(0, min(100, value))
+    value = max(0, min(100, value))
+    changed = value != _progress
+    _progress = value
+    if changed:
+        for listener in _progress_listeners:
+            listener(value)
+
+def add_progress_listener(listener):
+    """전역 진행률이 바뀔 때 listener(value) 호출 (SSE 구독자 알림용)."""
+    _progress_listeners.append(listener)
 
 def get_progress():
     return _progress
 
 
+# ============================
+# 분석 설정 (환경 변수)
+# ============================
+# 분석 FPS: 0 또는 미설정이면 모든 프레임 분석, 예) 5, 10
+VIDEO_ANALYSIS_FPS = float(os.getenv("VIDEO_ANALYSIS_FPS", "0") or 0)
+# 병렬 분석 워커 수: 1이면 기존처럼 단일 루프로 분석
+VIDEO_ANALYSIS_WORKERS = int(os.getenv("VIDEO_ANALYSIS_WORKERS", "1") or 1)
+# 세그먼트 최소 길이(초): 너무 짧게 쪼개면 모델 초기화 비용이 더 큼
+VIDEO_MIN_SEGMENT_SEC = float(os.getenv("VIDEO_MIN_SEGMENT_SEC", "20") or 20)
+# 추론 입력 최대 변 길이(px): 0이면 원본 해상도 그대로 MediaPipe에 전달
+VIDEO_INFERENCE_MAX_SIDE = int(os.getenv("VIDEO_INFERENCE_MAX_SIDE", "0") or 0)
+# Pose 결과로 FaceMesh/Hands 실행 여부를 결정하는 캐스케이드 모드
+VIDEO_MODEL_CASCADE = os.getenv("VIDEO_MODEL_CASCADE", "false").lower() in {"1", "true", "yes", "on"}
+# FaceMesh 홍채 보정(refine_landmarks): 사용하는 랜드마크(1, 33, 263)는 보정 없이도 제공됨
+VIDEO_FACE_REFINE_LANDMARKS = os.getenv("VIDEO_FACE_REFINE_LANDMARKS", "true").lower() in {"1", "true", "yes", "on"}
+# 캐스케이드 판정에 쓰는 Pose 랜드마크 visibility 하한
+CASCADE_MIN_VISIBILITY = float(os.getenv("VIDEO_CASCADE_MIN_VISIBILITY", "0.5") or 0.5)
+# 디코딩 방식: opencv(기본) 또는 ffmpeg(축소 해상도·FPS로 파이프 디코딩)
+VIDEO_DECODE_BACKEND = os.getenv("VIDEO_DECODE_BACKEND", "opencv").lower()
+if VIDEO_DECODE_BACKEND not in DECODE_BACKENDS:
+    VIDEO_DECODE_BACKEND = "opencv"
+# 디코딩 스레드와 추론 사이 프레임 큐 크기 (0이면 디코딩 스레드 없이 순차 처리)
+VIDEO_DECODE_QUEUE = int(os.getenv("VIDEO_DECODE_QUEUE", "8") or 0)
+# 단계별 처리 시간 측정(metadata.timings) 여부
+VIDEO_PROFILE = os.getenv("VIDEO_PROFILE", "false").lower() in {"1", "true", "yes", "on"}
+# 지표 계산 방식이 바뀌면 올려서 결과 캐시에 남은 이전 결과를 무효화
+VIDEO_ANALYZER_VERSION = 2
+# 미리 만들어 두고 재사용하는 MediaPipe 모델 세트(FaceMesh/Pose/Hands) 수 = 동시 분석 가능 수
+VIDEO_MODEL_POOL_SIZE = max(1, int(os.getenv("VIDEO_MODEL_POOL_SIZE", "2") or 2))
+# 풀에서 모델 세트를 기다리는 최대 시간(초), 0이면 무한 대기
+VIDEO_MODEL_POOL_TIMEOUT = float(os.getenv("VIDEO_MODEL_POOL_TIMEOUT", "0") or 0)
+
+
+def _resolve_frame_stride(fps: float, target_fps) -> int:
+    """원본 FPS와 목표 분석 FPS로부터 몇 프레임마다 분석할지(stride)를 계산."""
+    if not target_fps or target_fps <= 0 or fps <= 0 or target_fps >= fps:
+        return 1
+    return max(1, int(round(fps / target_fps)))
+
+
 # ============================
 # MediaPipe 초기화
 # ============================
@@ -26,228 +94,824 @@ mp_face = mp.solutions.face_mesh
 mp_pose = mp.solutions.pose
 mp_hands = mp.solutions.hands
 
+_CASCADE_FACE_LANDMARKS = (
+    mp_pose.PoseLandmark.NOSE,
+    mp_pose.PoseLandmark.LEFT_EYE,
+    mp_pose.PoseLandmark.RIGHT_EYE,
+)
+_CASCADE_WRIST_LANDMARKS = (
+    mp_pose.PoseLandmark.LEFT_WRIST,
+    mp_pose.PoseLandmark.RIGHT_WRIST,
+)
+
 
-def analyze_video(video_path: str):
+# ============================
+# 세그먼트별 누적기 (병합 가능)
+# ============================
+class _RunningStats:
     """
-    발표 영상의 시선·자세·몸짓·손동작·머리방향을 분석하는 함수
-    진행률(%) 실시간 업데이트 포함
+    Welford 방식(count/mean/M2) 스트리밍 누적기. 값 목록을 보관하지 않아 메모리가 O(1)이고,
+    Chan 병합식으로 세그먼트 결과를 합쳐도 평균/표준편차가 정확함.
     """
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError(f"❌ 영상 파일을 열 수 없습니다: {video_path}")
-
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration_sec = frame_count / fps if fps > 0 else 0
-
-    # ============================
-    # 결과 저장용 변수
-    # ============================
-    gaze_trace = []
-    gaze_center_hits = 0
-    total_frames = 0
-    left_count, center_count, right_count = 0, 0, 0
-    gaze_movements = 0
-
-    shoulder_xs, shoulder_ys = [], []
-    posture_stability_values = []
-    motion_energy_values = []
-    hand_visible_frames = 0
-    hand_movement_values = []
-    head_rolls, head_yaws = [] , []
-
-    prev_pose_coords = None
-    prev_eye_center = None
-
-    # ============================
-    # MediaPipe 객체 초기화
-    # ============================
-    face_mesh = mp_face.FaceMesh(refine_landmarks=True, min_detection_confidence=0.4)
-    pose = mp_pose.Pose(min_detection_confidence=0.4)
-    hands = mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.4)
+    __slots__ = ("count", "mean_", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean_ = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean_
+        self.mean_ += delta / self.count
+        self.m2 += delta * (value - self.mean_)
+
+    def merge(self, other: "_RunningStats"):
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean_, self.m2 = other.count, other.mean_, other.m2
+            return
+        total = self.count + other.count
+        delta = other.mean_ - self.mean_
+        self.mean_ += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    def mean(self) -> float:
+        return self.mean_ if self.count else 0
+
+    def std(self) -> float:
+        """np.std와 같은 모표준편차."""
+        if not self.count:
+            return 0
+        return math.sqrt(max(0.0, self.m2 / self.count))
+
+
+class _VideoStats:
+    """한 구간(세그먼트)의 분석 결과 누적값. 세그먼트 순서대로 merge하면 전체 결과가 됨."""
+
+    def __init__(self):
+        self.frames_read = 0
+        self.analyzed_frames = 0
+        self.gaze_center_hits = 0
+        self.left_count = 0
+        self.center_count = 0
+        self.right_count = 0
+        self.gaze_movements = 0
+        self.gaze_trace = TraceSampler()
+        self.shoulder_x = _RunningStats()
+        self.shoulder_y = _RunningStats()
+        self.posture_roll = _RunningStats()
+        self.motion_energy = _RunningStats()
+        self.hand_visible_frames = 0
+        self.hand_movement = _RunningStats()
+        self.head_roll = _RunningStats()
+        self.head_yaw = _RunningStats()
+        self.model_runs = {"face": 0, "pose": 0, "hands": 0}
+        self.features = None  # FeatureRecorder (특징 시계열 저장 시에만)
+        self.decode = None    # FrameReader 디코딩 통계
+        self.timings = None   # _StageTimings (프로파일링 시에만)
+
+    def merge(self, other: "_VideoStats"):
+        self.frames_read += other.frames_read
+        self.analyzed_frames += other.analyzed_frames
+        self.gaze_center_hits += other.gaze_center_hits
+        self.left_count += other.left_count
+        self.center_count += other.center_count
+        self.right_count += other.right_count
+        self.gaze_movements += other.gaze_movements
+        self.gaze_trace.merge(other.gaze_trace)
+        self.hand_visible_frames += other.hand_visible_frames
+        for name in ("shoulder_x", "shoulder_y", "posture_roll", "motion_energy",
+                     "hand_movement", "head_roll", "head_yaw"):
+            getattr(self, name).merge(getattr(other, name))
+        for name, runs in other.model_runs.items():
+            self.model_runs[name] = self.model_runs.get(name, 0) + runs
+        self.decode = merge_decode_stats(self.decode, other.decode)
+        if other.timings is not None:
+            if self.timings is None:
+                self.timings = _StageTimings()
+            self.timings.merge(other.timings)
+        if other.features is not None:
+            if self.features is None:
+                self.features = FeatureRecorder(len(other.features))
+            self.features.merge(other.features)
+
+
+class _StageTimings:
+    """
+    단계별(decode, preprocess, face, pose, hands, postprocess) 처리 시간 누적기.
+    합계·횟수와 함께 p50/p95 계산용 샘플을 reservoir 방식으로 최대 max_samples개만 보관.
+    """
 
-    print(f"🎥 분석 시작: {video_path}")
-    start_time = time.time()
-    last_print = 0
+    STAGES = ("decode", "preprocess", "pose", "face", "hands", "postprocess")
+
+    def __init__(self, max_samples: int = 2048):
+        self.max_samples = max_samples
+        self.total = {}
+        self.count = {}
+        self.samples = {}
+        self._rng = random.Random(0)
+
+    def add(self, stage: str, seconds: float):
+        n = self.count.get(stage, 0) + 1
+        self.count[stage] = n
+        self.total[stage] = self.total.get(stage, 0.0) + seconds
+        samples = self.samples.setdefault(stage, [])
+        if len(samples) < self.max_samples:
+            samples.append(seconds)
+        else:
+            j = self._rng.randrange(n)
+            if j < self.max_samples:
+                samples[j] = seconds
+
+    def merge(self, other: "_StageTimings"):
+        for stage, n in other.count.items():
+            self.count[stage] = self.count.get(stage, 0) + n
+            self.total[stage] = self.total.get(stage, 0.0) + other.total[stage]
+            samples = self.samples.setdefault(stage, []) + other.samples.get(stage, [])
+            if len(samples) > self.max_samples:
+                samples = self._rng.sample(samples, self.max_samples)
+            self.samples[stage] = samples
+
+    def summary(self) -> dict:
+        stages = {}
+        for stage in self.STAGES + tuple(s for s in self.count if s not in self.STAGES):
+            n = self.count.get(stage)
+            if not n:
+                continue
+            p50, p95 = np.percentile(self.samples[stage], [50, 95]) * 1000
+            stages[stage] = {
+                "total_sec": round(self.total[stage], 3),
+                "count": n,
+                "mean_ms": round(self.total[stage] / n * 1000, 3),
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+            }
+        return stages
+
+
+_POSE_LANDMARK_COUNT = 33
+_HAND_LANDMARK_COUNT = 21
+_LEFT_SHOULDER = int(mp_pose.PoseLandmark.LEFT_SHOULDER)
+_RIGHT_SHOULDER = int(mp_pose.PoseLandmark.RIGHT_SHOULDER)
+
+
+def _landmarks_to_xy(landmarks, out: np.ndarray) -> np.ndarray:
+    """
+    protobuf 랜드마크 목록의 (x, y)를 미리 할당된 (N, 2) 배열 out에 채워 반환.
+    중간 리스트 없이 np.fromiter로 한 번에 읽어 프레임당 파이썬 객체 생성을 줄임.
+    """
+    n = len(landmarks)
+    view = out[:n]
+    view.reshape(-1)[:] = np.fromiter(
+        chain.from_iterable((p.x, p.y) for p in landmarks), dtype=out.dtype, count=2 * n
+    )
+    return view
 
-    # ============================
-    # 프레임 단위 분석
-    # ============================
-    while True:
-        success, frame = cap.read()
-        if not success:
-            break
-        total_frames += 1
-
-        # --- 진행률 표시 (터미널용) ---
-        if frame_count > 0:
-            progress = int((total_frames / frame_count) * 100)
-            set_progress(progress)
-            if progress % 5 == 0 and progress != last_print:
-                elapsed = time.time() - start_time
-                sys.stdout.write(f"\r⏳ 진행률: {progress}%  (경과 {elapsed:.1f}s)")
-                sys.stdout.flush()
-                last_print = progress
 
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, _ = frame.shape
+class _FrameAnalyzer:
+    """
+    프레임별 MediaPipe 결과를 _VideoStats에 누적.
+    직전 프레임 상태(prev_eye_center, prev_pose_coords)를 들고 있어
+    세그먼트 경계에서는 직전 분석 프레임으로 먼저 상태만 채울 수 있음(count=False).
+    Pose 좌표는 두 개의 버퍼를 번갈아 쓰고(현재/직전), 손 좌표 버퍼도 재사용해 프레임마다 배열을 만들지 않음.
+
+    stride > 1일 때 시선 이동·움직임 에너지는 근사값: stride 프레임 동안의 변위를 stride로 나눠
+    프레임당 변위로 보고(등속 가정, 중간에 되돌아간 움직임은 보이지 않음), 시선 이동으로 판정되면
+    건너뛴 프레임도 모두 이동한 것으로 stride만큼 셈. 결과의 gaze/gesture.sampling에 표시됨.
+    """
 
-        face_result = face_mesh.process(frame_rgb)
-        pose_result = pose.process(frame_rgb)
-        hands_result = hands.process(frame_rgb)
+    def __init__(self, stride: int, record_features: bool = False):
+        self.stride = stride
+        self.stats = _VideoStats()
+        if record_features:
+            self.stats.features = FeatureRecorder()
+        self.prev_eye_center = None
+        self._pose_bufs = np.empty((2, _POSE_LANDMARK_COUNT, 2), dtype=np.float64)
+        self._pose_diff = np.empty((_POSE_LANDMARK_COUNT, 2), dtype=np.float64)
+        self._pose_cur = 0
+        self._has_prev_pose = False
+        self._hand_buf = np.empty((_HAND_LANDMARK_COUNT, 2), dtype=np.float64)
+        t = DEFAULT_THRESHOLDS
+        self._center_box = t["gaze_center_box"]
+        self._left_bin = t["gaze_left_bin"]
+        self._right_bin = t["gaze_right_bin"]
+        self._gaze_move = t["gaze_move"]
+
+    @property
+    def prev_pose_coords(self):
+        if not self._has_prev_pose:
+            return None
+        return self._pose_bufs[1 - self._pose_cur]
+
+    def process(self, face_result, pose_result, hands_result, count: bool = True, frame_index: int = -1):
+        stats = self.stats
+        stride = self.stride
+        row = None
+        if count:
+            stats.analyzed_frames += 1
+            if stats.features is not None:
+                row = stats.features.new_row()
+                row[COL["frame_index"]] = frame_index
 
         # ========= 시선(Gaze) 분석 =========
         if face_result.multi_face_landmarks:
             lm = face_result.multi_face_landmarks[0].landmark
             left_eye = lm[33]; right_eye = lm[263]
-            eye_center_x = (left_eye.x + right_eye.x) / 2
-            eye_center_y = (left_eye.y + right_eye.y) / 2
-            gaze_trace.append([eye_center_x, eye_center_y])
-
-            if abs(eye_center_x - 0.5) < 0.25 and abs(eye_center_y - 0.5) < 0.25:
-                gaze_center_hits += 1
-            if eye_center_x < 0.33: left_count += 1
-            elif eye_center_x < 0.66: center_count += 1
-            else: right_count += 1
-
-            if prev_eye_center is not None:
-                dx, dy = abs(eye_center_x - prev_eye_center[0]), abs(eye_center_y - prev_eye_center[1])
-                if dx > 0.05 or dy > 0.05:
-                    gaze_movements += 1
-            prev_eye_center = (eye_center_x, eye_center_y)
-
-            # 얼굴 방향
-            nose = np.array([lm[1].x, lm[1].y])
-            dx_eye = right_eye.x - left_eye.x
-            dy_eye = right_eye.y - left_eye.y
-            roll = np.degrees(np.arctan2(dy_eye, dx_eye))
-            head_rolls.append(abs(roll))
-            yaw = np.degrees(np.arctan2(nose[0] - 0.5, 0.5))
-            head_yaws.append(abs(yaw))
+            lx, ly, rx, ry = left_eye.x, left_eye.y, right_eye.x, right_eye.y
+            eye_center_x = (lx + rx) / 2
+            eye_center_y = (ly + ry) / 2
+
+            if count:
+                stats.gaze_trace.add(eye_center_x, eye_center_y)
+
+                if abs(eye_center_x - 0.5) < self._center_box and abs(eye_center_y - 0.5) < self._center_box:
+                    stats.gaze_center_hits += 1
+                if eye_center_x < self._left_bin: stats.left_count += 1
+                elif eye_center_x < self._right_bin: stats.center_count += 1
+                else: stats.right_count += 1
+
+                if self.prev_eye_center is not None:
+                    # stride 프레임 동안의 변위를 프레임당 변위로 선형 환산하고(근사),
+                    # 이동으로 판정되면 건너뛴 프레임도 이동한 것으로 보고 stride만큼 가중
+                    dx = abs(eye_center_x - self.prev_eye_center[0]) / stride
+                    dy = abs(eye_center_y - self.prev_eye_center[1]) / stride
+                    if dx > self._gaze_move or dy > self._gaze_move:
+                        stats.gaze_movements += stride
+
+                # 얼굴 방향 (스칼라 연산은 numpy보다 math가 빠름)
+                stats.head_roll.add(abs(math.degrees(math.atan2(ry - ly, rx - lx))))
+                stats.head_yaw.add(abs(math.degrees(math.atan2(lm[1].x - 0.5, 0.5))))
+                if row is not None:
+                    row[COL["left_eye_x"]:COL["nose_y"] + 1] = (lx, ly, rx, ry, lm[1].x, lm[1].y)
+            self.prev_eye_center = (eye_center_x, eye_center_y)
 
         # ========= 자세(Posture) 분석 =========
         if pose_result.pose_landmarks:
             lm = pose_result.pose_landmarks.landmark
-            left_shoulder = lm[mp_pose.PoseLandmark.LEFT_SHOULDER]
-            right_shoulder = lm[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-            center_x = (left_shoulder.x + right_shoulder.x) / 2
-            center_y = (left_shoulder.y + right_shoulder.y) / 2
-            shoulder_xs.append(center_x)
-            shoulder_ys.append(center_y)
-
-            dx, dy = right_shoulder.x - left_shoulder.x, right_shoulder.y - left_shoulder.y
-            roll_angle = math.degrees(math.atan2(dy, dx))
-            if roll_angle > 90: roll_angle -= 180
-            elif roll_angle < -90: roll_angle += 180
-            posture_stability_values.append(abs(roll_angle))
-
-            current_pose = np.array([[p.x, p.y] for p in pose_result.pose_landmarks.landmark])
-            if prev_pose_coords is not None:
-                diff = np.linalg.norm(current_pose - prev_pose_coords)
-                motion_energy_values.append(diff)
-            prev_pose_coords = current_pose
+            current_pose = _landmarks_to_xy(lm, self._pose_bufs[self._pose_cur])
+            if count:
+                lsx, lsy = current_pose[_LEFT_SHOULDER]
+                rsx, rsy = current_pose[_RIGHT_SHOULDER]
+                stats.shoulder_x.add((lsx + rsx) / 2)
+                stats.shoulder_y.add((lsy + rsy) / 2)
+
+                roll_angle = math.degrees(math.atan2(rsy - lsy, rsx - lsx))
+                if roll_angle > 90: roll_angle -= 180
+                elif roll_angle < -90: roll_angle += 180
+                stats.posture_roll.add(abs(roll_angle))
+                if row is not None:
+                    row[COL["left_shoulder_x"]:COL["right_shoulder_y"] + 1] = (lsx, lsy, rsx, rsy)
+
+                prev_pose = self.prev_pose_coords
+                if prev_pose is not None and len(prev_pose) == len(current_pose):
+                    # 프레임당 움직임으로 선형 환산한 근사값 (stride=1이면 기존과 동일)
+                    diff = np.subtract(current_pose, prev_pose, out=self._pose_diff[:len(current_pose)])
+                    flat = diff.reshape(-1)
+                    energy = math.sqrt(flat.dot(flat)) / stride
+                    stats.motion_energy.add(energy)
+                    if row is not None:
+                        row[COL["pose_energy"]] = energy
+            self._pose_cur = 1 - self._pose_cur
+            self._has_prev_pose = True
 
         # ========= 손(Hand) 분석 =========
-        if hands_result.multi_hand_landmarks:
-            hand_visible_frames += 1
+        if count and hands_result.multi_hand_landmarks:
+            stats.hand_visible_frames += 1
             centers = []
             for hand in hands_result.multi_hand_landmarks:
-                cx = np.mean([lm.x for lm in hand.landmark])
-                cy = np.mean([lm.y for lm in hand.landmark])
+                cx, cy = _landmarks_to_xy(hand.landmark, self._hand_buf).mean(axis=0)
                 centers.append((cx, cy))
+            if row is not None:
+                row[COL["hand_count"]] = len(centers)
+                for i, (cx, cy) in enumerate(centers[:2]):
+                    row[COL[f"hand{i}_x"]] = cx
+                    row[COL[f"hand{i}_y"]] = cy
             if len(centers) == 2:
-                dist = np.linalg.norm(np.array(centers[0]) - np.array(centers[1]))
-                hand_movement_values.append(dist)
+                stats.hand_movement.add(math.hypot(centers[0][0] - centers[1][0],
+                                                   centers[0][1] - centers[1][1]))
+        elif row is not None:
+            row[COL["hand_count"]] = 0
 
-    cap.release()
-    print("\n✅ 영상 분석 완료!\n")
-    set_progress(100)
 
-    # ============================
-    # 결과 계산
-    # ============================
-    gaze_center_ratio = gaze_center_hits / total_frames if total_frames > 0 else 0
-    sigma_x = np.std(shoulder_xs) if shoulder_xs else 0
-    sigma_y = np.std(shoulder_ys) if shoulder_ys else 0
-    mean_roll = np.mean(posture_stability_values) if posture_stability_values else 0
-    posture_stability = max(0, 1 - (sigma_x + sigma_y + abs(mean_roll) / 45))
-
-    total_gaze_points = left_count + center_count + right_count
-    if total_gaze_points > 0:
-        gaze_distribution = {
-            "left": round(left_count / total_gaze_points, 3),
-            "center": round(center_count / total_gaze_points, 3),
-            "right": round(right_count / total_gaze_points, 3)
+class _InferenceInput:
+    """
+    MediaPipe 입력 버퍼. 프레임을 한 번만 축소·색변환하고 버퍼를 프레임 간 재사용.
+    랜드마크는 정규화 좌표로 반환되므로 종횡비만 유지하면 결과 스키마는 동일.
+    """
+
+    def __init__(self, max_side: int = 0):
+        self.max_side = max_side
+        self._resized = None
+        self._rgb = None
+
+    def output_size(self, width: int, height: int):
+        longest = max(width, height)
+        if not self.max_side or longest <= self.max_side:
+            return width, height
+        scale = self.max_side / longest
+        return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+    def prepare(self, frame):
+        h, w = frame.shape[:2]
+        out_w, out_h = self.output_size(w, h)
+        src = frame
+        if (out_w, out_h) != (w, h):
+            if self._resized is None or self._resized.shape[:2] != (out_h, out_w):
+                self._resized = np.empty((out_h, out_w, 3), dtype=np.uint8)
+            cv2.resize(frame, (out_w, out_h), dst=self._resized, interpolation=cv2.INTER_AREA)
+            src = self._resized
+
+        if self._rgb is None or self._rgb.shape != src.shape:
+            self._rgb = np.empty_like(src)
+        self._rgb.flags.writeable = True
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        # 읽기 전용으로 넘기면 MediaPipe가 복사 없이 참조로 사용
+        self._rgb.flags.writeable = False
+        return self._rgb
+
+
+def _create_models(refine_landmarks: bool = True):
+    face_mesh = mp_face.FaceMesh(refine_landmarks=refine_landmarks, min_detection_confidence=0.4)
+    pose = mp_pose.Pose(min_detection_confidence=0.4)
+    hands = mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.4)
+    return face_mesh, pose, hands
+
+
+def _reset_model(model):
+    """이전 영상의 추적 상태가 다음 영상에 섞이지 않도록 그래프를 초기화."""
+    reset = getattr(model, "reset", None)
+    if reset is not None:
+        reset()
+
+
+class ModelPool:
+    """
+    사전 워밍업된 (FaceMesh, Pose, Hands) 세트의 크기 제한 풀. 스레드 안전.
+    요청마다 그래프를 새로 만들고 close()하지 않아 생기던 초기화 비용·네이티브 메모리 누수를 막음.
+    세트는 필요할 때 size개까지 만들고, 모두 사용 중이면 반납될 때까지 대기.
+    """
+
+    def __init__(self, size: int = VIDEO_MODEL_POOL_SIZE, refine_landmarks: bool = True):
+        self.size = max(1, size)
+        self.refine_landmarks = refine_landmarks
+        self._available = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, timeout: float = None):
+        try:
+            return self._available.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MediaPipe 모델 풀이 이미 종료되었습니다.")
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return _create_models(self.refine_landmarks)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._available.get(timeout=timeout or None)
+        except queue.Empty:
+            raise TimeoutError(f"MediaPipe 모델 세트를 {timeout}초 안에 확보하지 못했습니다.")
+
+    def release(self, models):
+        try:
+            for model in models:
+                _reset_model(model)
+        except Exception as e:
+            # 초기화에 실패한 세트는 버리고 새로 만들 수 있게 자리를 비움
+            print(f"⚠️ MediaPipe 모델 초기화 실패, 세트를 폐기합니다: {e}")
+            self._discard(models)
+            return
+        if self._closed:
+            self._discard(models)
+        else:
+            self._available.put(models)
+
+    def _discard(self, models):
+        for model in models:
+            try:
+                model.close()
+            except Exception:
+                pass
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def checkout(self, timeout: float = None):
+        models = self.acquire(timeout)
+        try:
+            yield models
+        finally:
+            self.release(models)
+
+    def warm_up(self, count: int = None):
+        """count개(기본: size) 세트를 미리 만들고 더미 프레임으로 한 번씩 추론해 둠."""
+        dummy = np.zeros((256, 256, 3), dtype=np.uint8)
+        dummy.flags.writeable = False
+        acquired = []
+        try:
+            for _ in range(min(self.size, count or self.size)):
+                models = self.acquire()
+                acquired.append(models)
+                for model in models:
+                    model.process(dummy)
+        finally:
+            for models in acquired:
+                self.release(models)
+        return len(acquired)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                models = self._available.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(models)
+
+
+_model_pools = {}
+_model_pools_lock = threading.Lock()
+
+
+def get_model_pool(refine_landmarks: bool = None) -> ModelPool:
+    """프로세스 전역 모델 풀 (refine_landmarks 설정별로 하나씩). 병렬 분석 워커는 프로세스마다 별도 풀."""
+    if refine_landmarks is None:
+        refine_landmarks = VIDEO_FACE_REFINE_LANDMARKS
+    with _model_pools_lock:
+        pool = _model_pools.get(refine_landmarks)
+        if pool is None:
+            pool = ModelPool(VIDEO_MODEL_POOL_SIZE, refine_landmarks)
+            _model_pools[refine_landmarks] = pool
+        return pool
+
+
+def warm_up_model_pool(refine_landmarks: bool = None) -> int:
+    """서버 시작 시 호출: 기본 설정의 모델 풀을 만들고 워밍업. 준비된 세트 수를 반환."""
+    started = time.time()
+    count = get_model_pool(refine_landmarks).warm_up()
+    print(f"✅ MediaPipe 모델 풀 워밍업 완료: {count}세트 ({time.time() - started:.1f}s)")
+    return count
+
+
+def close_model_pools():
+    with _model_pools_lock:
+        pools = list(_model_pools.values())
+        _model_pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class _SkippedResult:
+    """캐스케이드로 실행을 건너뛴 모델의 빈 결과."""
+    multi_face_landmarks = None
+    multi_hand_landmarks = None
+    pose_landmarks = None
+
+
+def _any_landmark_in_view(landmarks, indices, min_visibility: float) -> bool:
+    for idx in indices:
+        p = landmarks[idx]
+        if p.visibility >= min_visibility and 0.0 <= p.x <= 1.0 and 0.0 <= p.y <= 1.0:
+            return True
+    return False
+
+
+class _ModelRunner:
+    """
+    한 프레임에 대해 FaceMesh/Pose/Hands를 실행.
+    cascade=True이면 Pose를 먼저 돌려 얼굴·손목이 화면 안에 보일 때만 FaceMesh/Hands를 실행하고,
+    Pose가 사람을 못 찾은 프레임은 판단 근거가 없으므로 세 모델을 모두 실행.
+    """
+
+    def __init__(self, models, max_side: int = 0, cascade: bool = False):
+        # models: ModelPool에서 빌린 (FaceMesh, Pose, Hands) 세트. 반납은 호출자가 담당
+        self.face_mesh, self.pose, self.hands = models
+        self.inference_input = _InferenceInput(max_side)
+        self.cascade = cascade
+        self.runs = {"face": 0, "pose": 0, "hands": 0}
+        self.timings = None  # _StageTimings (프로파일링 시에만)
+
+    def _timed(self, stage: str, fn, arg):
+        if self.timings is None:
+            return fn(arg)
+        started = time.perf_counter()
+        result = fn(arg)
+        self.timings.add(stage, time.perf_counter() - started)
+        return result
+
+    def run(self, frame):
+        frame_rgb = self._timed("preprocess", self.inference_input.prepare, frame)
+        pose_result = self._timed("pose", self.pose.process, frame_rgb)
+        self.runs["pose"] += 1
+
+        run_face = run_hands = True
+        if self.cascade and pose_result.pose_landmarks:
+            lm = pose_result.pose_landmarks.landmark
+            run_face = _any_landmark_in_view(lm, _CASCADE_FACE_LANDMARKS, CASCADE_MIN_VISIBILITY)
+            run_hands = _any_landmark_in_view(lm, _CASCADE_WRIST_LANDMARKS, CASCADE_MIN_VISIBILITY)
+
+        face_result = _SkippedResult
+        if run_face:
+            face_result = self._timed("face", self.face_mesh.process, frame_rgb)
+            self.runs["face"] += 1
+        hands_result = _SkippedResult
+        if run_hands:
+            hands_result = self._timed("hands", self.hands.process, frame_rgb)
+            self.runs["hands"] += 1
+        return face_result, pose_result, hands_result
+
+
+def _analyze_segment(video_path: str, start_frame: int, end_frame, stride: int,
+                     frame_count: int = 0, progress_cb=None, options: dict = None,
+                     record_features: bool = False, decode: dict = None, profile: bool = False):
+    """
+    [start_frame, end_frame) 구간을 분석해 _VideoStats를 반환 (end_frame=None이면 끝까지).
+    모델은 프로세스 전역 ModelPool에서 빌려 쓰고 끝나면 반납 (워커 프로세스는 자체 풀 사용).
+    start_frame > 0이면 직전 분석 프레임(start_frame - stride)으로
+    prev_eye_center / prev_pose_coords를 먼저 채워 경계에서의 누락을 막음.
+    decode: FrameReader 옵션 (backend, queue_depth, fps, frame_size)
+    progress_cb: 진행률(%)이 바뀔 때마다 progress_cb(percent, frames_processed) 호출
+    """
+    options = dict(options or {})
+    # refine_landmarks는 풀(모델 세트 종류) 선택에만 사용
+    pool = get_model_pool(options.pop("refine_landmarks", None))
+    models = pool.acquire(VIDEO_MODEL_POOL_TIMEOUT)
+    reader = None
+    # 빌린 모델 세트는 읽을 수 없는 영상 등으로 FrameReader 생성이 실패해도 반드시 반납
+    try:
+        reader = FrameReader(video_path, start_frame, end_frame, stride, **(decode or {}))
+        runner = _ModelRunner(models, **options)
+        run_models = runner.run
+        analyzer = _FrameAnalyzer(stride, record_features=record_features)
+        stats = analyzer.stats
+        timings = _StageTimings() if profile else None
+        runner.timings = timings
+
+        start_time = time.time()
+        last_print = 0
+        last_reported = -1
+        iter_end = time.perf_counter()
+
+        for frame_idx, frame in reader:
+            if timings is not None:
+                # 직전 프레임 처리 이후 다음 프레임을 받기까지 = 디코딩 대기
+                timings.add("decode", time.perf_counter() - iter_end)
+            if frame_idx < start_frame:
+                # 경계 프레임: 직전 상태만 채우고 집계에는 포함하지 않음
+                analyzer.process(*run_models(frame), count=False)
+                iter_end = time.perf_counter()
+                continue
+
+            # --- 진행률 표시 (터미널용) ---
+            if progress_cb is not None and frame_count > 0:
+                progress = int(((frame_idx + 1) / frame_count) * 100)
+                if progress != last_reported:
+                    progress_cb(progress, frame_idx + 1)
+                    last_reported = progress
+                if progress % 5 == 0 and progress != last_print:
+                    elapsed = time.time() - start_time
+                    sys.stdout.write(f"\r⏳ 진행률: {progress}%  (경과 {elapsed:.1f}s)")
+                    sys.stdout.flush()
+                    last_print = progress
+
+            results = run_models(frame)
+            if timings is None:
+                analyzer.process(*results, frame_index=frame_idx)
+            else:
+                post_start = time.perf_counter()
+                analyzer.process(*results, frame_index=frame_idx)
+                timings.add("postprocess", time.perf_counter() - post_start)
+            iter_end = time.perf_counter()
+    finally:
+        if reader is not None:
+            reader.close()
+        pool.release(models)
+
+    stats.frames_read = reader.frames_read
+    stats.decode = reader.stats()
+    stats.timings = timings
+    for name, runs in runner.runs.items():
+        stats.model_runs[name] += runs
+    return stats
+
+
+def _split_segments(frame_count: int, fps: float, stride: int, workers: int):
+    """영상을 stride 배수에 맞춘 시간 구간으로 분할. 마지막 구간은 끝까지(None)."""
+    if workers <= 1 or frame_count <= 0 or fps <= 0:
+        return [(0, None)]
+    min_frames = max(stride, int(VIDEO_MIN_SEGMENT_SEC * fps))
+    n_segments = max(1, min(workers, frame_count // min_frames))
+    if n_segments <= 1:
+        return [(0, None)]
+
+    seg_len = frame_count // n_segments
+    seg_len = max(stride, seg_len - seg_len % stride)
+    bounds = [i * seg_len for i in range(n_segments)] + [None]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_segments)]
+
+
+def _analyze_parallel(video_path: str, segments, stride: int, frame_count: int, workers: int,
+                      options: dict = None, record_features: bool = False, decode: dict = None,
+                      profile: bool = False, progress_cb=None):
+    """구간별로 워커 프로세스에서 분석한 뒤, 시간 순서대로 병합. 진행률은 구간 완료 단위로 보고."""
+    # MediaPipe는 fork 이후 사용이 불안정하므로 spawn 컨텍스트 사용
+    ctx = multiprocessing.get_context("spawn")
+    results = [None] * len(segments)
+    done_frames = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = {
+            pool.submit(_analyze_segment, video_path, start, end, stride,
+                        options=options, record_features=record_features, decode=decode,
+                        profile=profile): idx
+            for idx, (start, end) in enumerate(segments)
         }
-    else:
-        gaze_distribution = {"left": 0, "center": 0, "right": 0}
+        for future in as_completed(futures):
+            idx = futures[future]
+            results[idx] = future.result()
+            done_frames += results[idx].frames_read
+            if frame_count > 0:
+                progress = int(done_frames / frame_count * 100)
+                if progress_cb is not None:
+                    progress_cb(progress, done_frames)
+                sys.stdout.write(f"\r⏳ 진행률: {progress}%  (구간 {idx + 1}/{len(segments)} 완료)")
+                sys.stdout.flush()
+
+    merged = _VideoStats()
+    for stats in results:
+        merged.merge(stats)
+    return merged
+
+
+def analysis_config(target_fps: float = None, max_side: int = None, cascade: bool = None,
+                    refine_landmarks: bool = None, decode_backend: str = None) -> dict:
+    """analyze_video 결과에 영향을 주는 설정값 (결과 캐시 키용). 인자 의미는 analyze_video와 동일."""
+    return {
+        "version": VIDEO_ANALYZER_VERSION,
+        "mediapipe": getattr(mp, "__version__", ""),
+        "target_fps": VIDEO_ANALYSIS_FPS if target_fps is None else target_fps,
+        "max_side": VIDEO_INFERENCE_MAX_SIDE if max_side is None else max_side,
+        "cascade": VIDEO_MODEL_CASCADE if cascade is None else cascade,
+        "refine_landmarks": VIDEO_FACE_REFINE_LANDMARKS if refine_landmarks is None else refine_landmarks,
+        "decode_backend": decode_backend or VIDEO_DECODE_BACKEND,
+        "thresholds": DEFAULT_THRESHOLDS,
+    }
+
+
+def analyze_video(video_path: str, target_fps: float = None, workers: int = None,
+                  max_side: int = None, cascade: bool = None, refine_landmarks: bool = None,
+                  feature_path: str = None, decode_backend: str = None, decode_queue: int = None,
+                  profile: bool = None, progress_cb=None):
+    """
+    발표 영상의 시선·자세·몸짓·손동작·머리방향을 분석하는 함수
+    진행률(%) 실시간 업데이트 포함
+
+    target_fps: 분석 FPS (None이면 VIDEO_ANALYSIS_FPS, 0이면 전체 프레임).
+    건너뛰는 프레임은 cap.grab()으로 디코딩 없이 넘기며, 시간 기반 지표
+    (시선 이동 빈도, 움직임 에너지)는 원본 프레임 간격 기준으로 선형 환산한 근사값이며,
+    결과의 gaze.sampling / gesture.sampling에 frame_stride·analysis_fps와 근사 여부를 표시합니다.
+    workers: 병렬 분석 프로세스 수 (None이면 VIDEO_ANALYSIS_WORKERS).
+    2 이상이면 영상을 시간 구간으로 나눠 프로세스별로 분석 후 결과를 병합합니다.
+    max_side: 추론 입력 최대 변 길이 (None이면 VIDEO_INFERENCE_MAX_SIDE, 0이면 원본).
+    cascade: Pose 결과로 FaceMesh/Hands 실행 여부 결정 (None이면 VIDEO_MODEL_CASCADE).
+    refine_landmarks: FaceMesh 홍채 보정 사용 여부 (None이면 VIDEO_FACE_REFINE_LANDMARKS).
+    feature_path: 지정하면 프레임별 특징 시계열을 npz(float32 열)로 저장 (video_features 참고).
+    decode_backend: "opencv" 또는 "ffmpeg" (None이면 VIDEO_DECODE_BACKEND).
+    decode_queue: 디코딩 스레드 큐 크기 (None이면 VIDEO_DECODE_QUEUE, 0이면 스레드 없이 순차 디코딩).
+    profile: 단계별 누적/p50/p95 처리 시간과 초당 프레임 수를 metadata.timings에 기록 (None이면 VIDEO_PROFILE).
+    progress_cb: 요청별 진행률 콜백. progress_cb(percent, stage=..., frames_processed=..., frames_total=...)
+    """
 
-    gaze_movement_rate = round((gaze_movements / duration_sec), 2) if duration_sec > 0 else 0
+    wall_start = time.perf_counter()
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"❌ 영상 파일을 열 수 없습니다: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    duration_sec = frame_count / fps if fps > 0 else 0
+    cap.release()
 
-    # 추가 분석 항목 평균값
-    motion_energy_mean = float(np.mean(motion_energy_values)) if motion_energy_values else 0
-    hand_visibility_ratio = hand_visible_frames / total_frames if total_frames else 0
-    hand_movement_mean = float(np.mean(hand_movement_values)) if hand_movement_values else 0
-    head_roll_mean = float(np.mean(head_rolls)) if head_rolls else 0
-    head_yaw_mean = float(np.mean(head_yaws)) if head_yaws else 0
+    if target_fps is None:
+        target_fps = VIDEO_ANALYSIS_FPS
+    stride = _resolve_frame_stride(fps, target_fps)
+    if workers is None:
+        workers = VIDEO_ANALYSIS_WORKERS
+    segments = _split_segments(frame_count, fps, stride, workers)
+    if max_side is None:
+        max_side = VIDEO_INFERENCE_MAX_SIDE
+    inference_size = _InferenceInput(max_side).output_size(width, height)
+    options = {
+        "max_side": max_side,
+        "cascade": VIDEO_MODEL_CASCADE if cascade is None else cascade,
+        "refine_landmarks": VIDEO_FACE_REFINE_LANDMARKS if refine_landmarks is None else refine_landmarks,
+    }
+    decode = {
+        "backend": decode_backend or VIDEO_DECODE_BACKEND,
+        "queue_depth": VIDEO_DECODE_QUEUE if decode_queue is None else decode_queue,
+        "fps": fps,
+        # ffmpeg는 scale 필터로 추론 해상도까지 줄여서 디코딩
+        "frame_size": inference_size,
+    }
+    if profile is None:
+        profile = VIDEO_PROFILE
 
-    # 평가 기준 (emoji 제거)
-    gesture_eval = "적정" if 0.15 <= motion_energy_mean <= 0.35 else "조정 필요"
-    hand_eval = "균형" if 0.4 <= hand_visibility_ratio <= 0.9 else "부족/과다"
-    head_eval = "안정적" if head_roll_mean < 5 and head_yaw_mean < 15 else "불균형"
+    print(f"🎥 분석 시작: {video_path} (구간 {len(segments)}개)")
+
+    def report(percent: int, frames_processed: int):
+        set_progress(percent)
+        if progress_cb is not None:
+            progress_cb(percent, stage="프레임 분석", frames_processed=frames_processed,
+                        frames_total=frame_count)
 
     # ============================
-    # 결과 구조화
+    # 프레임 단위 분석
     # ============================
-    results = {
-        "metadata": {
-            "filename": os.path.basename(video_path),
-            "fps": round(fps, 2),
-            "resolution": [width, height],
-            "duration_sec": round(duration_sec, 2),
-            "frame_count": total_frames
-        },
-        "gaze": {
-            "center_ratio": round(gaze_center_ratio, 3),
-            "distribution": gaze_distribution,
-            "movement_rate_per_sec": gaze_movement_rate,
-            "trace_sample": gaze_trace[::max(1, len(gaze_trace)//20)],
-            "interpretation": (
-                "정면 응시율이 낮으나 청중 중심 발표로 해석 가능"
-                if gaze_center_ratio < 0.15 else
-                "정면 응시율이 높아 온라인 프레젠테이션에 적합"
-            )
-        },
-        "posture": {
-            "stability": round(posture_stability, 3),
-            "sigma": {"x": round(sigma_x, 4), "y": round(sigma_y, 4)},
-            "roll_mean": round(mean_roll, 3),
-            "interpretation": (
-                "자세 안정성이 높고 상체 균형이 유지됨"
-                if posture_stability > 0.7 else
-                "자세 흔들림이 커 보임"
-            )
-        },
-        "gesture": {
-            "motion_energy": round(motion_energy_mean, 4),
-            "evaluation": gesture_eval,
-            "interpretation": "0.15~0.35면 자연스러운 제스처 빈도 (Mehrabian, 1972)"
-        },
-        "hand": {
-            "visibility_ratio": round(hand_visibility_ratio, 3),
-            "movement": round(hand_movement_mean, 4),
-            "evaluation": hand_eval,
-            "interpretation": "손동작 비율 40~90%가 이상적 (Pease & Pease, 2006)"
-        },
-        "head_pose": {
-            "roll_mean": round(head_roll_mean, 3),
-            "yaw_mean": round(head_yaw_mean, 3),
-            "evaluation": head_eval,
-            "interpretation": "Roll<5°, Yaw<15°면 시선 분배 안정적"
-        }
-    }
+    analysis_start = time.perf_counter()
+    if len(segments) == 1:
+        stats = _analyze_segment(video_path, 0, None, stride, frame_count,
+                                 progress_cb=report, options=options,
+                                 record_features=bool(feature_path), decode=decode, profile=profile)
+    else:
+        stats = _analyze_parallel(video_path, segments, stride, frame_count, len(segments),
+                                  options=options, record_features=bool(feature_path), decode=decode,
+                                  profile=profile, progress_cb=report)
+    analysis_sec = time.perf_counter() - analysis_start
 
+    print("\n✅ 영상 분석 완료!\n")
+    report(100, stats.frames_read)
+
+    metadata = {
+        "filename": os.path.basename(video_path),
+        "fps": round(fps, 2),
+        "resolution": [width, height],
+        "inference_resolution": list(inference_size),
+        "duration_sec": round(duration_sec, 2),
+        "frame_count": stats.frames_read,
+        "analyzed_frames": stats.analyzed_frames,
+        "frame_stride": stride,
+        "analysis_fps": round(fps / stride, 2) if fps > 0 else 0,
+        "segments": len(segments),
+        "cascade": options["cascade"],
+        "face_refine_landmarks": options["refine_landmarks"],
+        "model_runs": dict(stats.model_runs),
+        "decode": stats.decode,
+    }
+    post_start = time.perf_counter()
+    if feature_path and stats.features is not None:
+        metadata["feature_file"] = save_feature_series(feature_path, stats.features, metadata)
+    results = _build_results(stats, metadata)
+
+    if profile:
+        timings = stats.timings or _StageTimings()
+        timings.add("aggregate", time.perf_counter() - post_start)
+        metadata["timings"] = {
+            "wall_sec": round(time.perf_counter() - wall_start, 3),
+            "analysis_sec": round(analysis_sec, 3),
+            "frames_per_sec": round(stats.analyzed_frames / analysis_sec, 2) if analysis_sec > 0 else 0,
+            "source_frames_per_sec": round(stats.frames_read / analysis_sec, 2) if analysis_sec > 0 else 0,
+            # 병렬 분석 시 단계별 total_sec는 모든 워커의 합이라 wall_sec보다 클 수 있음
+            "stages": timings.summary(),
+            "decode_queue": stats.decode,
+        }
     return results
+
+
+def _build_results(stats: _VideoStats, metadata: dict):
+    """누적값(_VideoStats)으로부터 최종 결과 스키마를 구성."""
+    agg = {
+        "analyzed_frames": stats.analyzed_frames,
+        "gaze_center_hits": stats.gaze_center_hits,
+        "left_count": stats.left_count,
+        "center_count": stats.center_count,
+        "right_count": stats.right_count,
+        "gaze_movements": stats.gaze_movements,
+        "trace_sample": stats.gaze_trace.sample(),
+        "sigma_x": stats.shoulder_x.std(),
+        "sigma_y": stats.shoulder_y.std(),
+        "posture_roll_mean": stats.posture_roll.mean(),
+        "motion_energy_mean": stats.motion_energy.mean(),
+        "hand_visible_frames": stats.hand_visible_frames,
+        "hand_movement_mean": stats.hand_movement.mean(),
+        "head_roll_mean": stats.head_roll.mean(),
+        "head_yaw_mean": stats.head_yaw.mean(),
+    }
+    return build_video_result(agg, metadata, DEFAULT_THRESHOLDS)
@@ -0,0 +1,227 @@
+"""
+영상 디코딩 파이프라인
+
+디코딩 스레드가 프레임을 bounded queue에 채우고, 메인 스레드는 큐에서 꺼내 MediaPipe 추론을 수행해
+디코딩 지연과 추론 시간을 겹칩니다.
+- opencv: cv2.VideoCapture, stride 사이 프레임은 grab()으로 건너뜀
+- ffmpeg: ffmpeg 서브프로세스가 select/scale 필터로 필요한 프레임만 축소 해상도로 디코딩해 파이프로 전달
+"""
+
+import math
+import queue
+import subprocess
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ffmpeg_utils import get_ffmpeg_exe
+
+DECODE_BACKENDS = ("opencv", "ffmpeg")
+_END = object()
+
+
+class FrameReader:
+    """
+    [start_frame, end_frame) 구간에서 stride 간격의 프레임을 (frame_index, BGR frame)으로 순회.
+    start_frame > 0이면 경계 처리를 위해 직전 분석 프레임(start_frame - stride)을 먼저 내보냄.
+    queue_depth > 0이면 별도 디코딩 스레드에서 미리 읽어 큐에 쌓음 (0이면 호출 스레드에서 바로 디코딩).
+    """
+
+    def __init__(self, video_path: str, start_frame: int = 0, end_frame: Optional[int] = None,
+                 stride: int = 1, backend: str = "opencv", queue_depth: int = 8,
+                 fps: float = 0, frame_size: Optional[Tuple[int, int]] = None):
+        if backend not in DECODE_BACKENDS:
+            raise ValueError(f"지원하지 않는 디코딩 방식: {backend} ({', '.join(DECODE_BACKENDS)})")
+        if backend == "ffmpeg" and (fps <= 0 or not frame_size):
+            raise ValueError("ffmpeg 디코딩에는 fps와 frame_size가 필요합니다.")
+
+        self.video_path = video_path
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.stride = max(1, stride)
+        self.backend = backend
+        self.queue_depth = max(0, queue_depth)
+        self.fps = fps
+        self.frame_size = frame_size
+        self.first_frame = max(0, start_frame - self.stride) if start_frame > 0 else 0
+
+        self.frames_read = 0          # 구간 안에서 소비한 원본 프레임 수 (건너뛴 프레임 포함)
+        self.frames_decoded = 0       # 실제로 디코딩해 내보낸 프레임 수
+        self.consumer_wait_sec = 0.0  # 추론 쪽이 프레임을 기다린 시간 (디코딩이 병목)
+        self.producer_wait_sec = 0.0  # 디코딩 쪽이 큐 빈자리를 기다린 시간 (추론이 병목)
+        self.max_queue_fill = 0
+
+        self._queue = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._error = None
+        self._proc = None
+
+    # ----------------------------
+    # 백엔드별 프레임 생성
+    # ----------------------------
+    def _opencv_frames(self) -> Iterator[Tuple[int, np.ndarray]]:
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise ValueError(f"❌ 영상 파일을 열 수 없습니다: {self.video_path}")
+        try:
+            if self.start_frame > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, self.first_frame)
+                success, frame = cap.read()
+                if success:
+                    yield self.first_frame, frame
+                cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+
+            frame_idx = self.start_frame
+            while (self.end_frame is None or frame_idx < self.end_frame) and not self._stop.is_set():
+                # stride 사이의 프레임은 grab()만 하고 디코딩(retrieve)은 생략
+                if frame_idx % self.stride != 0:
+                    if not cap.grab():
+                        break
+                    frame_idx += 1
+                    self.frames_read += 1
+                    continue
+
+                success, frame = cap.read()
+                if not success:
+                    break
+                self.frames_read += 1
+                yield frame_idx, frame
+                frame_idx += 1
+        finally:
+            cap.release()
+
+    def _ffmpeg_frames(self) -> Iterator[Tuple[int, np.ndarray]]:
+        width, height = self.frame_size
+        frame_bytes = width * height * 3
+        cmd = [get_ffmpeg_exe(), "-v", "error", "-nostdin", "-noautorotate"]
+        if self.first_frame > 0:
+            cmd += ["-ss", f"{self.first_frame / self.fps:.6f}"]
+        cmd += [
+            "-i", self.video_path, "-an", "-sn",
+            "-vf", f"select='not(mod(n\\,{self.stride}))',scale={width}:{height}",
+            "-vsync", "0",
+        ]
+        if self.end_frame is not None:
+            cmd += ["-frames:v", str(math.ceil((self.end_frame - self.first_frame) / self.stride))]
+        cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                      bufsize=frame_bytes * 2)
+        frame_idx = self.first_frame
+        last_idx = None
+        try:
+            while not self._stop.is_set():
+                buf = self._proc.stdout.read(frame_bytes)
+                if len(buf) < frame_bytes:
+                    break
+                last_idx = frame_idx
+                yield frame_idx, np.frombuffer(buf, dtype=np.uint8).reshape(height, width, 3)
+                frame_idx += self.stride
+        finally:
+            self._kill_proc()
+
+        if last_idx is not None and last_idx >= self.start_frame:
+            end = last_idx + 1 if self.end_frame is None else min(self.end_frame, last_idx + self.stride)
+            self.frames_read = end - self.start_frame
+
+    def _frames(self):
+        if self.backend == "ffmpeg":
+            return self._ffmpeg_frames()
+        return self._opencv_frames()
+
+    # ----------------------------
+    # 디코딩 스레드
+    # ----------------------------
+    def _produce(self):
+        try:
+            for item in self._frames():
+                self.frames_decoded += 1
+                if not self._put(item):
+                    return
+        except Exception as e:  # 소비 쪽에서 다시 raise
+            self._error = e
+        self._put(_END)
+
+    def _put(self, item) -> bool:
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                self.producer_wait_sec += time.perf_counter() - started
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self):
+        if self.queue_depth == 0:
+            frames = self._frames()
+            while True:
+                started = time.perf_counter()
+                item = next(frames, _END)
+                self.consumer_wait_sec += time.perf_counter() - started
+                if item is _END:
+                    return
+                self.frames_decoded += 1
+                yield item
+
+        self._queue = queue.Queue(maxsize=self.queue_depth)
+        self._thread = threading.Thread(target=self._produce, name="frame-decoder", daemon=True)
+        self._thread.start()
+        while True:
+            started = time.perf_counter()
+            item = self._queue.get()
+            self.consumer_wait_sec += time.perf_counter() - started
+            self.max_queue_fill = max(self.max_queue_fill, self._queue.qsize() + 1)
+            if item is _END:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def _kill_proc(self):
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.kill()
+            self._proc.stdout.close()
+            self._proc.wait()
+            self._proc = None
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            # 디코딩 스레드가 put에서 막혀 있지 않도록 큐를 비움
+            while self._thread.is_alive():
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    self._thread.join(timeout=0.1)
+            self._thread = None
+        self._kill_proc()
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "queue_depth": self.queue_depth,
+            "max_queue_fill": self.max_queue_fill,
+            "frames_decoded": self.frames_decoded,
+            "consumer_wait_sec": round(self.consumer_wait_sec, 3),
+            "producer_wait_sec": round(self.producer_wait_sec, 3),
+        }
+
+
+def merge_decode_stats(total: Optional[dict], other: Optional[dict]) -> Optional[dict]:
+    """세그먼트별 디코딩 통계를 합산 (대기 시간·프레임 수는 합, 큐 최대 점유는 최댓값)."""
+    if not other:
+        return total
+    if not total:
+        return dict(other)
+    merged = dict(total)
+    for key in ("frames_decoded", "consumer_wait_sec", "producer_wait_sec"):
+        merged[key] = round(total.get(key, 0) + other.get(key, 0), 3)
+    merged["max_queue_fill"] = max(total.get("max_queue_fill", 0), other.get("max_queue_fill", 0))
+    return merged
@@ -0,0 +1,376 @@
+"""
+프레임별 영상 특징(랜드마크 요약) 시계열 저장/로드 및 점수 재계산
+
+analyze_video가 분석한 프레임마다 눈·코·어깨·손 중심·자세 움직임을 float32 열(column)로 모아
+npz 파일로 저장합니다. 임계값이나 지표가 바뀌어도 영상을 다시 디코딩하지 않고
+이 파일만으로 gaze/posture/gesture/hand/head_pose 결과를 NumPy 벡터 연산으로 다시 계산합니다.
+
+사용 예 (아카이브 전체 재계산):
+    python video_features.py results/features --thresholds '{"gesture_min": 0.12}'
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+# ============================
+# 평가 임계값 (analyze_video와 재계산이 같은 값을 사용)
+# ============================
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "gaze_center_box": 0.25,       # 화면 중앙 ±0.25 안이면 정면 응시
+    "gaze_left_bin": 0.33,         # 눈 중심 x < 0.33 → left
+    "gaze_right_bin": 0.66,        # 눈 중심 x >= 0.66 → right
+    "gaze_move": 0.05,             # 프레임당 눈 중심 이동량이 이보다 크면 시선 이동
+    "gaze_center_ratio_low": 0.15,
+    "posture_roll_scale": 45,      # 어깨 기울기(도)를 안정성 감점으로 환산하는 기준
+    "posture_stable": 0.7,
+    "gesture_min": 0.15,
+    "gesture_max": 0.35,
+    "hand_min": 0.4,
+    "hand_max": 0.9,
+    "head_roll_max": 5,
+    "head_yaw_max": 15,
+}
+
+
+class TraceSampler:
+    """
+    시선 궤적 샘플러. 최대 2*size개만 보관하고, 가득 차면 하나 걸러 버리며 간격(step)을 2배로 늘림.
+    영상 길이와 무관하게 메모리가 일정하고, 전 구간에 고르게 분포된 샘플을 유지.
+    analyze_video와 재계산(aggregate_features)이 같은 샘플을 내도록 함께 사용.
+    """
+
+    def __init__(self, size: int = 20):
+        self.size = size
+        self.step = 1
+        self.seen = 0
+        self.points = []  # (관측 순번, x, y)
+
+    def add(self, x: float, y: float):
+        if self.seen % self.step == 0:
+            self.points.append((self.seen, x, y))
+            self._thin()
+        self.seen += 1
+
+    def _thin(self):
+        while len(self.points) >= 2 * self.size:
+            self.points = self.points[::2]
+            self.step *= 2
+
+    def merge(self, other: "TraceSampler"):
+        offset = self.seen
+        self.points.extend((seen + offset, x, y) for seen, x, y in other.points)
+        self.seen += other.seen
+        self.step = max(self.step, other.step)
+        self._thin()
+
+    def sample(self):
+        points = self.points
+        return [[x, y] for _, x, y in points[::max(1, len(points) // self.size)]]
+
+
+def resolve_thresholds(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+    """기본 임계값에 overrides를 덮어씀. 알 수 없는 키는 ValueError."""
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for key, value in (overrides or {}).items():
+        if key not in DEFAULT_THRESHOLDS:
+            raise ValueError(f"알 수 없는 임계값 키: {key}")
+        thresholds[key] = float(value)
+    return thresholds
+
+
+FEATURE_FORMAT_VERSION = 1
+
+# 값이 없는 프레임(얼굴/자세/손 미검출)은 NaN
+FEATURE_COLUMNS = (
+    "frame_index",
+    "left_eye_x", "left_eye_y",
+    "right_eye_x", "right_eye_y",
+    "nose_x", "nose_y",
+    "left_shoulder_x", "left_shoulder_y",
+    "right_shoulder_x", "right_shoulder_y",
+    "hand0_x", "hand0_y",
+    "hand1_x", "hand1_y",
+    "hand_count",
+    "pose_energy",  # 직전 Pose 대비 움직임 (stride로 나눈 프레임당 값)
+)
+COL = {name: idx for idx, name in enumerate(FEATURE_COLUMNS)}
+
+
+class FeatureRecorder:
+    """
+    분석 프레임마다 한 행씩 채우는 float32 버퍼. 용량이 부족하면 2배로 늘림.
+    세그먼트 병렬 분석 시에는 시간 순서대로 merge.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.empty((max(1, capacity), len(FEATURE_COLUMNS)), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def new_row(self) -> np.ndarray:
+        """NaN으로 초기화된 다음 행(view)을 반환. 호출자가 값을 직접 채움."""
+        if self._size == len(self._data):
+            grown = np.empty((len(self._data) * 2, len(FEATURE_COLUMNS)), dtype=np.float32)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        row = self._data[self._size]
+        row.fill(np.nan)
+        self._size += 1
+        return row
+
+    def merge(self, other: "FeatureRecorder"):
+        if not len(other):
+            return
+        needed = self._size + len(other)
+        if needed > len(self._data):
+            grown = np.empty((needed, len(FEATURE_COLUMNS)), dtype=np.float32)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = other._data[:len(other)]
+        self._size = needed
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        data = self._data[:self._size]
+        return {name: np.ascontiguousarray(data[:, idx]) for name, idx in COL.items()}
+
+
+def save_feature_series(path: Union[str, Path], recorder: FeatureRecorder, metadata: Dict[str, Any]) -> str:
+    """특징 시계열을 열 단위 float32 배열로 압축 저장하고 경로를 반환."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = dict(metadata)
+    meta["format_version"] = FEATURE_FORMAT_VERSION
+    meta["columns"] = list(FEATURE_COLUMNS)
+    np.savez_compressed(
+        path,
+        __metadata__=np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+        **recorder.columns(),
+    )
+    return str(path)
+
+
+def load_feature_series(path: Union[str, Path]) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """save_feature_series로 저장한 파일을 (열 dict, metadata)로 로드."""
+    with np.load(Path(path)) as data:
+        metadata = json.loads(data["__metadata__"].tobytes().decode("utf-8"))
+        columns = {name: data[name] for name in FEATURE_COLUMNS if name in data.files}
+    return columns, metadata
+
+
+# ============================
+# 결과 스키마 구성
+# ============================
+def build_video_result(agg: Dict[str, Any], metadata: Dict[str, Any],
+                       thresholds: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    집계값으로부터 analyze_video 결과 스키마를 구성.
+    agg 키: analyzed_frames, gaze_center_hits, left_count, center_count, right_count,
+    gaze_movements, trace_sample, sigma_x, sigma_y, posture_roll_mean, motion_energy_mean,
+    hand_visible_frames, hand_movement_mean, head_roll_mean, head_yaw_mean
+    """
+    t = thresholds or DEFAULT_THRESHOLDS
+    analyzed_frames = agg["analyzed_frames"]
+    duration_sec = metadata.get("duration_sec") or 0
+
+    gaze_center_ratio = agg["gaze_center_hits"] / analyzed_frames if analyzed_frames > 0 else 0
+    sigma_x = agg["sigma_x"]
+    sigma_y = agg["sigma_y"]
+    mean_roll = agg["posture_roll_mean"]
+    posture_stability = max(0, 1 - (sigma_x + sigma_y + abs(mean_roll) / t["posture_roll_scale"]))
+
+    left_count, center_count, right_count = agg["left_count"], agg["center_count"], agg["right_count"]
+    total_gaze_points = left_count + center_count + right_count
+    if total_gaze_points > 0:
+        gaze_distribution = {
+            "left": round(left_count / total_gaze_points, 3),
+            "center": round(center_count / total_gaze_points, 3),
+            "right": round(right_count / total_gaze_points, 3)
+        }
+    else:
+        gaze_distribution = {"left": 0, "center": 0, "right": 0}
+
+    gaze_movement_rate = round((agg["gaze_movements"] / duration_sec), 2) if duration_sec > 0 else 0
+
+    # 추가 분석 항목 평균값
+    motion_energy_mean = float(agg["motion_energy_mean"])
+    hand_visibility_ratio = agg["hand_visible_frames"] / analyzed_frames if analyzed_frames else 0
+    hand_movement_mean = float(agg["hand_movement_mean"])
+    head_roll_mean = float(agg["head_roll_mean"])
+    head_yaw_mean = float(agg["head_yaw_mean"])
+
+    # 프레임을 건너뛰어(stride > 1) 분석하면 시선 이동 빈도·움직임 에너지는 프레임당 값으로 선형 환산한 근사값
+    stride = int(metadata.get("frame_stride") or 1)
+    sampling = {
+        "frame_stride": stride,
+        "analysis_fps": metadata.get("analysis_fps"),
+        "approximate": stride > 1,
+    }
+
+    # 평가 기준 (emoji 제거)
+    gesture_eval = "적정" if t["gesture_min"] <= motion_energy_mean <= t["gesture_max"] else "조정 필요"
+    hand_eval = "균형" if t["hand_min"] <= hand_visibility_ratio <= t["hand_max"] else "부족/과다"
+    head_eval = "안정적" if head_roll_mean < t["head_roll_max"] and head_yaw_mean < t["head_yaw_max"] else "불균형"
+
+    return {
+        "metadata": metadata,
+        "gaze": {
+            "center_ratio": round(gaze_center_ratio, 3),
+            "distribution": gaze_distribution,
+            "movement_rate_per_sec": gaze_movement_rate,
+            "trace_sample": agg["trace_sample"],
+            "sampling": sampling,
+            "interpretation": (
+                "정면 응시율이 낮으나 청중 중심 발표로 해석 가능"
+                if gaze_center_ratio < t["gaze_center_ratio_low"] else
+                "정면 응시율이 높아 온라인 프레젠테이션에 적합"
+            )
+        },
+        "posture": {
+            "stability": round(posture_stability, 3),
+            "sigma": {"x": round(sigma_x, 4), "y": round(sigma_y, 4)},
+            "roll_mean": round(mean_roll, 3),
+            "interpretation": (
+                "자세 안정성이 높고 상체 균형이 유지됨"
+                if posture_stability > t["posture_stable"] else
+                "자세 흔들림이 커 보임"
+            )
+        },
+        "gesture": {
+            "motion_energy": round(motion_energy_mean, 4),
+            "evaluation": gesture_eval,
+            "sampling": sampling,
+            "interpretation": f"{t['gesture_min']:g}~{t['gesture_max']:g}면 자연스러운 제스처 빈도 (Mehrabian, 1972)"
+        },
+        "hand": {
+            "visibility_ratio": round(hand_visibility_ratio, 3),
+            "movement": round(hand_movement_mean, 4),
+            "evaluation": hand_eval,
+            "interpretation": f"손동작 비율 {t['hand_min'] * 100:g}~{t['hand_max'] * 100:g}%가 이상적 (Pease & Pease, 2006)"
+        },
+        "head_pose": {
+            "roll_mean": round(head_roll_mean, 3),
+            "yaw_mean": round(head_yaw_mean, 3),
+            "evaluation": head_eval,
+            "interpretation": f"Roll<{t['head_roll_max']:g}°, Yaw<{t['head_yaw_max']:g}°면 시선 분배 안정적"
+        }
+    }
+
+
+# ============================
+# 특징 시계열 → 집계 (벡터 연산)
+# ============================
+def _mean(values: np.ndarray) -> float:
+    return float(values.mean()) if values.size else 0
+
+
+def _std(values: np.ndarray) -> float:
+    return float(values.std()) if values.size else 0
+
+
+def aggregate_features(columns: Dict[str, np.ndarray], stride: int = 1,
+                       thresholds: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """프레임별 특징 열로부터 build_video_result에 필요한 집계값을 계산."""
+    t = thresholds or DEFAULT_THRESHOLDS
+    stride = max(1, int(stride))
+    # float32로 저장된 값을 float64로 올려 누적 오차를 줄임
+    c = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+    analyzed_frames = int(c["frame_index"].size)
+
+    # --- 시선 ---
+    eye_x = (c["left_eye_x"] + c["right_eye_x"]) / 2
+    eye_y = (c["left_eye_y"] + c["right_eye_y"]) / 2
+    face = ~np.isnan(eye_x)
+    ex, ey = eye_x[face], eye_y[face]
+    center_hits = int(np.count_nonzero((np.abs(ex - 0.5) < t["gaze_center_box"])
+                                       & (np.abs(ey - 0.5) < t["gaze_center_box"])))
+    left_count = int(np.count_nonzero(ex < t["gaze_left_bin"]))
+    right_count = int(np.count_nonzero(ex >= t["gaze_right_bin"]))
+    center_count = int(ex.size - left_count - right_count)
+    # 얼굴이 잡힌 직전 프레임과 비교 (analyze_video의 prev_eye_center와 동일)
+    moved = (np.abs(np.diff(ex)) / stride > t["gaze_move"]) | (np.abs(np.diff(ey)) / stride > t["gaze_move"])
+    gaze_movements = int(np.count_nonzero(moved)) * stride
+    trace = TraceSampler()
+    for x, y in zip(eye_x[face].tolist(), eye_y[face].tolist()):
+        trace.add(x, y)
+
+    head_roll = np.abs(np.degrees(np.arctan2(c["right_eye_y"][face] - c["left_eye_y"][face],
+                                             c["right_eye_x"][face] - c["left_eye_x"][face])))
+    head_yaw = np.abs(np.degrees(np.arctan2(c["nose_x"][face] - 0.5, 0.5)))
+
+    # --- 자세 ---
+    pose = ~np.isnan(c["left_shoulder_x"])
+    lsx, lsy = c["left_shoulder_x"][pose], c["left_shoulder_y"][pose]
+    rsx, rsy = c["right_shoulder_x"][pose], c["right_shoulder_y"][pose]
+    roll = np.degrees(np.arctan2(rsy - lsy, rsx - lsx))
+    roll = np.where(roll > 90, roll - 180, np.where(roll < -90, roll + 180, roll))
+    energy = c["pose_energy"][~np.isnan(c["pose_energy"])]
+
+    # --- 손 ---
+    hand_count = np.nan_to_num(c["hand_count"])
+    two_hands = hand_count == 2
+    hand_dist = np.hypot(c["hand0_x"][two_hands] - c["hand1_x"][two_hands],
+                         c["hand0_y"][two_hands] - c["hand1_y"][two_hands])
+
+    return {
+        "analyzed_frames": analyzed_frames,
+        "gaze_center_hits": center_hits,
+        "left_count": left_count,
+        "center_count": center_count,
+        "right_count": right_count,
+        "gaze_movements": gaze_movements,
+        "trace_sample": trace.sample(),
+        "sigma_x": _std((lsx + rsx) / 2),
+        "sigma_y": _std((lsy + rsy) / 2),
+        "posture_roll_mean": _mean(np.abs(roll)),
+        "motion_energy_mean": _mean(energy),
+        "hand_visible_frames": int(np.count_nonzero(hand_count > 0)),
+        "hand_movement_mean": _mean(hand_dist),
+        "head_roll_mean": _mean(head_roll),
+        "head_yaw_mean": _mean(head_yaw),
+    }
+
+
+def recompute_video_result(path: Union[str, Path],
+                           thresholds: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """저장된 특징 시계열만으로 analyze_video 결과(gaze/posture/gesture/hand/head_pose)를 재계산."""
+    resolved = resolve_thresholds(thresholds)
+    columns, metadata = load_feature_series(path)
+    metadata = {k: v for k, v in metadata.items() if k not in ("columns", "format_version")}
+    metadata["feature_file"] = str(path)
+    metadata["recomputed"] = True
+    agg = aggregate_features(columns, metadata.get("frame_stride", 1), resolved)
+    return build_video_result(agg, metadata, resolved)
+
+
+def recompute_directory(root: Union[str, Path], thresholds: Optional[Dict[str, Any]] = None,
+                        pattern: str = "**/*_features.npz") -> Dict[str, Dict[str, Any]]:
+    """root 아래 모든 특징 파일을 재계산해 {경로: 결과}로 반환. 실패한 파일은 건너뜀."""
+    results = {}
+    for path in sorted(Path(root).glob(pattern)):
+        try:
+            results[str(path)] = recompute_video_result(path, thresholds)
+        except Exception as e:
+            print(f"⚠️ 재계산 실패 ({path}): {e}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 특징 시계열로 영상 분석 점수 재계산")
+    parser.add_argument("root", help="특징 파일(*_features.npz)이 있는 디렉터리")
+    parser.add_argument("--thresholds", default="{}", help="덮어쓸 임계값 JSON")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    recomputed = recompute_directory(args.root, json.loads(args.thresholds))
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(recomputed)}개 파일 재계산 완료 ({elapsed:.2f}s)")
+    if args.output:
+        Path(args.output).write_text(json.dumps(recomputed, ensure_ascii=False, indent=2), encoding="utf-8")
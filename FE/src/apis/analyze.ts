@@ -1,6 +1,15 @@
 import axios from "axios";
 
 const API_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
+const POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// 분석 job 상태 조회 (status: queued | running | succeeded | failed)
+export async function fetchAnalysisJob(jobId: string) {
+  const res = await axios.get(`${API_URL}/analyze/jobs/${jobId}`);
+  return res.data;
+}
 
 export async function analyzePresentation(userId: string, projectId: string, file: File) {
   const formData = new FormData();
@@ -8,9 +17,20 @@ export async function analyzePresentation(userId: string, projectId: string, fil
   formData.append("project_id", projectId);
   formData.append("file", file);
 
+  // 서버는 job_id만 즉시 반환하고 분석은 백그라운드에서 진행 (대기열이 가득 차면 429)
   const res = await axios.post(`${API_URL}/analyze/video`, formData, {
     headers: { "Content-Type": "multipart/form-data" },
   });
+  const jobId: string = res.data.job_id;
 
-  return res.data; // 백엔드에서 주는 분석 결과 JSON
+  while (true) {
+    await sleep(POLL_INTERVAL_MS);
+    const job = await fetchAnalysisJob(jobId);
+    if (job.status === "succeeded") {
+      return job.result; // 백엔드에서 주는 분석 결과 JSON
+    }
+    if (job.status === "failed") {
+      throw new Error(job.error || "분석에 실패했습니다.");
+    }
+  }
 }